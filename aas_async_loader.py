@@ -0,0 +1,217 @@
+"""asyncio 기반 AAS 적재/업로드 파이프라인.
+
+동기 버전(:func:`aas_pathfinder.load_machines_from_mongo`,
+:func:`aas_pathfinder.upload_aas_documents`)은 조회 → 파싱 → 지오코딩 →
+저장을 문서마다 직렬로 수행한다. 여기서는 각 단계를 크기가 제한된
+``asyncio.Queue`` 로 연결해 동시에 진행하므로, 큰 fleet의 콜드 스타트 시간이
+단계 합이 아니라 가장 느린 단계에 의해 결정된다. 큐가 가득 차면 앞 단계가
+대기하므로(back-pressure) 메모리 사용량도 큐 크기로 제한된다.
+
+파싱은 ``executor`` (기본: 기본 스레드 풀, ``ProcessPoolExecutor`` 지정 가능)
+에서 수행하고 결과는 동기 버전과 같은 순서·내용의 ``Machine`` 사전이다.
+"""
+
+import asyncio
+import logging
+import os
+from concurrent.futures import Executor
+from itertools import islice
+from typing import Any, Dict, List, Optional, Tuple
+
+import aas_pathfinder
+from aas_pathfinder import Machine
+from mongo_connection import get_client
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+def _take(cursor, size: int) -> List[Dict[str, Any]]:
+    return list(islice(cursor, size))
+
+
+def _write_documents(collection, documents: List[Dict[str, Any]]) -> int:
+    written = 0
+    for document in documents:
+        try:
+            collection.replace_one({"filename": document["filename"]}, document, upsert=True)
+            written += 1
+        except Exception as e:
+            logger.warning("⚠️ %s 업로드 중 예외 발생: %s", document["filename"], str(e))
+    return written
+
+
+async def _drain(tasks: List[asyncio.Task]) -> None:
+    """태스크를 기다리되 하나라도 실패하면 나머지를 취소하고 예외를 전달한다."""
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+async def load_machines_async(
+    mongo_uri: str,
+    db_name: str,
+    collection_name: str,
+    *,
+    concurrency: int = 4,
+    batch_size: int = 64,
+    queue_size: int = 8,
+    executor: Optional[Executor] = None,
+    verbose: bool = False,
+) -> Dict[str, Machine]:
+    """:func:`aas_pathfinder.load_machines_from_mongo` 의 asyncio 버전.
+
+    조회(배치 단위) → 파싱(``concurrency`` 개 워커, ``executor``) →
+    지오코딩(주소별로 한 번만, 스레드 풀) 단계를 겹쳐 실행한다.
+    """
+    loop = asyncio.get_running_loop()
+    collection = get_client(mongo_uri)[db_name][collection_name]
+    parse_q: asyncio.Queue = asyncio.Queue(queue_size)
+    geo_q: asyncio.Queue = asyncio.Queue(queue_size)
+    geocoded: Dict[str, asyncio.Future] = {}
+    results: List[Tuple[int, Machine]] = []
+
+    def geocode(address: Optional[str]):
+        if not address:
+            return None
+        fut = geocoded.get(address)
+        if fut is None:
+            fut = geocoded[address] = loop.run_in_executor(None, aas_pathfinder.geocode_address, address)
+        return fut
+
+    async def fetch() -> None:
+        cursor = collection.find()
+        seq = 0
+        while True:
+            batch = await loop.run_in_executor(None, _take, cursor, batch_size)
+            if not batch:
+                break
+            await parse_q.put((seq, batch))
+            seq += len(batch)
+        for _ in range(concurrency):
+            await parse_q.put(None)
+
+    async def parse_worker() -> None:
+        while True:
+            item = await parse_q.get()
+            if item is None:
+                return
+            seq, batch = item
+            parsed = await loop.run_in_executor(executor, aas_pathfinder.parse_machine_documents, batch, verbose)
+            await geo_q.put((seq, parsed))
+
+    async def geocode_worker() -> None:
+        while True:
+            item = await geo_q.get()
+            if item is None:
+                return
+            seq, parsed = item
+            pending = [geocode(entry[3]) if entry else None for entry in parsed]
+            for offset, (entry, fut) in enumerate(zip(parsed, pending)):
+                if entry is None:
+                    continue
+                name, process, status, address, aas = entry
+                coords = await fut if fut is not None else None
+                if not coords:
+                    if verbose:
+                        print(f"[DEBUG] 좌표 변환 실패: {address}")
+                    continue
+                results.append((seq + offset, Machine(name=name, process=process, coords=coords, status=status, data=aas)))
+
+    async def parse_stage() -> None:
+        await _drain([asyncio.create_task(parse_worker()) for _ in range(concurrency)])
+        for _ in range(concurrency):
+            await geo_q.put(None)
+
+    # 모든 단계를 함께 기다린다. 한 단계가 실패하면 나머지(가득 찬 큐에서
+    # 대기 중인 앞 단계 포함)를 취소하고 예외를 그대로 전달한다
+    await _drain(
+        [asyncio.create_task(fetch()), asyncio.create_task(parse_stage())]
+        + [asyncio.create_task(geocode_worker()) for _ in range(concurrency)]
+    )
+
+    results.sort(key=lambda item: item[0])
+    return {m.name: m for _, m in results}
+
+
+async def upload_aas_documents_async(
+    upload_dir: str,
+    mongo_uri: str,
+    db_name: str,
+    collection_name: str,
+    *,
+    concurrency: int = 4,
+    batch_size: int = 64,
+    queue_size: int = 64,
+    executor: Optional[Executor] = None,
+) -> int:
+    """:func:`aas_pathfinder.upload_aas_documents` 의 asyncio 버전.
+
+    파일 읽기·JSON 파싱·간소화는 ``concurrency`` 개 워커가 ``executor`` 에서
+    수행하고, 저장(인덱스 갱신 포함)은 단일 writer가 배치로 처리한다.
+    writer가 하나이므로 컬렉션에는 동시에 한 스레드만 쓴다.
+    """
+    loop = asyncio.get_running_loop()
+    collection = get_client(mongo_uri)[db_name][collection_name]
+    await loop.run_in_executor(None, lambda: collection.create_index("filename", unique=True))
+    read_q: asyncio.Queue = asyncio.Queue(queue_size)
+    write_q: asyncio.Queue = asyncio.Queue(queue_size)
+    uploaded = 0
+
+    async def list_files() -> None:
+        seq = 0
+        for filename in os.listdir(upload_dir):
+            if filename.endswith(".json"):
+                await read_q.put((seq, os.path.join(upload_dir, filename)))
+                seq += 1
+        for _ in range(concurrency):
+            await read_q.put(None)
+
+    async def read_worker() -> None:
+        while True:
+            item = await read_q.get()
+            if item is None:
+                return
+            seq, path = item
+            document = await loop.run_in_executor(executor, aas_pathfinder.read_aas_document, path)
+            # 실패한 파일도 순번을 채워야 writer가 다음 문서로 넘어갈 수 있다
+            await write_q.put((seq, document))
+
+    async def writer() -> None:
+        # 동기 버전과 같은 삽입 순서를 유지하도록 순번대로 재정렬해 기록한다
+        nonlocal uploaded
+        waiting: Dict[int, Optional[Dict[str, Any]]] = {}
+        next_seq = 0
+        done = False
+        while not done:
+            item = await write_q.get()
+            while True:
+                if item is _DONE:
+                    done = True
+                    break
+                waiting[item[0]] = item[1]
+                if write_q.empty():
+                    break
+                item = write_q.get_nowait()
+            batch = []
+            while next_seq in waiting:
+                document = waiting.pop(next_seq)
+                next_seq += 1
+                if document is not None:
+                    batch.append(document)
+            for start in range(0, len(batch), batch_size):
+                uploaded += await loop.run_in_executor(None, _write_documents, collection, batch[start:start + batch_size])
+
+    async def read_stage() -> None:
+        await _drain([asyncio.create_task(read_worker()) for _ in range(concurrency)])
+        await write_q.put(_DONE)
+
+    await _drain([asyncio.create_task(list_files()), asyncio.create_task(read_stage()), asyncio.create_task(writer())])
+
+    logger.info("✅ 총 %d개 문서 업로드 완료", uploaded)
+    return uploaded
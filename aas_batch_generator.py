@@ -1,6 +1,31 @@
+"""``데이터(정리본)`` 의 머신 CSV로 머신별 AAS JSON 파일을 만든다.
+
+CSV는 청크 단위로 읽어 흘려보내고, SDK 객체 생성과 JSON 직렬화·저장은
+프로세스 풀에서 청크 단위로 한다. 진행 중인 청크 수를 워커 수의 두 배로
+제한하므로 메모리 사용량은 입력 크기와 관계없이 일정하다.
+
+``--fast`` 는 (공정 분류, 기술 데이터 열) 조합마다 SDK로 검증된 템플릿을
+한 번만 만들어 JSON 골격으로 컴파일하고, 이후 인스턴스는 id와 값만 끼워
+넣어 찍어 낸다 (:class:`InstanceTemplate`). 템플릿은 생성 호출(워커는 풀)마다
+따로 두는 크기 제한 캐시(:class:`TemplateCache`)에 담는다. 결과는 느린 경로와
+바이트 단위로 같다.
+
+예::
+
+    python aas_batch_generator.py                       # 원본 103개
+    python aas_batch_generator.py --count 100000 --output-dir /tmp/aas_load
+"""
+
+import argparse
+import itertools
 import os
-import pandas as pd
 import re
+import json
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
 from basyx.aas import model
 from basyx.aas.model import (
     datatypes,
@@ -14,7 +39,7 @@ from basyx.aas.model import (
 )
 from basyx.aas.model.base import LangStringSet, Direction, StateOfEvent
 from basyx.aas.model.provider import DictObjectStore
-from basyx.aas.adapter.json import write_aas_json_file
+from basyx.aas.adapter.json import object_store_to_json, write_aas_json_file
 
 
 def sanitize_id_short(s: str) -> str:
@@ -55,28 +80,47 @@ def mlp(id_short: str, text: str, lang: str = 'en') -> MultiLanguageProperty:
 
 
 # 1. 데이터 로딩
-folder = "./데이터(정리본)"
-output_folder = "./aas_instances"
-os.makedirs(output_folder, exist_ok=True)
+DATA_DIR = "./데이터(정리본)"
+OUTPUT_DIR = "./aas_instances"
 
-files = {
+FILES = {
     "단조": "공작기계_단조.csv",
     "밀링": "공작기계_밀링.csv",
     "선반": "공작기계_선반.csv",
     "그라인더": "공작기계_그라인더.csv"
 }
 
-dfs = {}
-for name, fname in files.items():
-    path = os.path.join(folder, fname)
+Row = Dict[str, Any]
+
+
+def _detect_encoding(path: str) -> str:
     try:
-        df = pd.read_csv(path, encoding='utf-8')
+        with open(path, encoding='utf-8') as f:
+            while f.read(1 << 20):
+                pass
+        return 'utf-8'
     except UnicodeDecodeError:
-        df = pd.read_csv(path, encoding='cp949')
-    df["_category"] = name
-    dfs[name] = df
+        return 'cp949'
+
 
-df_all = pd.concat(dfs.values(), ignore_index=True)
+def iter_rows(folder: str = DATA_DIR, files: Dict[str, str] = FILES, chunksize: int = 1000) -> Iterator[Row]:
+    """CSV 행을 청크 단위로 읽어 하나씩 내보낸다.
+
+    열 구성과 순서는 모든 파일을 ``pd.concat`` 한 것과 같다 (없는 열은 NaN).
+    """
+    encodings = {fname: _detect_encoding(os.path.join(folder, fname)) for fname in files.values()}
+    columns: List[str] = []
+    for fname in files.values():
+        header = pd.read_csv(os.path.join(folder, fname), nrows=0, encoding=encodings[fname]).columns
+        for col in list(header) + ["_category"]:
+            if col not in columns:
+                columns.append(col)
+
+    for name, fname in files.items():
+        path = os.path.join(folder, fname)
+        for chunk in pd.read_csv(path, encoding=encodings[fname], chunksize=chunksize):
+            chunk["_category"] = name
+            yield from chunk.reindex(columns=columns).to_dict("records")
 
 
 # 2. Submodel 생성 함수들
@@ -128,13 +172,16 @@ def make_operation_submodel(uid) -> Submodel:
     return sm
 
 
+NON_TECHNICAL_COLUMNS = {"Type", "Equipment", "name", "Brand", "Location", "Company", "_category"}
+
+
 def make_technicaldata_submodel(row, uid) -> Submodel:
     sm = Submodel(id_=f"https://example.com/submodel/TechnicalData_{uid}")
     proc = sanitize_id_short(row["_category"])
     tech_data = SubmodelElementCollection(id_short=f"{proc}_TechnicalPropertyAreas", value=[])
 
     for col, val in row.items():
-        if col not in {"Type", "Equipment", "name", "Brand", "Location", "Company", "_category"} and pd.notna(val):
+        if col not in NON_TECHNICAL_COLUMNS and pd.notna(val):
             col_clean = sanitize_id_short(col.replace(" ", "_"))
             tech_data.value.add(Property(id_short=col_clean, value_type=datatypes.String, value=str(val)))
 
@@ -186,15 +233,14 @@ def make_event_submodel(uid) -> Submodel:
 
 
 # 3. AAS 인스턴스 생성 및 개별 JSON 저장
-for i, row in df_all.iterrows():
+def instance_uid(row: Row, index: int) -> str:
     equipment_id_raw = str(row["Equipment"])
     equipment_id = sanitize_id_short(equipment_id_raw)
-    uid = f"{equipment_id}_{i}"
+    return f"{equipment_id}_{index}"
 
-    aas_id = f"https://example.com/aas/{uid}"
-    asset_id = f"http://example.com/asset/{uid}"
 
-    submodels = [
+def make_submodels(row: Row, uid: str) -> List[Submodel]:
+    return [
         make_nameplate_submodel(row, uid),
         make_category_submodel(row, uid),
         make_operation_submodel(uid),
@@ -204,17 +250,247 @@ for i, row in df_all.iterrows():
         make_event_submodel(uid)
     ]
 
-    aas = AssetAdministrationShell(
+
+def make_shell(uid: str, submodel_refs) -> AssetAdministrationShell:
+    aas_id = f"https://example.com/aas/{uid}"
+    asset_id = f"http://example.com/asset/{uid}"
+    return AssetAdministrationShell(
         id_=aas_id,
         asset_information=AssetInformation(
             asset_kind=model.AssetKind.INSTANCE,
             global_asset_id=asset_id
         ),
-        submodel={ModelReference.from_referable(sm) for sm in submodels}
+        submodel=submodel_refs
     )
 
-    store = DictObjectStore([aas] + submodels)
-    output_path = os.path.join(output_folder, f"{uid}.json")
-    write_aas_json_file(output_path, store, indent=2, ensure_ascii=False)
 
-print("✅ 총 103개의 AAS 인스턴스를 aas_instances 폴더에 개별 JSON 파일로 저장했습니다.")
+def build_instance(row: Row, index: int) -> Tuple[str, DictObjectStore]:
+    """행 하나로 AAS와 서브모델 7개를 만든다. ``(uid, store)`` 를 반환."""
+    uid = instance_uid(row, index)
+    submodels = make_submodels(row, uid)
+    aas = make_shell(uid, {ModelReference.from_referable(sm) for sm in submodels})
+    return uid, DictObjectStore([aas] + submodels)
+
+
+def render_instance(row: Row, index: int) -> Tuple[str, str]:
+    """SDK로 만든 인스턴스의 JSON 텍스트 (``write_aas_json_file`` 과 같은 형식)."""
+    uid, store = build_instance(row, index)
+    return uid, object_store_to_json(store, indent=2, ensure_ascii=False)
+
+
+# 4. 템플릿 찍어내기 (fast path)
+_SLOT = "\ue000{}\ue001"
+_SLOT_RE = re.compile("\ue000([a-z0-9_]+)\ue001")
+
+
+def _json_text(value: str) -> str:
+    """JSON 문자열 리터럴 안에 들어갈 형태 (따옴표 제외)."""
+    return json.dumps(value, ensure_ascii=False)[1:-1]
+
+
+def _submodel_ref(submodel_id: str) -> ModelReference:
+    return ref_from_keys([model.Key(type_=model.KeyTypes.SUBMODEL, value=submodel_id)])
+
+
+class InstanceTemplate:
+    """같은 공정 분류·기술 데이터 열을 가진 행들의 JSON 골격.
+
+    템플릿은 자리 표시자 값으로 SDK 객체를 한 번 만들어(이때 제약 조건을
+    검사한다) 직렬화한 텍스트를 자리 표시자 기준으로 나눠 둔 것이다. 찍어
+    낼 때는 객체를 만들지 않고 이스케이프한 값만 끼워 넣는다.
+
+    AAS의 서브모델 참조는 집합이라 직렬화 순서가 참조의 해시(즉 id)에
+    따라 달라진다. 참조 항목들은 구조가 같으므로 자리만 ``ref`` 로 두고,
+    실제 id로 만든 참조 집합의 순서대로 채운다.
+    """
+
+    def __init__(self, category: str, tech_columns: Tuple[str, ...]):
+        self.category = category
+        self.tech_columns = tech_columns
+        row: Row = {
+            "Location": _SLOT.format("location"),
+            "Brand": _SLOT.format("brand"),
+            "name": _SLOT.format("name"),
+            "Equipment": _SLOT.format("equipment"),
+            "_category": category,
+        }
+        for k, col in enumerate(tech_columns):
+            row[col] = _SLOT.format(f"t{k}")
+        uid = _SLOT.format("uid")
+        submodels = make_submodels(row, uid)
+        refs = {_submodel_ref(_SLOT.format(f"ref{k}")) for k in range(len(submodels))}
+        store = DictObjectStore([make_shell(uid, refs)] + submodels)
+        pieces = _SLOT_RE.split(object_store_to_json(store, indent=2, ensure_ascii=False))
+        self._parts = pieces[0::2]
+        self._slots = pieces[1::2]
+        # uid 자리를 비운 서브모델 id (참조 순서 계산용)
+        self._submodel_ids = [sm.id.split(uid) for sm in submodels]
+
+    @staticmethod
+    def key(row: Row) -> Tuple[str, Tuple[str, ...]]:
+        tech = tuple(col for col, val in row.items() if col not in NON_TECHNICAL_COLUMNS and pd.notna(val))
+        return row["_category"], tech
+
+    def stamp(self, row: Row, index: int) -> Tuple[str, str]:
+        uid = instance_uid(row, index)
+        values = {
+            "uid": uid,
+            "location": _json_text(str(row.get("Location", "N/A"))),
+            "brand": _json_text(str(row.get("Brand", "Unknown"))),
+            "name": _json_text(str(row.get("name", "Unnamed"))),
+            "equipment": _json_text(row.get("Equipment", "NoID")),
+        }
+        for k, col in enumerate(self.tech_columns):
+            values[f"t{k}"] = _json_text(str(row[col]))
+        ids = [uid.join(parts) for parts in self._submodel_ids]
+        refs = iter([ref.key[0].value for ref in {_submodel_ref(i) for i in ids}])
+
+        out = [self._parts[0]]
+        for slot, part in zip(self._slots, self._parts[1:]):
+            out.append(next(refs) if slot.startswith("ref") else values[slot])
+            out.append(part)
+        return uid, "".join(out)
+
+
+class TemplateCache:
+    """(공정 분류, 기술 데이터 열) → :class:`InstanceTemplate`.
+
+    ``maxsize`` 개를 넘으면 가장 오래 쓰지 않은 템플릿부터 버린다.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._templates: "OrderedDict[Tuple[str, Tuple[str, ...]], InstanceTemplate]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def get(self, row: Row) -> InstanceTemplate:
+        key = InstanceTemplate.key(row)
+        template = self._templates.get(key)
+        if template is None:
+            template = self._templates[key] = InstanceTemplate(*key)
+            while len(self._templates) > self.maxsize:
+                self._templates.popitem(last=False)
+        else:
+            self._templates.move_to_end(key)
+        return template
+
+
+def stamp_instance(row: Row, index: int, templates: Optional[TemplateCache] = None) -> Tuple[str, str]:
+    """템플릿으로 인스턴스 JSON 텍스트를 만든다. 템플릿에 맞지 않는 행은 SDK 경로로 만든다.
+
+    ``templates`` 가 없으면 이 행만을 위한 템플릿을 만든다 (여러 행은 캐시를 넘긴다).
+    """
+    if not isinstance(row.get("Equipment", "NoID"), str):
+        return render_instance(row, index)
+    template = templates.get(row) if templates is not None else InstanceTemplate(*InstanceTemplate.key(row))
+    return template.stamp(row, index)
+
+
+def write_chunk(rows: List[Tuple[int, Row]], output_folder: str, templates: Optional[TemplateCache] = None) -> int:
+    """``(번호, 행)`` 목록을 파일로 쓴다. ``templates`` 가 있으면 템플릿으로 찍어 낸다."""
+    for index, row in rows:
+        if templates is not None:
+            uid, text = stamp_instance(row, index, templates)
+            with open(os.path.join(output_folder, f"{uid}.json"), "w", encoding="utf-8") as f:
+                f.write(text)
+            continue
+        uid, store = build_instance(row, index)
+        output_path = os.path.join(output_folder, f"{uid}.json")
+        write_aas_json_file(output_path, store, indent=2, ensure_ascii=False)
+    return len(rows)
+
+
+# 워커 프로세스의 템플릿 캐시 (풀은 생성 호출마다 새로 만들므로 호출 동안만 산다)
+_worker_templates: Optional[TemplateCache] = None
+
+
+def _init_worker(fast: bool) -> None:
+    global _worker_templates
+    _worker_templates = TemplateCache() if fast else None
+
+
+def _write_chunk_in_worker(rows: List[Tuple[int, Row]], output_folder: str) -> int:
+    return write_chunk(rows, output_folder, _worker_templates)
+
+
+def _chunked(items: Iterable, size: int) -> Iterator[list]:
+    it = iter(items)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _repeat_rows(folder: str, files: Dict[str, str], count: Optional[int]) -> Iterator[Row]:
+    """``count`` 가 있으면 CSV를 반복해 읽어 그 수만큼 행을 만든다 (부하 시험용)."""
+    if count is None:
+        yield from iter_rows(folder, files)
+        return
+    produced = 0
+    while produced < count:
+        before = produced
+        for row in iter_rows(folder, files):
+            if produced >= count:
+                return
+            yield row
+            produced += 1
+        if produced == before:
+            return
+
+
+def generate_aas_instances(
+    folder: str = DATA_DIR,
+    output_folder: str = OUTPUT_DIR,
+    files: Dict[str, str] = FILES,
+    workers: Optional[int] = None,
+    chunksize: int = 256,
+    count: Optional[int] = None,
+    fast: bool = False,
+) -> int:
+    """CSV 행마다 ``<uid>.json`` 을 ``output_folder`` 에 쓴다. 쓴 파일 수를 반환.
+
+    ``uid`` 는 ``<Equipment>_<행 번호>`` 이며 행 번호는 파일 순서대로 이어진다.
+    ``workers`` 가 1 이하이면 현재 프로세스에서 처리한다. ``fast`` 이면
+    템플릿으로 찍어 낸다 (템플릿 캐시는 이 호출의 프로세스·워커마다 따로 둔다).
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    chunks = _chunked(enumerate(_repeat_rows(folder, files, count)), chunksize)
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    written = 0
+    if workers <= 1:
+        templates = TemplateCache() if fast else None
+        for chunk in chunks:
+            written += write_chunk(chunk, output_folder, templates)
+        return written
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(fast,)) as pool:
+        pending = set()
+        for chunk in chunks:
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                written += sum(f.result() for f in done)
+            pending.add(pool.submit(_write_chunk_in_worker, chunk, output_folder))
+        written += sum(f.result() for f in wait(pending).done)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="머신 CSV로 AAS JSON 인스턴스 생성")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--chunksize", type=int, default=256, help="작업 단위 행 수")
+    parser.add_argument("--count", type=int, default=None, help="만들 인스턴스 수 (CSV를 반복, 부하 시험용)")
+    parser.add_argument("--fast", action="store_true", help="템플릿 찍어내기로 생성")
+    args = parser.parse_args()
+
+    written = generate_aas_instances(args.data_dir, args.output_dir, workers=args.workers,
+                                     chunksize=args.chunksize, count=args.count, fast=args.fast)
+    print(f"✅ 총 {written}개의 AAS 인스턴스를 {args.output_dir} 폴더에 개별 JSON 파일로 저장했습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,45 +7,22 @@ from typing import List, Tuple, Dict, Any
 import json
 import os
 
-# AAS 업로드·로딩 함수, Machine 클래스, Graph 빌드 함수, haversine 함수 임포트
+# AAS 업로드·로딩 함수, Machine 클래스, Graph 빌드 함수 임포트
 from aas_pathfinder import (
     upload_aas_documents,
     load_machines_from_mongo,
     build_graph_from_aas,
-    haversine,
     Machine,
 )
 from graph import Graph
 from a_star import AStar
+from process_planner import default_planner, group_by_process
 
 logger = logging.getLogger(__name__)
 
 def select_machines(machines: Dict[str, Machine]) -> List[Machine]:
     """공정 순서(flow)에 따라 가장 가까운 머신을 선택"""
-    by_process: Dict[str, List[Machine]] = {}
-    for m in machines.values():
-        by_process.setdefault(m.process, []).append(m)
-
-    flow = ["Forging", "Turning", "Milling", "Grinding", "Assembly"]
-    selected: List[Machine] = []
-
-    for step in flow:
-        candidates = by_process.get(step, [])
-        if not candidates:
-            continue
-        if not selected:
-            chosen = candidates[0]
-        else:
-            prev = selected[-1]
-            # 이전 머신과 거리 최솟값인 머신 선택
-            chosen = min(
-                candidates,
-                key=lambda m: haversine(prev.coords[0], prev.coords[1], m.coords[0], m.coords[1]),
-            )
-        selected.append(chosen)
-        # 이미 선택된 머신은 후보군에서 제거
-        by_process[step] = [c for c in candidates if c != chosen]
-    return selected
+    return default_planner.plan(group_by_process(machines.values())).machines
 
 def path_distance(graph: Graph, path: List[str]) -> float:
     """주어진 노드 경로의 총 거리 계산"""
@@ -0,0 +1,231 @@
+"""AAS JSON 문서용 idShort 경로 질의 엔진.
+
+``Nameplate/**/AddressInformation/Street[text]`` 같은 경로를 한 번 컴파일해
+재사용한다.
+
+- ``/`` 로 구분된 각 세그먼트는 요소의 ``idShort`` 와 대소문자 구분 없이
+  비교한다. Submodel처럼 ``id`` 를 가진 요소는 ``id`` 의 URL 끝부분
+  (``Nameplate_Machine_Tool_1``)이 ``<세그먼트>_`` 로 시작해도 일치한다.
+- ``A|B`` 는 둘 중 하나, ``**`` 는 0단계 이상의 임의 깊이를 뜻한다.
+- 끝의 ``[text]`` 는 MultiLanguageProperty 값에서 첫 ``text`` 를 꺼낸다.
+
+:class:`PathExtractor` 는 여러 경로를 문서 한 번 순회로 동시에 추출하고,
+같은 구조(템플릿)의 문서에서 찾은 위치를 기억해 두었다가 다음 문서에서는
+인덱스로 바로 접근한다. 찾지 못한 경로는 기억하지 않는다 (서명이 같아도
+더 깊은 곳의 구조는 다를 수 있으므로 그 경로만 다시 순회한다).
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+_DESCENDANT = None  # ``**`` 세그먼트 표식
+
+
+def _node_name(node: Dict[str, Any]) -> str:
+    name = node.get("idShort")
+    if name:
+        return name.lower()
+    return node.get("id", "").split("/")[-1].lower()
+
+
+def _template_name(node: Dict[str, Any]) -> str:
+    """문서마다 달라지는 머신 식별자를 뺀 요소 이름 (템플릿 서명용)."""
+    name = node.get("idShort")
+    if name:
+        return name
+    return node.get("id", "").split("/")[-1].split("_")[0]
+
+
+def _children(node: Dict[str, Any]) -> List[Dict[str, Any]]:
+    for key in ("submodelElements", "value"):
+        items = node.get(key)
+        if isinstance(items, list) and items and isinstance(items[0], dict) and ("idShort" in items[0] or "id" in items[0]):
+            return items
+    return []
+
+
+class PathQuery:
+    """컴파일된 경로 하나."""
+
+    def __init__(self, path: str):
+        self.path = path
+        spec, _, selector = path.partition("[")
+        self.selector = selector.rstrip("]").strip() or None
+        self.parts: Tuple[Optional[frozenset], ...] = tuple(
+            _DESCENDANT if seg == "**" else frozenset(s.strip().lower() for s in seg.split("|"))
+            for seg in spec.strip("/").split("/")
+        )
+        # ε-전이: ``**`` 는 0단계와도 일치하므로 다음 세그먼트 상태를 함께 연다
+        self._closure: List[Tuple[int, ...]] = []
+        for i in range(len(self.parts) + 1):
+            states = [i]
+            j = i
+            while j < len(self.parts) and self.parts[j] is _DESCENDANT:
+                j += 1
+                states.append(j)
+            self._closure.append(tuple(states))
+
+    def matches(self, position: int, node: Dict[str, Any]) -> bool:
+        names = self.parts[position]
+        name = _node_name(node)
+        if name in names:
+            return True
+        return "id" in node and any(name.startswith(n + "_") for n in names)
+
+    def select(self, node: Dict[str, Any]) -> Any:
+        value = node.get("value")
+        if self.selector is None:
+            return value
+        if isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict) and self.selector in item:
+                    return item[self.selector]
+            return None
+        return value
+
+    def advance(self, states, node):
+        """``node`` 에서 ``states`` 를 진행시켜 (일치 여부, 자식용 상태) 반환."""
+        matched = False
+        nxt = set()
+        last = len(self.parts)
+        for i in states:
+            if i == last:
+                continue
+            if self.parts[i] is _DESCENDANT:
+                nxt.update(self._closure[i])
+            elif self.matches(i, node):
+                if i + 1 == last:
+                    matched = True
+                nxt.update(self._closure[i + 1])
+        matched = matched or any(self.parts[i] is _DESCENDANT and i + 1 == last for i in states)
+        return matched, nxt
+
+    def iter_matches(self, roots: Sequence[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """문서 순서(전위 순회)대로 일치하는 요소를 모두 돌려준다."""
+        stack = [(node, frozenset(self._closure[0])) for node in reversed(roots)]
+        while stack:
+            node, states = stack.pop()
+            if not isinstance(node, dict):
+                continue
+            matched, nxt = self.advance(states, node)
+            if matched:
+                yield node
+            if nxt:
+                stack.extend((child, nxt) for child in reversed(_children(node)))
+
+    def first(self, roots: Sequence[Dict[str, Any]]) -> Any:
+        for node in self.iter_matches(roots):
+            return self.select(node)
+        return None
+
+
+@lru_cache(maxsize=None)
+def compile_path(path: str) -> PathQuery:
+    return PathQuery(path)
+
+
+class PathExtractor:
+    """여러 경로를 한 번의 순회로 추출하고 템플릿별 위치를 기억한다."""
+
+    def __init__(self, paths: Dict[str, str], max_templates: int = 256):
+        self.names = list(paths)
+        self.queries = [compile_path(p) for p in paths.values()]
+        self.max_templates = max_templates
+        self._layouts: Dict[Tuple, List[Optional[Tuple[Tuple[int, ...], Tuple[str, ...]]]]] = {}
+
+    @staticmethod
+    def signature(roots: Sequence[Dict[str, Any]]) -> Tuple:
+        """템플릿 서명. 직렬화 순서가 문서마다 다른 최상위 요소 순서는 무시한다."""
+        return tuple(sorted(
+            (_template_name(node), tuple(_template_name(c) for c in _children(node)))
+            for node in roots if isinstance(node, dict)
+        ))
+
+    def _scan(self, roots, only: Optional[Sequence[int]] = None):
+        """전체 순회: 질의들(``only`` 가 주어지면 그 번호만)을 동시에 진행시키며 첫 일치 위치를 기록한다."""
+        found: List[Optional[Tuple[Tuple[int, ...], Tuple[str, ...]]]] = [None] * len(self.queries)
+        wanted = range(len(self.queries)) if only is None else set(only)
+        remaining = len(wanted)
+        start = tuple(frozenset(q._closure[0]) if qi in wanted else frozenset() for qi, q in enumerate(self.queries))
+        stack = [(node, (i,), (_template_name(node),), start) for i, node in reversed(list(enumerate(roots)))]
+        while stack and remaining:
+            node, index, names, states = stack.pop()
+            if not isinstance(node, dict):
+                continue
+            child_states = []
+            alive = False
+            for qi, query in enumerate(self.queries):
+                if found[qi] is not None or not states[qi]:
+                    child_states.append(frozenset())
+                    continue
+                matched, nxt = query.advance(states[qi], node)
+                if matched:
+                    found[qi] = (index, names)
+                    remaining -= 1
+                    nxt = set()
+                child_states.append(frozenset(nxt))
+                alive = alive or bool(nxt)
+            if alive:
+                child_states = tuple(child_states)
+                children = _children(node)
+                for ci in range(len(children) - 1, -1, -1):
+                    child = children[ci]
+                    if isinstance(child, dict):
+                        stack.append((child, index + (ci,), names + (_template_name(child),), child_states))
+        return found
+
+    @staticmethod
+    def _resolve(roots, index, names, root_index=None):
+        """기억한 위치로 바로 접근한다. 최상위 요소는 이름으로 찾는다."""
+        if root_index is not None:
+            first = root_index.get(names[0])
+            if first is None:
+                return None
+            index = (first,) + index[1:]
+        nodes = roots
+        node = None
+        for i, name in zip(index, names):
+            if i >= len(nodes) or not isinstance(nodes[i], dict) or _template_name(nodes[i]) != name:
+                return None
+            node = nodes[i]
+            nodes = _children(node)
+        return node
+
+    def extract(self, roots: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+        roots = roots or []
+        key = self.signature(roots)
+        layout = self._layouts.get(key)
+        if layout is not None:
+            root_index: Dict[str, int] = {}
+            for i, node in enumerate(roots):
+                if isinstance(node, dict):
+                    root_index.setdefault(_template_name(node), i)
+            result = {}
+            missing = []
+            for qi, (name, query, loc) in enumerate(zip(self.names, self.queries, layout)):
+                if loc is None:
+                    missing.append(qi)
+                    continue
+                node = self._resolve(roots, *loc, root_index)
+                if node is None:
+                    break  # 템플릿이 같아 보였지만 구조가 다르다 → 전체 순회
+                result[name] = query.select(node)
+            else:
+                # 이전 문서에서 찾지 못한 경로만 이 문서에서 다시 찾는다
+                if missing:
+                    found = self._scan(roots, missing)
+                    for qi in missing:
+                        loc = found[qi]
+                        result[self.names[qi]] = self.queries[qi].select(self._resolve(roots, *loc)) if loc else None
+                        if loc is not None:
+                            layout[qi] = loc
+                return result
+
+        layout = self._scan(roots)
+        if len(self._layouts) >= self.max_templates:
+            self._layouts.clear()
+        self._layouts[key] = layout
+        result = {}
+        for name, query, loc in zip(self.names, self.queries, layout):
+            result[name] = query.select(self._resolve(roots, *loc)) if loc else None
+        return result
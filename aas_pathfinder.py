@@ -7,9 +7,10 @@ from typing import Dict, Tuple, List, Optional, Any
 
 
 from dataclasses import dataclass
-from pymongo import MongoClient
+from mongo_connection import get_client
 
 from aas_json_simplifier import simplify_aas_document
+from aas_path_query import PathExtractor, compile_path
 
 from graph import Graph, Node
 from a_star import AStar
@@ -65,6 +66,17 @@ TYPE_PROCESS_MAP = {
     "선반": "Turning",
 }
 
+_TYPE_MAP_LOWER = {k.lower(): v for k, v in TYPE_PROCESS_MAP.items()}
+_IRDI_MAP_LOWER = {k.lower(): v for k, v in IRDI_PROCESS_MAP.items()}
+
+# 머신 문서에서 필요한 필드를 한 번의 순회로 추출 (템플릿별 위치 캐시)
+_MACHINE_FIELDS = PathExtractor({
+    "address": "Nameplate/**/AddressInformation/Street[text]",
+    "process": "Category/**/MachineType|ProcessID",
+    "status": "Operation/**/MachineStatus",
+})
+_CATEGORY_ELEMENTS = compile_path("Category/**/MachineType|ProcessID")
+
 @dataclass
 class Machine:
     name: str
@@ -75,35 +87,43 @@ class Machine:
 
 # ────────────────────────────────────────────────────────────────
 # AAS 문서 업로드 함수 추가
+def read_aas_document(path: str) -> Optional[Dict[str, Any]]:
+    """JSON 파일 하나를 읽어 업로드용 문서(``filename``/``json``)로 변환한다.
+
+    읽기/파싱에 실패하면 경고를 남기고 ``None`` 을 반환한다.
+    """
+    filename = os.path.basename(path)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            content = json.load(f)
+    except json.JSONDecodeError as exc:
+        logger.warning("⚠️ %s JSON 파싱 실패: %s", filename, exc)
+        return None
+    except Exception as e:
+        logger.warning("⚠️ %s 업로드 중 예외 발생: %s", filename, str(e))
+        return None
+
+    if not isinstance(content, dict):
+        logger.warning("⚠️ %s JSON 구조가 객체가 아님", filename)
+        return None
+
+    return {"filename": filename, "json": simplify_aas_document(content)}
+
+
 def upload_aas_documents(upload_dir: str, mongo_uri: str, db_name: str, collection_name: str) -> int:
     """JSON 파일을 읽어 중복 없이 간소화한 뒤 MongoDB에 저장한다."""
-    client = MongoClient(mongo_uri)
-    db = client[db_name]
-    collection = db[collection_name]
+    collection = get_client(mongo_uri)[db_name][collection_name]
+    # filename 기준 upsert가 전체 스캔이 되지 않도록 unique 인덱스를 보장
+    collection.create_index("filename", unique=True)
 
     uploaded = 0
     for filename in os.listdir(upload_dir):
         if not filename.endswith(".json"):
             continue
-        path = os.path.join(upload_dir, filename)
-
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                content = json.load(f)
-        except json.JSONDecodeError as exc:
-            logger.warning("⚠️ %s JSON 파싱 실패: %s", filename, exc)
-            continue
-        except Exception as e:
-            logger.warning("⚠️ %s 업로드 중 예외 발생: %s", filename, str(e))
-            continue
-
-        if not isinstance(content, dict):
-            logger.warning("⚠️ %s JSON 구조가 객체가 아님", filename)
+        document = read_aas_document(os.path.join(upload_dir, filename))
+        if document is None:
             continue
 
-        simplified = simplify_aas_document(content)
-        document = {"filename": filename, "json": simplified}
-
         try:
             collection.replace_one({"filename": filename}, document, upsert=True)
             uploaded += 1
@@ -144,34 +164,8 @@ def geocode_address(address: str) -> Optional[Tuple[float, float]]:
     return None
 
 def _find_address(elements, depth=0):
-    prefix = "  " * depth
-
-    for elem in elements:
-        id_short = elem.get("idShort", "").lower()
-        # print(f"{prefix}🔍 [depth {depth}] 탐색 중 idShort: {id_short}")
-
-        if id_short == "addressinformation":
-            value_list = elem.get("value", [])
-            if isinstance(value_list, list):
-                for item in value_list:
-                    sub_id = item.get("idShort", "").lower()
-                    if sub_id == "street":
-                        sub_val = item.get("value")
-                        # print(f"{prefix}    🏡 Street 값: {sub_val}")
-                        if isinstance(sub_val, list):
-                            for s in sub_val:
-                                if isinstance(s, dict) and "text" in s:
-                                    # print(f"{prefix}    ✅ Street → text: {s['text']}")
-                                    return s["text"].strip()
-
-        if isinstance(elem.get("submodelElements"), list):
-            # print(f"{prefix}↘️ 재귀 진입: {id_short}")
-            addr = _find_address(elem["submodelElements"], depth + 1)
-            if addr:
-                return addr
-
-    # print(f"{prefix}⛔ [depth {depth}] 주소 미발견 종료")
-    return None
+    addr = compile_path("**/AddressInformation/Street[text]").first(elements)
+    return addr.strip() if isinstance(addr, str) else None
 
 
 
@@ -194,52 +188,68 @@ def explore_address_structure(elements, depth=0):
 
 
 def _find_name(elements):
-    for elem in elements:
-        if elem.get("idShort") in ["MachineName", "Name"]:
-            val = elem.get("value")
-            if isinstance(val, str):
-                return val
-            if isinstance(val, list) and isinstance(val[0], dict):
-                return val[0].get("text")
-        if isinstance(elem.get("submodelElements"), list):
-            name = _find_name(elem["submodelElements"])
-            if name:
-                return name
-    return None
+    name = compile_path("**/MachineName|Name[text]").first(elements)
+    return name if isinstance(name, str) else None
 
 # ────────────────────────────────────────────────────────────────
+def _map_process(value: Any) -> Optional[str]:
+    """MachineType/ProcessID 값을 공정 이름으로 변환 (IRDI 우선, 대소문자 무시)."""
+    if not isinstance(value, str):
+        return None
+    lv = value.strip().lower()
+    return _IRDI_MAP_LOWER.get(lv) or _TYPE_MAP_LOWER.get(lv)
+
+
 def _find_process(elements: List[Dict[str, Any]]) -> str:
     """
     SubmodelElement 목록에서 프로세스 정보를 찾아 반환.
     - idShort: MachineType 또는 ProcessID
     - value: TYPE_PROCESS_MAP, IRDI_PROCESS_MAP 양쪽 모두 소문자 키로 비교
     """
-    # 소문자 키 매핑 준비
-    type_map = {k.lower(): v for k, v in TYPE_PROCESS_MAP.items()}
-    irdi_map = {k.lower(): v for k, v in IRDI_PROCESS_MAP.items()}
-
-    for elem in elements:
-        key = elem.get("idShort", "").lower()
-        val = elem.get("value")
-        # MachineType 또는 ProcessID 요소일 때
-        if key in ("machinetype", "processid"):
-            if isinstance(val, str):
-                lv = val.strip().lower()
-                # IRDI 우선 매핑
-                if lv in irdi_map:
-                    return irdi_map[lv]
-                # TYPE 매핑
-                if lv in type_map:
-                    return type_map[lv]
-        # 중첩된 요소 재귀 탐색
-        if isinstance(elem.get("submodelElements"), list):
-            proc = _find_process(elem["submodelElements"])
-            if proc and proc != "Unknown":
-                return proc
-
+    for elem in compile_path("**/MachineType|ProcessID").iter_matches(elements):
+        proc = _map_process(elem.get("value"))
+        if proc:
+            return proc
     return "Unknown"
 # ────────────────────────────────────────────────────────────────
 
+def parse_machine_document(doc: Dict[str, Any], verbose: bool = False) -> Optional[Tuple[str, str, str, Optional[str], Dict[str, Any]]]:
+    """저장된 AAS 문서 하나에서 (이름, 프로세스, 상태, 주소, AAS) 를 추출한다.
+
+    AAS Shell이 없는 문서는 ``None`` 을 반환한다. 좌표 변환은 하지 않는다.
+    """
+    aas = doc.get("json", {})
+    shells = aas.get("assetAdministrationShells", [])
+    if not shells:
+        return None
+    shell = shells[0]
+
+    # 1) 머신 이름: idShort 우선, 없으면 id URL 끝부분
+    raw_id = shell.get("idShort") or shell.get("id", "")
+    name = raw_id.split("/")[-1]
+
+    submodels = shell.get("submodels", [])
+    if verbose:
+        print(f"[DEBUG] Found submodels: {[sm.get('id', '').split('/')[-1].lower() for sm in submodels]}")
+
+    # 2) Nameplate → 주소, Category → 프로세스, Operation → 상태를 한 번의 순회로 추출
+    fields = _MACHINE_FIELDS.extract(submodels)
+    address = fields["address"].strip() if isinstance(fields["address"], str) else None
+    # 첫 MachineType/ProcessID 가 매핑되지 않으면 매핑되는 첫 값을 찾는다 (문서 순서)
+    process = _map_process(fields["process"])
+    if process is None:
+        mapped = (_map_process(elem.get("value")) for elem in _CATEGORY_ELEMENTS.iter_matches(submodels))
+        process = next((p for p in mapped if p), "Unknown")
+    status = fields["status"] or "unknown"
+
+    return name, process, status, address, aas
+
+
+def parse_machine_documents(docs: List[Dict[str, Any]], verbose: bool = False) -> List[Optional[Tuple[str, str, str, Optional[str], Dict[str, Any]]]]:
+    """:func:`parse_machine_document` 의 배치 버전 (스레드/프로세스 풀 전달용)."""
+    return [parse_machine_document(doc, verbose) for doc in docs]
+
+
 def load_machines_from_mongo(
     mongo_uri: str,
     db_name: str,
@@ -248,66 +258,26 @@ def load_machines_from_mongo(
 ) -> Dict[str, Machine]:
     """
     MongoDB에서 AAS 문서를 읽어 Machine 객체로 변환합니다.
-    - submodel.id의 URL 끝부분을 키로 사용해 인덱싱
     - Nameplate → 주소, Category → 프로세스, Operation → 상태 추출
+      (:func:`parse_machine_document`, 문서당 한 번 순회)
     """
-    client = MongoClient(mongo_uri)
-    db = client[db_name]
-    collection = db[collection_name]
+    collection = get_client(mongo_uri)[db_name][collection_name]
     machines: Dict[str, Machine] = {}
 
     for doc in collection.find():
-        aas = doc.get("json", {})
-        shells = aas.get("assetAdministrationShells", [])
-        if not shells:
+        parsed = parse_machine_document(doc, verbose)
+        if parsed is None:
             continue
-        shell = shells[0]
-
-        # 1) 머신 이름: idShort 우선, 없으면 id URL 끝부분
-        raw_id = shell.get("idShort") or shell.get("id", "")
-        name = raw_id.split("/")[-1]
-
-        # 2) submodels를 URL 끝부분(소문자)으로 인덱싱
-        submodels_index: Dict[str, List[Dict[str, Any]]] = {}
-        for sm in shell.get("submodels", []):
-            sm_id = sm.get("id", "")
-            key = sm_id.split("/")[-1].lower()
-            submodels_index[key] = sm.get("submodelElements", [])
-
-        if verbose:
-            print(f"[DEBUG] Found submodels: {list(submodels_index.keys())}")
-
-        address = None
-        process = "Unknown"
-        status = "unknown"
-
-        # 3) Nameplate_<name> → 주소 추출
-        np_key = next((k for k in submodels_index if k.startswith(f"nameplate_{name.lower()}")), None)
-        if np_key:
-            address = _find_address(submodels_index[np_key])
-
-        # 4) Category_<name> → 프로세스 추출
-        cat_key = next((k for k in submodels_index if k.startswith(f"category_{name.lower()}")), None)
-        if cat_key:
-            proc = _find_process(submodels_index[cat_key])
-            if proc:
-                process = proc
-
-        # 5) Operation_<name> → 상태 추출
-        op_key = next((k for k in submodels_index if k.startswith(f"operation_{name.lower()}")), None)
-        if op_key:
-            st = _find_status(submodels_index[op_key])
-            if st:
-                status = st
-
-        # 6) 주소 → 좌표 변환
+        name, process, status, address, aas = parsed
+
+        # 3) 주소 → 좌표 변환
         coords = geocode_address(address) if address else None
         if not coords:
             if verbose:
                 print(f"[DEBUG] 좌표 변환 실패: {address}")
             continue
 
-        # 7) Machine 객체 생성
+        # 4) Machine 객체 생성
         machines[name] = Machine(
             name=name,
             process=process,
@@ -323,13 +293,8 @@ def _find_status(elements: List[Dict[str, Any]]) -> Optional[str]:
     Operation 서브모델의 MachineStatus(idShort='MachineStatus') 값을 찾아 반환
     재귀적으로 submodelElements도 탐색합니다.
     """
-    for elem in elements:
-        if elem.get("idShort", "").lower() == "machinestatus":
-            return elem.get("value", "unknown")
-        if isinstance(elem.get("submodelElements"), list):
-            st = _find_status(elem["submodelElements"])
-            if st:
-                return st
+    for elem in compile_path("**/MachineStatus").iter_matches(elements):
+        return elem.get("value", "unknown")
     return None
 
 
@@ -412,44 +377,20 @@ def main():
         logger.info("No running machines with valid locations found.")
         return
 
-    by_process: Dict[str, List[Machine]] = {}
-    for m in machines.values():
-        by_process.setdefault(m.process, []).append(m)
+    from map_renderer import render_map
+    from process_planner import default_planner, group_by_process
 
-    flow = ["Forging", "Turning", "Milling", "Grinding", "Assembly"]
-    selected: List[Machine] = []
-    for step in flow:
-        candidates = by_process.get(step, [])
-        if not candidates:
-            continue
-        if not selected:
-            chosen = candidates[0]
-        else:
-            prev = selected[-1]
-            chosen = min(candidates, key=lambda m: haversine(prev.coords[0], prev.coords[1], m.coords[0], m.coords[1]))
-        selected.append(chosen)
-
-    coords = {m.name: m.coords for m in selected}
-    graph = build_graph_from_aas(coords)
+    plan = default_planner.plan(group_by_process(machines.values()))
+    selected = plan.machines
     total_dist = 0.0
-    for a, b in zip(selected, selected[1:]):
-        path, d = dijkstra_path(graph, a.name, b.name)
+    for a, b, d in plan.legs():
         total_dist += d
         logger.info("%s → %s: %.1f km", a.name, b.name, d)
     logger.info("Total distance: %.1f km", total_dist)
 
-    try:
-        import folium
-        m = folium.Map(location=selected[0].coords, zoom_start=5)
-        prev = None
-        for mach in selected:
-            folium.Marker(location=mach.coords, popup=f"{mach.name} ({mach.process}) - {mach.status}").add_to(m)
-            if prev:
-                folium.PolyLine([prev, mach.coords], color="blue").add_to(m)
-            prev = mach.coords
-        m.save("process_flow.html")
+    if render_map(selected, "process_flow.html", popup=lambda mach: f"{mach.name} ({mach.process}) - {mach.status}"):
         logger.info("Saved flow visualisation to 'process_flow.html'.")
-    except Exception:
+    else:
         logger.info("folium not available; skipping visualisation.")
 
 if __name__ == "__main__":
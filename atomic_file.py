@@ -0,0 +1,69 @@
+"""원자적 파일 쓰기.
+
+같은 디렉토리의 임시 파일에 쓴 뒤 ``os.replace`` 로 바꿔 넣으므로 읽는 쪽은
+이전 내용이나 새 내용 중 하나만 본다. ``tempfile.mkstemp`` 는 파일을 0600으로
+만들기 때문에, 바꿔 넣기 전에 일반 ``open(path, "w")`` 과 같은 권한
+(``0o666 & ~umask``)이나 지정한 ``mode`` 로 맞춘다.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Callable, Iterator, Optional
+
+
+def _read_umask() -> int:
+    # umask는 바꿔 봐야만 읽을 수 있다. 스레드가 파일을 만들기 전인 import 시점에 한 번 읽는다
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+_UMASK = _read_umask()
+
+
+def default_mode() -> int:
+    """``open(path, "w")`` 으로 새로 만든 파일의 권한."""
+    return 0o666 & ~_UMASK
+
+
+@contextmanager
+def atomic_path(path: str, prefix: str = ".tmp-", suffix: str = "", mode: Optional[int] = None) -> Iterator[str]:
+    """임시 파일 경로를 돌려주고, 블록이 정상 종료되면 ``path`` 로 바꿔 넣는다.
+
+    파일 경로만 받는 저장 함수(folium ``save`` 등)에 쓴다. 예외가 나면 임시
+    파일을 지우고 ``path`` 는 건드리지 않는다.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=prefix, suffix=suffix, dir=directory)
+    os.close(fd)
+    try:
+        yield tmp
+        os.chmod(tmp, default_mode() if mode is None else mode)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def write_atomic(
+    path: str,
+    write: Callable[[IO], None],
+    binary: bool = False,
+    encoding: str = "utf-8",
+    prefix: str = ".tmp-",
+    suffix: str = "",
+    mode: Optional[int] = None,
+    fsync: bool = False,
+) -> None:
+    """``write(f)`` 로 내용을 쓴 파일을 ``path`` 에 원자적으로 바꿔 넣는다.
+
+    ``fsync`` 이면 바꿔 넣기 전에 내용을 디스크까지 동기화한다.
+    """
+    with atomic_path(path, prefix=prefix, suffix=suffix, mode=mode) as tmp:
+        with open(tmp, "wb" if binary else "w", encoding=None if binary else encoding) as f:
+            write(f)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+"""N-1 / N-k 비상(contingency) 분석.
+
+공정 흐름(FLOW)의 단계마다 가동 중인 머신 하나씩을 골라 이동 거리의 합이
+최소가 되는 체인(최적 공정 비용)을 기준으로, 머신 하나(N-1) 또는 같은
+위치의 머신 전체(사이트, N-k)가 빠졌을 때 최적 비용이 얼마나 늘어나는지를
+한 번의 계산으로 구한다.
+
+- 인접 단계 사이의 거리 행렬을 한 번만 만들고, 앞쪽/뒤쪽 동적 계획법으로
+  ``F[s][j]`` (처음부터 ``j`` 까지 최소 비용)와 ``B[s][j]`` (``j`` 부터 끝까지
+  최소 비용)를 구한다. ``j`` 를 지나는 최선의 체인 비용은 ``F + B`` 이다.
+- 머신 ``j`` 를 빼면 그 단계의 다른 머신을 지나는 체인 중 최소이므로, 단계별
+  ``F + B`` 의 최솟값과 두 번째 최솟값만으로 모든 머신의 N-1 비용이 나온다.
+- 사이트는 여러 단계에 걸치므로 마스크를 씌운 최소 연산으로 동적 계획법을
+  다시 돌리되, 기준 최적 체인에 포함된 머신이 있는 사이트만 계산한다
+  (나머지는 비용이 변하지 않는다).
+
+numpy가 있으면 행렬 연산으로, 없으면 순수 파이썬으로 계산한다 (결과는 같다).
+
+예::
+
+    python contingency_analysis.py --sites --top 20
+    python contingency_analysis.py --synthetic 10000
+"""
+
+import argparse
+import csv
+import json
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from aas_pathfinder import Machine, haversine
+from process_planner import FLOW, group_by_process
+from sim_common import synthetic_fleet
+
+try:
+    import numpy as np
+except ImportError:  # 순수 파이썬 계산으로 대신한다
+    np = None
+
+logger = logging.getLogger(__name__)
+
+INF = float("inf")
+EARTH_RADIUS_KM = 6371.0
+
+
+@dataclass
+class CriticalityRow:
+    kind: str                  # "machine" 또는 "site"
+    key: str                   # 머신 이름 또는 사이트 좌표
+    members: List[str]
+    processes: List[str]
+    cost: float                # 제거 후 최적 비용 (도달 불가면 inf)
+    increase: float            # 기준 대비 증가량
+    regret: float              # 이 머신(들)을 지나는 최선의 체인이 기준보다 긴 정도
+
+    @property
+    def unreachable(self) -> bool:
+        return math.isinf(self.cost)
+
+
+@dataclass
+class ContingencyReport:
+    flow: Tuple[str, ...]      # 후보가 있는 단계만
+    base_cost: float
+    base_chain: List[str]
+    rows: List[CriticalityRow] = field(default_factory=list)
+    backend: str = "python"
+    elapsed_seconds: float = 0.0
+
+    def ranked(self) -> List[CriticalityRow]:
+        """비용 증가가 큰 순서 (도달 불가가 맨 앞), 같으면 기준 체인에 가까운 순서."""
+        return sorted(self.rows, key=lambda r: (-r.increase, r.regret, r.kind, r.key))
+
+
+# ────────────────────────────────────────────────────────────
+def _leg_matrix(a: Sequence[Machine], b: Sequence[Machine]):
+    if np is not None:
+        lat1 = np.radians([m.coords[0] for m in a])[:, None]
+        lon1 = np.radians([m.coords[1] for m in a])[:, None]
+        lat2 = np.radians([m.coords[0] for m in b])[None, :]
+        lon2 = np.radians([m.coords[1] for m in b])[None, :]
+        h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(h), np.sqrt(1 - h))
+    return [[haversine(x.coords[0], x.coords[1], y.coords[0], y.coords[1]) for y in b] for x in a]
+
+
+def _min_plus_forward(f, legs):
+    """``out[j] = min_i f[i] + legs[i][j]``"""
+    if np is not None:
+        return (f[:, None] + legs).min(axis=0)
+    out = [INF] * len(legs[0])
+    for fi, row in zip(f, legs):
+        if fi == INF:
+            continue
+        for j, d in enumerate(row):
+            v = fi + d
+            if v < out[j]:
+                out[j] = v
+    return out
+
+
+def _min_plus_backward(legs, b):
+    """``out[i] = min_j legs[i][j] + b[j]``"""
+    if np is not None:
+        return (legs + b[None, :]).min(axis=1)
+    return [min(d + bj for d, bj in zip(row, b)) for row in legs]
+
+
+def _zeros(n: int):
+    return np.zeros(n) if np is not None else [0.0] * n
+
+
+def _masked(values, masked: Iterable[int]):
+    values = values.copy() if np is not None else list(values)
+    for i in masked:
+        values[i] = INF
+    return values
+
+
+class _Stages:
+    """단계별 후보와 인접 단계 거리 행렬."""
+
+    def __init__(self, machines: Iterable[Machine], flow: Sequence[str]):
+        by_process = group_by_process(machines, running_only=True)
+        self.flow = tuple(step for step in flow if by_process.get(step))
+        self.candidates = [by_process[step] for step in self.flow]
+        self.position: Dict[str, Tuple[int, int]] = {
+            m.name: (s, j) for s, cands in enumerate(self.candidates) for j, m in enumerate(cands)
+        }
+        self.legs = [_leg_matrix(a, b) for a, b in zip(self.candidates, self.candidates[1:])]
+
+    def forward(self, mask: Optional[Dict[int, List[int]]] = None) -> List:
+        mask = mask or {}
+        f = _masked(_zeros(len(self.candidates[0])), mask.get(0, ()))
+        out = [f]
+        for s, legs in enumerate(self.legs, start=1):
+            f = _masked(_min_plus_forward(f, legs), mask.get(s, ()))
+            out.append(f)
+        return out
+
+    def backward(self) -> List:
+        b = _zeros(len(self.candidates[-1]))
+        out = [b]
+        for legs in reversed(self.legs):
+            b = _min_plus_backward(legs, b)
+            out.append(b)
+        return out[::-1]
+
+    def optimal_cost(self, mask: Optional[Dict[int, List[int]]] = None) -> float:
+        return float(min(self.forward(mask)[-1]))
+
+    def chain(self, backward: List) -> List[Machine]:
+        j = _argmin(backward[0])
+        chain = [self.candidates[0][j]]
+        for s, legs in enumerate(self.legs):
+            row = legs[j]
+            nxt = backward[s + 1]
+            j = min(range(len(nxt)), key=lambda k: row[k] + nxt[k])
+            chain.append(self.candidates[s + 1][j])
+        return chain
+
+
+def _argmin(values) -> int:
+    if np is not None:
+        return int(np.argmin(values))
+    return min(range(len(values)), key=values.__getitem__)
+
+
+def _two_smallest(values) -> Tuple[int, float, float]:
+    """(최솟값 위치, 최솟값, 두 번째 최솟값)"""
+    best = _argmin(values)
+    if len(values) < 2:
+        return best, float(values[best]), INF
+    if np is not None:
+        return best, float(values[best]), float(np.partition(values, 1)[1])
+    return best, values[best], min(v for i, v in enumerate(values) if i != best)
+
+
+def group_sites(machines: Iterable[Machine], precision: int = 4) -> Dict[str, List[Machine]]:
+    """좌표를 ``precision`` 자리에서 반올림해 같은 위치의 머신을 묶는다."""
+    sites: Dict[str, List[Machine]] = {}
+    for m in machines:
+        key = f"{m.coords[0]:.{precision}f},{m.coords[1]:.{precision}f}"
+        sites.setdefault(key, []).append(m)
+    return sites
+
+
+# ────────────────────────────────────────────────────────────
+def analyze(
+    machines: Iterable[Machine],
+    flow: Sequence[str] = FLOW,
+    sites: bool = False,
+    site_precision: int = 4,
+) -> ContingencyReport:
+    """모든 가동 머신(과 ``sites`` 이면 모든 사이트)의 제거 영향을 계산한다."""
+    machines = list(machines)
+    started = time.perf_counter()
+    stages = _Stages(machines, flow)
+    backend = "numpy" if np is not None else "python"
+    if not stages.flow:
+        return ContingencyReport((), 0.0, [], backend=backend)
+
+    forward = stages.forward()
+    backward = stages.backward()
+    base_cost = float(min(forward[-1]))
+    chain = stages.chain(backward)
+    report = ContingencyReport(stages.flow, base_cost, [m.name for m in chain], backend=backend)
+
+    totals = []
+    for s, cands in enumerate(stages.candidates):
+        total = forward[s] + backward[s] if np is not None else [f + b for f, b in zip(forward[s], backward[s])]
+        totals.append(total)
+        best, first, second = _two_smallest(total)
+        for j, m in enumerate(cands):
+            cost = second if j == best else first
+            report.rows.append(CriticalityRow(
+                "machine", m.name, [m.name], [m.process], cost, cost - base_cost, max(0.0, float(total[j]) - base_cost),
+            ))
+
+    if sites:
+        on_chain = {m.name for m in chain}
+        for key, members in group_sites(machines, site_precision).items():
+            running = [m for m in members if m.name in stages.position]
+            if not running:
+                continue
+            positions = [stages.position[m.name] for m in running]
+            if on_chain.isdisjoint(m.name for m in running):
+                cost = base_cost
+            else:
+                mask: Dict[int, List[int]] = {}
+                for s, j in positions:
+                    mask.setdefault(s, []).append(j)
+                cost = stages.optimal_cost(mask)
+            regret = max(0.0, min(float(totals[s][j]) for s, j in positions) - base_cost)
+            report.rows.append(CriticalityRow(
+                "site", key, [m.name for m in running], sorted({m.process for m in running}),
+                cost, cost - base_cost, regret,
+            ))
+
+    report.elapsed_seconds = time.perf_counter() - started
+    return report
+
+
+def format_table(report: ContingencyReport, top: Optional[int] = None) -> str:
+    lines = [
+        f"base cost: {report.base_cost:.2f} km  chain: {' → '.join(report.base_chain)}",
+        f"{'rank':>4}  {'kind':<7} {'key':<28} {'processes':<20} {'increase_km':>12} {'regret_km':>10}",
+    ]
+    for rank, row in enumerate(report.ranked()[:top], start=1):
+        increase = "unreachable" if row.unreachable else f"{row.increase:.2f}"
+        lines.append(
+            f"{rank:>4}  {row.kind:<7} {row.key[:28]:<28} {','.join(row.processes)[:20]:<20} "
+            f"{increase:>12} {row.regret:>10.2f}"
+        )
+    return "\n".join(lines)
+
+
+def write_csv(report: ContingencyReport, path: str) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["rank", "kind", "key", "members", "processes", "cost_km", "increase_km", "regret_km", "unreachable"])
+        for rank, row in enumerate(report.ranked(), start=1):
+            writer.writerow([
+                rank, row.kind, row.key, ";".join(row.members), ";".join(row.processes),
+                row.cost, row.increase, row.regret, row.unreachable,
+            ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="N-1 / N-k 비상 분석")
+    parser.add_argument("--sites", action="store_true", help="사이트(같은 위치) 단위 제거도 평가")
+    parser.add_argument("--site-precision", type=int, default=4, help="사이트를 묶을 좌표 소수 자릿수")
+    parser.add_argument("--top", type=int, default=20, help="출력할 순위 수")
+    parser.add_argument("--csv", help="전체 순위표를 저장할 CSV 경로")
+    parser.add_argument("--json", action="store_true", help="요약을 JSON으로 출력")
+    parser.add_argument("--synthetic", type=int, default=0, help="MongoDB 대신 합성 fleet 크기")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="test_db")
+    parser.add_argument("--collection", default="aas_documents")
+    parser.add_argument("--upload-dir", help="분석 전에 업로드할 AAS JSON 디렉토리")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.synthetic:
+        machines = list(synthetic_fleet(args.synthetic, args.seed).values())
+    else:
+        from aas_pathfinder import load_machines_from_mongo, upload_aas_documents
+
+        if args.upload_dir:
+            upload_aas_documents(args.upload_dir, args.mongo_uri, args.db, args.collection)
+        machines = list(load_machines_from_mongo(args.mongo_uri, args.db, args.collection).values())
+
+    report = analyze(machines, sites=args.sites, site_precision=args.site_precision)
+    if args.csv:
+        write_csv(report, args.csv)
+    if args.json:
+        ranked = report.ranked()
+        print(json.dumps({
+            "base_cost_km": report.base_cost,
+            "base_chain": report.base_chain,
+            "backend": report.backend,
+            "elapsed_seconds": report.elapsed_seconds,
+            "evaluated": len(ranked),
+            "unreachable": sum(r.unreachable for r in ranked),
+            "top": [
+                {"kind": r.kind, "key": r.key, "increase_km": None if r.unreachable else r.increase}
+                for r in ranked[:args.top]
+            ],
+        }, indent=2))
+        return
+    print(format_table(report, args.top))
+    logger.info("%d 항목 평가 (%s, %.2fs)", len(report.rows), report.backend, report.elapsed_seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,19 @@
 from __future__ import annotations
 
 import argparse
+import csv
+import hashlib
 import json
 import os
 import sys
+import time
+import traceback
 import uuid
 import logging
-from typing import Any, Dict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from atomic_file import write_atomic
 
 logger = logging.getLogger("AAS_Converter")
 logging.basicConfig(level=logging.INFO)
@@ -434,29 +441,182 @@ def convert_file(path: str) -> Any:
     return env
 
 
+# ────────────────────────────────────────────────────────────
+# 디렉토리 변환 (병렬 · 증분)
+# 출력 디렉토리의 매니페스트에 입력 파일 해시를 남겨 두고, 해시가 같고
+# 출력 파일이 있으면 다시 변환하지 않는다. 변환기 소스가 바뀌면 매니페스트
+# 전체가 무효가 된다. 출력은 임시 파일에 쓴 뒤 ``os.replace`` 로 바꿔 넣는다.
+
+MANIFEST_NAME = ".convert_manifest.json"
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def converter_digest() -> str:
+    """이 모듈 소스의 해시. 변환 규칙이 바뀌면 이전 출력은 모두 다시 만든다."""
+    return file_sha256(os.path.abspath(__file__))
+
+
+def load_manifest(output_dir: str) -> Dict[str, Dict[str, Any]]:
+    """파일 이름 → 기록. 없거나 깨졌거나 다른 변환기로 만든 것이면 빈 dict."""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("converter") != converter_digest():
+        return {}
+    files = data.get("files")
+    return files if isinstance(files, dict) else {}
+
+
+def save_manifest(output_dir: str, files: Dict[str, Dict[str, Any]]) -> None:
+    data = {"converter": converter_digest(), "files": files}
+    write_atomic(
+        os.path.join(output_dir, MANIFEST_NAME),
+        lambda f: json.dump(data, f, indent=2, sort_keys=True),
+        prefix=".manifest-",
+        suffix=".json",
+    )
+
+
+def convert_one(inp: str, outp: str) -> Dict[str, Any]:
+    """파일 하나를 변환해 ``outp`` 에 원자적으로 쓴다 (워커 프로세스에서도 실행).
+
+    예외를 던지지 않고 상태와 단계별 소요 시간을 dict로 돌려준다.
+    """
+    result: Dict[str, Any] = {"name": os.path.basename(inp), "status": "converted", "convert_s": 0.0, "write_s": 0.0}
+    started = time.perf_counter()
+    try:
+        env = convert_file(inp)
+        converted = time.perf_counter()
+        result["convert_s"] = converted - started
+        write_atomic(outp, lambda f: write_aas_json_file(f, env), prefix=".convert-", suffix=".json")
+        result["write_s"] = time.perf_counter() - converted
+    except Exception as e:
+        result.update(status="failed", error=str(e), traceback=traceback.format_exc())
+        if not result["convert_s"]:
+            result["convert_s"] = time.perf_counter() - started
+    return result
+
+
+def convert_directory(
+    input_dir: str,
+    output_dir: str,
+    jobs: int = 1,
+    force: bool = False,
+    mp_context: Optional[Any] = None,
+) -> List[Dict[str, Any]]:
+    """``input_dir`` 의 ``.json`` 파일을 변환한다. 파일별 결과 목록을 돌려준다.
+
+    ``jobs`` 가 2 이상이면 프로세스 풀에서 변환한다. ``force`` 이면
+    매니페스트를 무시하고 모두 다시 변환한다. ``mp_context`` 는
+    ``multiprocessing.get_context(...)`` 로 얻은 프로세스 시작 방식이다
+    (``None`` 이면 플랫폼 기본값).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {} if force else load_manifest(output_dir)
+    entries: Dict[str, Dict[str, Any]] = {}
+    results: List[Dict[str, Any]] = []
+    todo = []
+    for name in sorted(os.listdir(input_dir)):
+        if not name.lower().endswith(".json"):
+            continue
+        inp = os.path.join(input_dir, name)
+        outp = os.path.join(output_dir, name)
+        started = time.perf_counter()
+        digest = file_sha256(inp)
+        hash_s = time.perf_counter() - started
+        previous = manifest.get(name)
+        if previous and previous.get("sha256") == digest and os.path.exists(outp):
+            entries[name] = previous
+            results.append({"name": name, "status": "skipped", "hash_s": hash_s, "convert_s": 0.0, "write_s": 0.0})
+            continue
+        todo.append((name, inp, outp, digest, hash_s))
+
+    def finish(item, result):
+        name, _, outp, digest, hash_s = item
+        result["hash_s"] = hash_s
+        results.append(result)
+        if result["status"] == "converted":
+            entries[name] = {"sha256": digest}
+            print(f"Converted {name} -> {outp}")
+        else:
+            print(f"Failed to convert {name}: {result['error']}")
+            print(result["traceback"], end="", file=sys.stderr)
+
+    try:
+        if jobs > 1 and len(todo) > 1:
+            with ProcessPoolExecutor(max_workers=jobs, mp_context=mp_context) as pool:
+                futures = [pool.submit(convert_one, inp, outp) for _, inp, outp, _, _ in todo]
+                for item, future in zip(todo, futures):
+                    finish(item, future.result())
+        else:
+            for item in todo:
+                finish(item, convert_one(item[1], item[2]))
+    finally:
+        # 중간에 멈춰도 끝난 파일까지는 다음 실행에서 건너뛴다
+        save_manifest(output_dir, entries)
+    return results
+
+
+def format_timings(results: List[Dict[str, Any]], top: int = 10) -> str:
+    """상태별 개수·단계별 합계와 가장 오래 걸린 ``top`` 개 파일 표."""
+    counts: Dict[str, int] = {}
+    totals = dict.fromkeys(("hash_s", "convert_s", "write_s"), 0.0)
+    for r in results:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+        for key in totals:
+            totals[key] += r.get(key, 0.0)
+    lines = [
+        ", ".join(f"{status} {counts.get(status, 0)}" for status in ("converted", "skipped", "failed")),
+        "total: hash {hash_s:.3f}s  convert {convert_s:.3f}s  write {write_s:.3f}s".format(**totals),
+    ]
+    slowest = sorted(
+        (r for r in results if r["status"] != "skipped"),
+        key=lambda r: r["convert_s"] + r["write_s"],
+        reverse=True,
+    )[:top]
+    if slowest:
+        width = max(len(r["name"]) for r in slowest)
+        lines.append(f"{'file':<{width}}  {'convert_s':>9}  {'write_s':>9}  status")
+        for r in slowest:
+            lines.append(f"{r['name']:<{width}}  {r['convert_s']:>9.3f}  {r['write_s']:>9.3f}  {r['status']}")
+    return "\n".join(lines)
+
+
+def write_timings(results: List[Dict[str, Any]], path: str) -> None:
+    fields = ["name", "status", "hash_s", "convert_s", "write_s"]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(results)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Convert legacy AAS JSON files using the bundled BaSyx SDK")
     parser.add_argument("input_dir", help="Directory with legacy JSON files")
     parser.add_argument("output_dir", help="Directory to write converted files")
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes (default: 1)")
+    parser.add_argument("--force", action="store_true", help="Reconvert files even if unchanged")
+    parser.add_argument("--top", type=int, default=10, help="Slowest files to list in the timing report")
+    parser.add_argument("--timings", help="Write per-file timings to this CSV")
     args = parser.parse_args()
 
     _require_sdk()
-    os.makedirs(args.output_dir, exist_ok=True)
-    for name in os.listdir(args.input_dir):
-        if not name.lower().endswith(".json"):
-            continue
-        inp = os.path.join(args.input_dir, name)
-        outp = os.path.join(args.output_dir, name)
-        try:
-            env = convert_file(inp)
-        except Exception as e:  # pragma: no cover - runtime errors
-            print(f"Failed to convert {name}: {e}")
-            import traceback
-            traceback.print_exc()
-            continue
-        with open(outp, "w", encoding="utf-8") as f:
-            write_aas_json_file(f, env)
-        print(f"Converted {name} -> {outp}")
+    started = time.perf_counter()
+    results = convert_directory(args.input_dir, args.output_dir, jobs=args.jobs, force=args.force)
+    print(format_timings(results, top=args.top))
+    print(f"elapsed {time.perf_counter() - started:.3f}s (jobs={args.jobs})")
+    if args.timings:
+        write_timings(results, args.timings)
 
 
 if __name__ == "__main__":  # pragma: no cover - CLI entry
@@ -0,0 +1,395 @@
+# -*- coding: utf-8 -*-
+"""가상 시계 기반 이산 사건 시뮬레이션(DES).
+
+``run_simulation`` 은 ``time.sleep`` 으로 고장 하나를 순서대로 흉내 내므로
+시뮬레이션 시간이 실제 시간과 같다. 여기서는 사건을 (시각, 순번) 힙에 넣고
+가장 이른 사건으로 시계를 바로 옮기므로 수천 시간을 몇 초에 돌린다.
+
+:class:`EventLoop` 는 범용 코어이고, :class:`FaultSimulation` 은 머신 고장·수리,
+주문 도착, 재계획 사건을 만들어 실제 :class:`event_server.StatusEventServer`
+를 가짜 브로커(:mod:`fake_mqtt`)로 구동한다. 서버의 재계획 스케줄러는 가상
+시계를 쓰고, 각 사건 뒤에는 브로커와 작업 큐가 빌 때까지 기다리므로 같은
+``seed`` 면 결과가 같다.
+
+전체 상태(레지스트리, 대기 중인 사건, 난수 상태, 현재 계획, 기록 파일
+위치)는 압축한 pickle 스냅샷으로 저장할 수 있다. ``--checkpoint-every`` 는
+시뮬레이션 시간 간격마다, ``SIGUSR1`` 은 요청 즉시 저장하고, ``--resume`` 은
+AAS 문서를 다시 적재하지 않고 마지막 스냅샷에서 이어 돌린다. 이어 돌린
+결과는 끊김 없이 돌린 결과와 같다.
+"""
+
+import argparse
+import heapq
+import json
+import logging
+import math
+import pickle
+import random
+import signal
+import zlib
+from typing import Any, Callable, Dict, List, Optional
+
+import event_server
+from aas_pathfinder import Machine, load_machines_from_mongo, upload_aas_documents
+from atomic_file import write_atomic
+from fake_mqtt import Broker, FakeMQTTClient
+from fleet_registry import is_running
+from result_sink import ResultSink, open_sink
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600.0
+SNAPSHOT_MAGIC = b"DESSNAP1"
+PLAN_COLUMNS = {"t_hours": "float", "chain": "str", "distance_km": "float"}
+
+
+# ────────────────────────────────────────────────────────────
+class EventLoop:
+    """힙 기반 사건 큐와 가상 시계 (단위: 초)."""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+        self._heap: List = []
+        self._seq = 0
+        self._handlers: Dict[str, Callable[..., None]] = {}
+        self._stopped = False
+        self.processed = 0
+
+    def clock(self) -> float:
+        return self.now
+
+    def on(self, kind: str, handler: Callable[..., None]) -> None:
+        self._handlers[kind] = handler
+
+    def schedule_at(self, when: float, kind: str, **data: Any) -> None:
+        if when < self.now:
+            raise ValueError(f"과거 시각에 사건을 예약할 수 없습니다: {when} < {self.now}")
+        # 같은 시각의 사건은 예약 순서대로 처리한다
+        heapq.heappush(self._heap, (when, self._seq, kind, data))
+        self._seq += 1
+
+    def schedule(self, delay: float, kind: str, **data: Any) -> None:
+        self.schedule_at(self.now + delay, kind, **data)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def stop(self) -> None:
+        """진행 중인 :meth:`run` 을 현재 사건 처리 후 멈춘다 (시그널 처리기 등에서)."""
+        self._stopped = True
+
+    def export_state(self) -> Dict[str, Any]:
+        return {"now": self.now, "heap": list(self._heap), "seq": self._seq, "processed": self.processed}
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        self.now = state["now"]
+        self._heap = list(state["heap"])
+        heapq.heapify(self._heap)
+        self._seq = state["seq"]
+        self.processed = state["processed"]
+
+    def run(self, until: Optional[float] = None, max_events: Optional[int] = None) -> None:
+        handled = 0
+        self._stopped = False
+        while self._heap:
+            if self._stopped:
+                return
+            when, _, kind, data = self._heap[0]
+            if until is not None and when > until:
+                break
+            if max_events is not None and handled >= max_events:
+                break
+            heapq.heappop(self._heap)
+            self.now = when
+            self._handlers[kind](**data)
+            handled += 1
+            self.processed += 1
+        if until is not None and self.now < until:
+            self.now = until
+
+
+# ────────────────────────────────────────────────────────────
+class FaultSimulation:
+    """머신 고장/수리와 주문 도착을 시뮬레이션하며 이벤트 서버를 구동한다.
+
+    ``mtbf``/``mttr`` 는 공정별 평균 고장 간격/수리 시간(시간 단위),
+    ``order_interval`` 은 평균 주문 도착 간격(시간)이다. ``sink`` 를 주면
+    재계획 기록을 메모리(``timeline``) 대신 그곳에 흘려 쓴다.
+    """
+
+    def __init__(
+        self,
+        machines: Dict[str, Machine],
+        seed: int = 0,
+        mtbf: Optional[Dict[str, float]] = None,
+        mttr: Optional[Dict[str, float]] = None,
+        default_mtbf: float = 500.0,
+        default_mttr: float = 8.0,
+        order_interval: float = 1.0,
+        coalesce_window: float = 0.5,
+        max_delay: float = 2.0,
+        sink: Optional[ResultSink] = None,
+    ):
+        self.config = {
+            "seed": seed, "mtbf": mtbf, "mttr": mttr, "default_mtbf": default_mtbf, "default_mttr": default_mttr,
+            "order_interval": order_interval, "coalesce_window": coalesce_window, "max_delay": max_delay,
+        }
+        self.machines = machines
+        self.sink = sink
+        self.rng = random.Random(seed)
+        self.mtbf = mtbf or {}
+        self.mttr = mttr or {}
+        self.default_mtbf = default_mtbf
+        self.default_mttr = default_mttr
+        self.order_interval = order_interval
+        self.loop = EventLoop()
+        self.broker = Broker()
+
+        self.server = event_server.StatusEventServer(
+            "mongodb://localhost", "sim", "sim", "mqtt://localhost",
+            coalesce_window=coalesce_window, max_delay=max_delay, map_path=None, persist_batches=False,
+        )
+        self.server.load_machines = lambda: dict(machines)
+        self.server.scheduler.clock = self.loop.clock
+        self.server.mqtt = FakeMQTTClient(broker=self.broker)
+        self.server.mqtt.on_message = self.server.on_message
+        self.publisher = FakeMQTTClient(broker=self.broker)
+        present = {m.process for m in machines.values()}
+        self._processes = [p for p in event_server.FLOW if p in present]
+
+        self.metrics: Dict[str, Any] = {
+            "faults": 0, "repairs": 0, "orders": 0, "orders_incomplete": 0,
+            "plan_distance_sum": 0.0, "plan_distance_max": 0.0,
+        }
+        self.timeline: List[Dict[str, Any]] = []
+        self._started = False
+        self._checkpoint_requested = False
+
+        for kind in ("fault", "repair", "order", "replan"):
+            self.loop.on(kind, getattr(self, f"_on_{kind}"))
+
+    # ────────────────────────────────────────────────────────────
+    def _hours(self, mean: float) -> float:
+        return self.rng.expovariate(1.0 / mean) * HOUR
+
+    def _publish(self, machine: str, status: str) -> None:
+        self.publisher.publish(f"aas/status/{machine}", json.dumps({"machine": machine, "status": status}))
+        # 서버가 메시지를 처리한 뒤에 다음 사건으로 넘어간다
+        self.broker.drain([self.server.mqtt])
+        deadline = self.server.scheduler.next_deadline()
+        if deadline is not None:
+            self.loop.schedule_at(max(deadline, self.loop.now), "replan")
+
+    def _on_fault(self, machine: str) -> None:
+        self.metrics["faults"] += 1
+        self._publish(machine, "Fault")
+        self.loop.schedule(self._hours(self.mttr.get(self.machines[machine].process, self.default_mttr)), "repair", machine=machine)
+
+    def _on_repair(self, machine: str) -> None:
+        self.metrics["repairs"] += 1
+        self._publish(machine, "Running")
+        self._schedule_fault(machine)
+
+    def _schedule_fault(self, machine: str) -> None:
+        mean = self.mtbf.get(self.machines[machine].process, self.default_mtbf)
+        self.loop.schedule(self._hours(mean), "fault", machine=machine)
+
+    def _on_replan(self) -> None:
+        # 병합 시간 안에 새 이벤트가 오면 아직 기한이 아닐 수 있다 (다시 예약됨)
+        if self.server.scheduler.poll(self.loop.now):
+            self.server.work_queue.join()
+            plan = self.server.plan
+            if self.sink is not None:
+                self.sink.write({
+                    "t_hours": self.loop.now / HOUR,
+                    "chain": " -> ".join(plan.names) if plan else "",
+                    "distance_km": plan.total_distance if plan else float("nan"),
+                })
+                return
+            self.timeline.append({
+                "t_hours": self.loop.now / HOUR,
+                "chain": plan.names if plan else [],
+                "distance_km": plan.total_distance if plan else None,
+            })
+
+    def _on_order(self) -> None:
+        self.metrics["orders"] += 1
+        plan = self.server.plan
+        covered = {m.process for m in plan.machines} if plan else set()
+        if any(p not in covered for p in self._processes):
+            self.metrics["orders_incomplete"] += 1
+        if plan:
+            distance = plan.total_distance
+            self.metrics["plan_distance_sum"] += distance
+            self.metrics["plan_distance_max"] = max(self.metrics["plan_distance_max"], distance)
+        self.loop.schedule(self._hours(self.order_interval), "order")
+
+    # ────────────────────────────────────────────────────────────
+    def run(
+        self,
+        hours: float,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_every: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """시뮬레이션 시각 ``hours`` 까지 돌린다 (재개한 경우 이어서).
+
+        ``checkpoint_path`` 가 있으면 ``checkpoint_every`` 시간마다, 그리고
+        :meth:`request_checkpoint` 가 호출되면 스냅샷을 저장한다.
+        """
+        server = self.server
+        server.mqtt.subscribe("aas/status/#")
+        server.mqtt.loop_start()
+        try:
+            if not self._started:
+                server.recalculate()
+                server.work_queue.join()
+                for name, machine in self.machines.items():
+                    if is_running(machine.status):
+                        self._schedule_fault(name)
+                self.loop.schedule(self._hours(self.order_interval), "order")
+                self._started = True
+            end = hours * HOUR
+            interval = checkpoint_every * HOUR if checkpoint_path and checkpoint_every else None
+            while True:
+                target = end
+                if interval is not None:
+                    target = min(end, (math.floor(self.loop.now / interval) + 1) * interval)
+                self.loop.run(until=target)
+                periodic = interval is not None and self.loop.now >= target
+                if checkpoint_path and (periodic or self._checkpoint_requested):
+                    self.save_checkpoint(checkpoint_path)
+                self._checkpoint_requested = False
+                if self.loop.now >= end:
+                    break
+            # 끝나기 전에 들어온 이벤트는 반영한다
+            if server.scheduler.flush():
+                server.work_queue.join()
+        finally:
+            server.mqtt.disconnect()
+            server.shutdown()
+            if self.sink is not None:
+                self.sink.checkpoint()
+        return self.report()
+
+    def request_checkpoint(self) -> None:
+        """현재 사건 처리 후 스냅샷을 저장하게 한다 (시그널 처리기에서 호출해도 된다)."""
+        self._checkpoint_requested = True
+        self.loop.stop()
+
+    # ────────────────────────────────────────────────────────────
+    def export_state(self) -> Dict[str, Any]:
+        """재개에 필요한 전체 상태. 사건 사이(서버가 유휴일 때)에 호출한다."""
+        registry = self.server.registry
+        return {
+            "config": self.config,
+            "machines": self.machines,
+            "registry": registry.machines(),
+            "registry_version": registry.version,
+            "plan": self.server.plan,
+            "loop": self.loop.export_state(),
+            "rng": self.rng.getstate(),
+            "scheduler": self.server.scheduler.export_state(),
+            "metrics": dict(self.metrics),
+            "timeline": list(self.timeline),
+            "sink_offset": self.sink.offset if self.sink is not None else None,
+        }
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        self.server.restore(state["registry"], state["registry_version"], state["plan"])
+        self.loop.restore_state(state["loop"])
+        self.rng.setstate(state["rng"])
+        self.server.scheduler.restore_state(state["scheduler"])
+        self.metrics = dict(state["metrics"])
+        self.timeline = list(state["timeline"])
+        self._started = True
+
+    def save_checkpoint(self, path: str) -> None:
+        if self.sink is not None:
+            self.sink.checkpoint()
+        save_snapshot(path, self.export_state())
+        logger.info("Checkpoint at %.1f h → %s", self.loop.now / HOUR, path)
+
+    @classmethod
+    def resume(cls, state: Dict[str, Any], sink: Optional[ResultSink] = None) -> "FaultSimulation":
+        """:func:`load_snapshot` 으로 읽은 상태에서 시뮬레이션을 되살린다."""
+        sim = cls(state["machines"], sink=sink, **state["config"])
+        sim.restore_state(state)
+        return sim
+
+    def report(self) -> Dict[str, Any]:
+        m = dict(self.metrics)
+        orders = m["orders"] or 1
+        m["plan_distance_mean"] = m.pop("plan_distance_sum") / orders
+        m["order_fill_rate"] = 1.0 - m["orders_incomplete"] / orders
+        m["simulated_hours"] = self.loop.now / HOUR
+        m["events_processed"] = self.loop.processed
+        m["scheduler"] = stats = self.server.scheduler.stats()
+        m["replans"] = stats["replans_run"]
+        return m
+
+
+def save_snapshot(path: str, state: Dict[str, Any]) -> None:
+    """상태를 압축한 pickle로 원자적으로 저장한다 (같은 디렉토리의 임시 파일 → ``os.replace``)."""
+    data = SNAPSHOT_MAGIC + zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL))
+    write_atomic(path, lambda f: f.write(data), binary=True, prefix=".snapshot-", fsync=True)
+
+
+def load_snapshot(path: str) -> Dict[str, Any]:
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(SNAPSHOT_MAGIC):
+        raise ValueError(f"시뮬레이션 스냅샷이 아닙니다: {path}")
+    return pickle.loads(zlib.decompress(data[len(SNAPSHOT_MAGIC):]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가상 시계 고장 시뮬레이션")
+    parser.add_argument("--hours", type=float, default=1000.0, help="시뮬레이션 시간(시간)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mtbf", type=float, default=500.0, help="평균 고장 간격(시간)")
+    parser.add_argument("--mttr", type=float, default=8.0, help="평균 수리 시간(시간)")
+    parser.add_argument("--order-interval", type=float, default=1.0, help="평균 주문 도착 간격(시간)")
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="test_db")
+    parser.add_argument("--collection", default="aas_documents")
+    parser.add_argument("--upload-dir", help="시뮬레이션 전에 업로드할 AAS JSON 디렉토리")
+    parser.add_argument("--records", help="재계획 기록 파일 (.csv, 열 기반 .parquet 또는 numpy 구조체 .rec)")
+    parser.add_argument("--checkpoint", default="des_checkpoint.bin", help="스냅샷 파일")
+    parser.add_argument("--checkpoint-every", type=float, help="스냅샷 간격(시뮬레이션 시간)")
+    parser.add_argument("--resume", action="store_true", help="스냅샷에서 이어서 돌린다")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    if args.resume and args.records and args.records.lower().endswith(".parquet"):
+        # Parquet은 footer를 닫을 때 쓰므로 체크포인트 offset으로 잘라 이어 쓸 수 없다
+        parser.error("--resume 은 .parquet 기록 파일과 함께 쓸 수 없습니다 (.csv 또는 .rec 를 쓰세요)")
+
+    logging.basicConfig()
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+    state = load_snapshot(args.checkpoint) if args.resume else None
+    sink = None
+    if args.records:
+        offset = state["sink_offset"] if state else None
+        sink = open_sink(args.records, PLAN_COLUMNS, string_width=256, resume_offset=offset)
+    try:
+        if state is not None:
+            sim = FaultSimulation.resume(state, sink)
+            logger.info("Resuming at %.1f h", sim.loop.now / HOUR)
+        else:
+            if args.upload_dir:
+                upload_aas_documents(args.upload_dir, args.mongo_uri, args.db, args.collection)
+            machines = load_machines_from_mongo(args.mongo_uri, args.db, args.collection)
+            sim = FaultSimulation(
+                machines, seed=args.seed, default_mtbf=args.mtbf, default_mttr=args.mttr,
+                order_interval=args.order_interval, sink=sink,
+            )
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, lambda *_: sim.request_checkpoint())
+        report = sim.run(args.hours, checkpoint_path=args.checkpoint, checkpoint_every=args.checkpoint_every)
+        print(json.dumps(report, indent=2))
+    finally:
+        if sink is not None:
+            sink.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""StatusEventServer 부하 시험.
+
+``aas/status/<machine>`` 이벤트 스트림(합성 또는 기록 파일)을
+:class:`fake_mqtt.FakeMQTTClient` 로 지정한 속도로 재생하고 다음을 보고한다.
+
+- 처리량: 초당 처리한 이벤트 수
+- 큐 대기 시간: 발행 → 서버 ``on_message`` 시작
+- 계획 반영 시간(time-to-new-plan): 발행 → 그 이벤트를 반영한 재계획 완료
+
+기록 파일은 한 줄에 ``{"machine": ..., "status": ..., "t": <초>}`` 형식의
+JSON이며 ``t`` 가 있으면 그 간격(``--speed`` 배속)으로 재생한다.
+
+예::
+
+    python event_load_test.py --machines 20000 --events 50000 --rate 5000
+"""
+
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import event_server
+from aas_pathfinder import Machine
+from fake_mqtt import Broker, FakeMQTTClient
+from sim_common import percentile, synthetic_fleet
+
+logger = logging.getLogger(__name__)
+
+Event = Tuple[Optional[float], str, str]  # (재생 시각 또는 None, machine, status)
+
+
+# ────────────────────────────────────────────────────────────
+def synthetic_events(names: Sequence[str], count: int, fault_ratio: float = 0.5, seed: int = 0) -> Iterator[Event]:
+    rng = random.Random(seed)
+    for _ in range(count):
+        status = "Fault" if rng.random() < fault_ratio else "Running"
+        yield None, rng.choice(names), status
+
+
+def recorded_events(path: str, speed: float = 1.0) -> Iterator[Event]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            rec = json.loads(line)
+            t = rec.get("t")
+            yield (t / speed if t is not None else None), rec["machine"], rec["status"]
+
+
+def _summary(values: List[float]) -> Dict[str, Optional[float]]:
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else None,
+    }
+
+
+# ────────────────────────────────────────────────────────────
+class _Probe:
+    """서버 메서드를 감싸 이벤트별 시각을 기록한다."""
+
+    def __init__(self, server: event_server.StatusEventServer, clock: Callable[[], float]):
+        self.server = server
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._received: List[float] = []   # 스케줄러에 들어갔지만 아직 반영 전
+        self._applied: List[float] = []    # 레지스트리에 반영, 재계획 대기
+        self.queue_delays: List[float] = []
+        self.plan_latencies: List[float] = []
+        self.handled = 0
+        self.noop = 0
+        self.last_handled = 0.0
+
+        on_message, replan, recalculate = server.on_message, server.replan, server.recalculate
+
+        def probed_on_message(client, userdata, msg):
+            now = self.clock()
+            payload = json.loads(msg.payload)
+            sent = payload["ts"]
+            count = len(payload["updates"]) if "updates" in payload else 1
+            with self._lock:
+                self.queue_delays.extend([now - sent] * count)
+                self._received.extend([sent] * count)
+            on_message(client, userdata, msg)
+            with self._lock:
+                self.handled += count
+                self.last_handled = self.clock()
+
+        def probed_replan(updates):
+            with self._lock:
+                batch, self._received = self._received, []
+            changed = replan(updates)
+            with self._lock:
+                if changed is False:
+                    # 상쇄되어 재계획이 필요 없던 이벤트
+                    self.noop += len(batch)
+                else:
+                    self._applied.extend(batch)
+            return changed
+
+        def probed_recalculate():
+            with self._lock:
+                batch, self._applied = self._applied, []
+            recalculate()
+            done = self.clock()
+            with self._lock:
+                self.plan_latencies.extend(done - sent for sent in batch)
+
+        server.mqtt.on_message = probed_on_message
+        server.scheduler.callback = probed_replan
+        server.recalculate = probed_recalculate
+
+
+def run_load_test(
+    events: Iterator[Event],
+    machines: Optional[Dict[str, Machine]] = None,
+    rate: float = 1000.0,
+    coalesce_window: float = 0.05,
+    max_delay: float = 0.5,
+    mongo_uri: str = "mongodb://localhost:27017",
+    db: str = "test_db",
+    col: str = "aas_documents",
+    timeout: float = 60.0,
+    batch_size: int = 1,
+) -> Dict[str, object]:
+    """이벤트를 재생하고 측정값을 돌려준다.
+
+    ``machines`` 를 주면 MongoDB 대신 그 fleet을 사용한다. ``rate`` 가 0이면
+    가능한 한 빨리 발행한다 (기록 파일의 ``t`` 가 있으면 그 시각을 따른다).
+    ``batch_size`` 가 1보다 크면 이벤트를 모아 배치 토픽
+    (:data:`event_server.BATCH_TOPIC`)으로 보낸다.
+    """
+    clock = time.perf_counter
+    broker = Broker()
+    server = event_server.StatusEventServer(
+        mongo_uri, db, col, "mqtt://localhost",
+        coalesce_window=coalesce_window, max_delay=max_delay, map_path=None,
+        persist_batches=machines is None,
+    )
+    server.mqtt = FakeMQTTClient(broker=broker)
+    server.mqtt.on_message = server.on_message
+    if machines is not None:
+        server.load_machines = lambda: machines
+    probe = _Probe(server, clock)
+
+    thread = threading.Thread(target=server.start, name="event-server", daemon=True)
+    thread.start()
+    while not server.mqtt._subscriptions:
+        time.sleep(0.001)
+    server.standby.wait(timeout)
+
+    publisher = FakeMQTTClient(broker=broker)
+    interval = 1.0 / rate if rate else 0.0
+    sent = 0
+    batch: List[Dict[str, str]] = []
+
+    def flush_batch():
+        payload = json.dumps({"updates": batch, "ts": clock()})
+        publisher.publish(event_server.BATCH_TOPIC, payload)
+        batch.clear()
+
+    start = clock()
+    for i, (at, machine, status) in enumerate(events):
+        due = start + (at if at is not None else i * interval)
+        wait = due - clock()
+        if wait > 0:
+            time.sleep(wait)
+        sent += 1
+        if batch_size > 1:
+            batch.append({"machine": machine, "status": status})
+            if len(batch) >= batch_size:
+                flush_batch()
+            continue
+        payload = json.dumps({"machine": machine, "status": status, "ts": clock()})
+        publisher.publish(f"aas/status/{machine}", payload)
+    if batch:
+        flush_batch()
+    publish_done = clock()
+
+    broker.drain(timeout=timeout)
+    server.scheduler.flush()
+    server.work_queue.join(timeout)
+    end = clock()
+    stats = server.scheduler.stats()
+    server.stop()
+    thread.join(timeout)
+
+    elapsed = max(probe.last_handled - start, 1e-9)
+    return {
+        "events": sent,
+        "handled": probe.handled,
+        "publish_seconds": publish_done - start,
+        "total_seconds": end - start,
+        "throughput_eps": probe.handled / elapsed,
+        "queue_delay": _summary(probe.queue_delays),
+        "time_to_plan": _summary(probe.plan_latencies),
+        "planned_events": len(probe.plan_latencies),
+        "noop_events": probe.noop,
+        "replans_run": stats["replans_run"],
+        "events_coalesced": stats["events_coalesced"],
+        "replan_jobs": dict(server.work_queue.counters),
+    }
+
+
+def _format_ms(summary: Dict[str, Optional[float]]) -> str:
+    return "  ".join(
+        f"{k}={v * 1000:.2f}ms" if v is not None else f"{k}=-" for k, v in summary.items()
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="StatusEventServer 부하 시험")
+    parser.add_argument("--machines", type=int, default=1000, help="합성 fleet 크기 (0이면 MongoDB 사용)")
+    parser.add_argument("--events", type=int, default=10000, help="합성 이벤트 수")
+    parser.add_argument("--replay", help="기록된 이벤트(JSONL) 파일")
+    parser.add_argument("--speed", type=float, default=1.0, help="기록 재생 배속")
+    parser.add_argument("--rate", type=float, default=1000.0, help="초당 발행 수 (0이면 최대 속도)")
+    parser.add_argument("--window", type=float, default=0.05, help="이벤트 병합 시간(초)")
+    parser.add_argument("--max-delay", type=float, default=0.5, help="병합 최대 지연(초)")
+    parser.add_argument("--batch-size", type=int, default=1, help="배치 메시지당 이벤트 수 (1이면 개별 토픽)")
+    parser.add_argument("--fault-ratio", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="test_db")
+    parser.add_argument("--collection", default="aas_documents")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if not args.verbose:
+        for name in ("event_server", "fleet_registry", "hot_standby", "__main__"):
+            logging.getLogger(name).setLevel(logging.WARNING)
+
+    fleet = synthetic_fleet(args.machines, args.seed) if args.machines else None
+    if args.replay:
+        events = recorded_events(args.replay, args.speed)
+    else:
+        if fleet is None:
+            fleet_names = list(event_server.load_machines_from_mongo(args.mongo_uri, args.db, args.collection))
+        else:
+            fleet_names = list(fleet)
+        events = synthetic_events(fleet_names, args.events, args.fault_ratio, args.seed)
+
+    report = run_load_test(
+        events, fleet, rate=args.rate, coalesce_window=args.window, max_delay=args.max_delay,
+        mongo_uri=args.mongo_uri, db=args.db, col=args.collection, batch_size=args.batch_size,
+    )
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"events        : {report['events']} sent, {report['handled']} handled")
+    print(f"throughput    : {report['throughput_eps']:.0f} events/s")
+    print(f"queue delay   : {_format_ms(report['queue_delay'])}")
+    print(f"time-to-plan  : {_format_ms(report['time_to_plan'])}")
+    print(f"replans       : {report['replans_run']} run, {report['events_coalesced']} events coalesced, "
+          f"{report['noop_events']} no-op events")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,92 @@
+import asyncio
 import json
 import logging
+import threading
+import time
 from urllib.parse import urlparse
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional, Set
 
-from pymongo import MongoClient
 import paho.mqtt.client as mqtt
 
 from aas_pathfinder import (
     load_machines_from_mongo,
-    build_graph_from_aas,
-    dijkstra_path,
     Machine,
 )
+from aas_async_loader import load_machines_async
+from fleet_registry import FleetRegistry, is_running
+from hot_standby import HotStandby
+from map_renderer import MapRenderer
+from mongo_connection import get_client
+from pymongo import UpdateOne
+from process_planner import Plan, Planner, replan_partial
+from replan_scheduler import ReplanScheduler
+from work_queue import WorkQueue
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 FLOW = ["Forging", "Turning", "Milling", "Grinding", "Assembly"]
 
+# 여러 머신의 상태를 한 메시지로 보내는 토픽.
+# payload: ``[{"machine": ..., "status": ...}, ...]`` 또는 ``{"updates": [...]}``
+BATCH_TOPIC = "aas/status-batch"
+
 class StatusEventServer:
-    def __init__(self, mongo_uri: str, db: str, col: str, broker_url: str):
+    def __init__(
+        self,
+        mongo_uri: str,
+        db: str,
+        col: str,
+        broker_url: str,
+        async_load: bool = True,
+        coalesce_window: float = 0.5,
+        max_delay: float = 2.0,
+        replan_deadline: Optional[float] = None,
+        map_path: Optional[str] = "process_flow.html",
+        map_interval: float = 1.0,
+        persist_batches: bool = True,
+        resync_interval: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
         self.mongo_uri = mongo_uri
         self.db = db
         self.col = col
         self.broker_url = broker_url
+        # 큰 fleet에서는 조회/파싱/지오코딩을 겹쳐 수행하는 asyncio 로더 사용
+        self.async_load = async_load
+        # 재계획 결과 지도 (None이면 저장하지 않음), 최대 map_interval 초에 한 번 갱신
+        self.map_path = map_path
+        self.map_renderer = MapRenderer(map_path, min_interval=map_interval) if map_path else None
+        # 배치 메시지의 상태를 DB에도 한 번의 bulk write로 기록할지 여부.
+        # MQTT 콜백에서는 모아 두기만 하고, 스케줄러가 재계획할 때 함께 기록한다
+        self.persist_batches = persist_batches
+        self._persist: Dict[str, str] = {}
+        self._persist_lock = threading.Lock()
+        # 시작 시 한 번 적재하고 이후에는 상태 이벤트를 변경분으로 반영한다.
+        # 스케줄러 스레드와 재계획 워커가 모두 접근하므로 잠금 안에서 만든다
+        self._registry: Optional[FleetRegistry] = None
+        self._registry_lock = threading.Lock()
+        # 모르는 머신 이름이 오면 fleet을 다시 적재하되 resync_interval 초에 한 번
+        # 이하로만 하고, 다시 적재한 뒤에도 없는 이름(지오코딩 실패, 잘못된
+        # 토픽 등)은 기억해 두고 더 이상 재적재를 일으키지 않는다
+        self.resync_interval = resync_interval
+        self.clock = clock
+        self._last_resync: Optional[float] = None
+        self._missing: Set[str] = set()
+        # 현재 계획과 마지막 재계획 이후 상태가 바뀐 머신
+        self.plan: Optional[Plan] = None
+        self._changed: Set[str] = set()
+        self._plan_lock = threading.Lock()
+        # 현재 계획의 단일 고장 대비 계획 (백그라운드 계산)
+        self.standby = HotStandby()
+        # 같은 레지스트리 버전에 대한 반복 요청(지도 갱신 등)은 캐시로 답한다
+        self.planner = Planner()
+        # 몰려 들어오는 이벤트는 모아서 한 번만 재계획한다
+        self.scheduler = ReplanScheduler(self.replan, window=coalesce_window, max_delay=max_delay)
+        # 재계획은 워커 스레드에서 실행해 MQTT 루프를 막지 않는다.
+        # 대기 중인 재계획은 최신 것 하나만 남긴다 (실행 시점의 레지스트리를 읽으므로 충분)
+        self.replan_deadline = replan_deadline
+        self.work_queue = WorkQueue(maxsize=4, policy="latest_wins", name="replan")
         self.mqtt = mqtt.Client()
         self.mqtt.on_message = self.on_message
 
@@ -34,7 +97,26 @@ class StatusEventServer:
         port = parsed.port or 1883
         self.mqtt.connect(host, port)
         self.mqtt.subscribe("aas/status/#")
-        self.mqtt.loop_forever()
+        self.mqtt.subscribe(BATCH_TOPIC)
+        # 이벤트를 받기 전에 fleet을 적재하고 초기 계획을 세운다
+        self.recalculate()
+        self.scheduler.start()
+        try:
+            self.mqtt.loop_forever()
+        finally:
+            self.shutdown()
+
+    def stop(self) -> None:
+        """MQTT 루프를 끝낸다. ``start`` 는 정리 후 반환한다."""
+        self.mqtt.disconnect()
+
+    def shutdown(self) -> None:
+        """남은 이벤트를 반영하고 대기 중인 재계획을 마친 뒤 종료한다."""
+        self.scheduler.stop()
+        self.work_queue.shutdown(wait=True)
+        self.standby.shutdown()
+        if self.map_renderer is not None:
+            self.map_renderer.close()
 
     # ────────────────────────────────────────────────────────────
     def on_message(self, client, userdata, msg):
@@ -43,71 +125,256 @@ class StatusEventServer:
         except Exception:
             logger.warning("Invalid message payload: %s", msg.payload)
             return
-        logger.info("Received event for %s → %s", payload.get("machine"), payload.get("status"))
-        self.recalculate()
+        if getattr(msg, "topic", None) == BATCH_TOPIC:
+            self.on_batch(payload)
+            return
+        machine, status = payload.get("machine"), payload.get("status")
+        logger.info("Received event for %s → %s", machine, status)
+        self.scheduler.submit(machine, status)
+
+    def on_batch(self, payload) -> None:
+        """배치 메시지: 스케줄러에 한 번에 넣는다. DB 기록은 :meth:`replan` 에서 한다."""
+        updates = parse_status_batch(payload)
+        if not updates:
+            logger.warning("Empty or invalid status batch")
+            return
+        logger.info("Received status batch with %d machines", len(updates))
+        if self.persist_batches:
+            with self._persist_lock:
+                self._persist.update(updates)
+        self.scheduler.submit_many(updates)
+
+    def persist_pending(self) -> List[str]:
+        """모아 둔 배치 상태를 조회 한 번, ``bulk_write`` 한 번으로 DB에 기록한다.
+
+        실패하면 다음 호출에서 다시 시도한다 (그 사이 들어온 새 상태가 우선).
+        """
+        with self._persist_lock:
+            updates, self._persist = self._persist, {}
+        if not updates:
+            return []
+        try:
+            return set_machine_statuses(updates, self.mongo_uri, self.db, self.col)
+        except Exception:
+            logger.exception("Failed to persist %d machine status(es)", len(updates))
+            with self._persist_lock:
+                for machine, status in updates.items():
+                    self._persist.setdefault(machine, status)
+            return []
+
+    def replan(self, updates: Dict[str, str]) -> bool:
+        """모인 이벤트의 최종 상태를 반영하고 재계획 작업을 큐에 넣는다.
+
+        레지스트리 반영은 변경 크기에 비례하므로 바로 수행한다. 이벤트가 모두
+        상쇄되어 레지스트리가 바뀌지 않았으면 건너뛴다. 스케줄러 스레드에서
+        호출되므로 모아 둔 배치 상태의 DB 기록도 여기서 한다.
+        """
+        self.persist_pending()
+        changed = self.apply_events(updates)
+        if updates and not changed:
+            logger.info("No net status change in %d events, skipping replan", len(updates))
+            return False
+        self.work_queue.submit(self.recalculate, key="replan", timeout=self.replan_deadline)
+        return True
+
+    # ────────────────────────────────────────────────────────────
+    @property
+    def registry(self) -> FleetRegistry:
+        registry = self._registry
+        if registry is None:
+            with self._registry_lock:
+                registry = self._registry
+                if registry is None:
+                    registry = self._registry = FleetRegistry(self.load_machines())
+                    self._last_resync = self.clock()
+        return registry
+
+    def restore(self, machines: Dict[str, Machine], version: int, plan: Optional[Plan]) -> None:
+        """저장해 둔 fleet 상태와 계획으로 되살린다 (MongoDB를 다시 읽지 않는다)."""
+        registry = FleetRegistry(machines)
+        registry.version = version
+        with self._registry_lock:
+            self._registry = registry
+            self._last_resync = self.clock()
+            self._missing = set()
+        with self._plan_lock:
+            self._changed = set()
+            self.planner.clear()
+            self.plan = plan
+            if plan is not None:
+                self.standby.refresh(plan, registry.running_by_process(), version)
+
+    def apply_event(self, machine: str, status: str) -> bool:
+        """상태 이벤트 하나를 레지스트리에 반영한다."""
+        return bool(self.apply_events({machine: status}))
+
+    def apply_events(self, updates: Dict[str, str]) -> List[str]:
+        """상태 변경을 레지스트리에 한 번에 반영하고 바뀐 머신을 반환한다.
+
+        처음 보는 모르는 머신이 있으면 fleet을 다시 적재한다
+        (:meth:`_resync`). 그래도 없는 머신의 이벤트는 건너뛴다.
+        """
+        registry = self.registry
+        unknown = [m for m in updates if m not in registry]
+        if unknown:
+            if any(m not in self._missing for m in unknown):
+                self._resync(unknown)
+            skipped = [m for m in unknown if m not in registry]
+            if skipped:
+                logger.info("Ignoring status for unknown machine %s", ", ".join(skipped[:5]))
+                updates = {m: s for m, s in updates.items() if m in registry}
+        changed = registry.apply_statuses(updates)
+        if changed:
+            with self._plan_lock:
+                self._changed.update(changed)
+        return changed
+
+    def _resync(self, unknown: List[str]) -> bool:
+        """fleet을 다시 적재한다 (``resync_interval`` 초에 한 번 이하). 적재했으면 ``True``."""
+        now = self.clock()
+        if self._last_resync is not None and now - self._last_resync < self.resync_interval:
+            return False
+        logger.info("Unknown machine %s, reloading fleet", ", ".join(unknown[:5]))
+        self._last_resync = now
+        registry = self.registry
+        registry.replace_all(self.load_machines())
+        self._missing = {m for m in unknown if m not in registry}
+        with self._plan_lock:
+            self.planner.clear()
+            self.plan = None  # 전체가 다시 적재되었으므로 처음부터 계획한다
+        return True
+
+    # ────────────────────────────────────────────────────────────
+    def load_machines(self) -> Dict[str, Machine]:
+        if self.async_load:
+            return asyncio.run(load_machines_async(self.mongo_uri, self.db, self.col))
+        return load_machines_from_mongo(self.mongo_uri, self.db, self.col)
 
     # ────────────────────────────────────────────────────────────
     def recalculate(self):
-        machines = load_machines_from_mongo(self.mongo_uri, self.db, self.col)
-        running = {n: m for n, m in machines.items() if m.status.lower() == "running"}
-        if not running:
-            logger.info("No running machines available")
-            return
-        by_process: Dict[str, List[Machine]] = {}
-        for m in running.values():
-            by_process.setdefault(m.process, []).append(m)
-        selected: List[Machine] = []
-        for step in FLOW:
-            cand = by_process.get(step, [])
-            if not cand:
-                continue
-            if not selected:
-                chosen = cand[0]
+        """현재 레지스트리로 계획을 갱신한다.
+
+        이전 계획이 있으면 마지막 재계획 이후 바뀐 머신이 영향을 주는 단계만
+        다시 고른다 (:func:`process_planner.replan_partial`).
+        """
+        with self._plan_lock:
+            changed, self._changed = self._changed, set()
+            registry = self.registry
+            version, by_process = registry.snapshot()
+            if not by_process:
+                logger.info("No running machines available")
+                self.plan = None
+                return
+            if self.plan is None:
+                self.plan = self.planner.plan(by_process, FLOW, version=version)
+                self.standby.refresh(self.plan, by_process, version)
             else:
-                prev = selected[-1]
-                chosen = min(cand, key=lambda m: dijkstra_path(build_graph_from_aas({prev.name: prev.coords, m.name: m.coords}), prev.name, m.name)[1])
-            selected.append(chosen)
+                machines = [m for m in (registry.get(n) for n in changed) if m is not None]
+                diff = None
+                if len(machines) == 1 and not is_running(machines[0].status):
+                    # 단일 고장은 미리 계산해 둔 대체 계획으로 바로 답한다
+                    diff = self.standby.lookup(machines[0].name, self.plan, version)
+                    if diff is not None:
+                        logger.info("Using standby plan for %s", machines[0].name)
+                if diff is None:
+                    diff = replan_partial(self.plan, by_process, machines)
+                if not diff:
+                    logger.info("Plan unchanged")
+                    # 후보가 바뀌었을 수 있으므로 대체 계획 표는 갱신한다
+                    self.standby.refresh(self.plan, by_process, version, {m.process for m in machines})
+                    return
+                for change in diff.changes:
+                    logger.info(
+                        "%s: %s → %s", change.process,
+                        change.old.name if change.old else None,
+                        change.new.name if change.new else None,
+                    )
+                self.plan = diff.plan
+                self.planner.store(self.plan, version)
+                self.standby.refresh(self.plan, by_process, version, {m.process for m in machines})
+            plan = self.plan
 
-        coords = {m.name: m.coords for m in selected}
-        graph = build_graph_from_aas(coords)
+        selected = plan.machines
         total = 0.0
-        for a, b in zip(selected, selected[1:]):
-            path, dist = dijkstra_path(graph, a.name, b.name)
+        for a, b, dist in plan.legs():
             total += dist
             logger.info("%s → %s: %.1f km", a.name, b.name, dist)
         logger.info("Total distance: %.1f km", total)
-        try:
-            import folium
-            m = folium.Map(location=selected[0].coords, zoom_start=5)
-            prev = None
-            for mach in selected:
-                folium.Marker(location=mach.coords, popup=f"{mach.name} ({mach.process})").add_to(m)
-                if prev:
-                    folium.PolyLine([prev, mach.coords], color="blue").add_to(m)
-                prev = mach.coords
-            m.save("process_flow.html")
-            logger.info("Updated process_flow.html")
-        except Exception as exc:
-            logger.info("folium not available: %s", exc)
+        if self.map_renderer is not None:
+            # 지도는 백그라운드에서 그리므로 재계획 지연에 포함되지 않는다
+            self.map_renderer.submit(selected)
 
 # ────────────────────────────────────────────────────────────
-def mark_as_fault(machine_name: str, mongo_uri: str, db: str, col: str) -> None:
-    client = MongoClient(mongo_uri)
-    collection = client[db][col]
-    doc = collection.find_one({"filename": f"{machine_name}.json"})
-    if not doc:
-        logger.warning("Machine %s not found in DB", machine_name)
-        return
-    aas = doc.get("json", {})
-    updated = False
-    for sm in aas.get("submodels", []):
-        if sm.get("id", "").endswith(f"Operation_{machine_name}"):
-            for elem in sm.get("submodelElements", []):
+def _status_field_paths(aas: Dict, machine_name: str) -> List[str]:
+    """Operation_<machine> 서브모델의 MachineStatus 값 위치를 점 경로로 찾는다.
+
+    업로드된 문서는 Submodel이 AAS 내부로 합쳐져 있고, 원본 형태는 최상위
+    ``submodels`` 에 있으므로 두 위치를 모두 확인한다.
+    """
+    containers = [("json.submodels", aas.get("submodels", []))]
+    for i, shell in enumerate(aas.get("assetAdministrationShells", [])):
+        containers.append((f"json.assetAdministrationShells.{i}.submodels", shell.get("submodels", [])))
+    paths = []
+    for prefix, submodels in containers:
+        for j, sm in enumerate(submodels):
+            if not isinstance(sm, dict) or not sm.get("id", "").endswith(f"Operation_{machine_name}"):
+                continue
+            for k, elem in enumerate(sm.get("submodelElements", [])):
                 if elem.get("idShort") == "MachineStatus":
-                    elem["value"] = "Fault"
-                    updated = True
-    if updated:
-        collection.replace_one({"filename": f"{machine_name}.json"}, {"filename": f"{machine_name}.json", "json": aas, "raw": json.dumps(aas)}, upsert=True)
-        logger.info("Updated status of %s to Fault", machine_name)
-    else:
-        logger.warning("MachineStatus not found for %s", machine_name)
+                    paths.append(f"{prefix}.{j}.submodelElements.{k}.value")
+    return paths
+
+
+def parse_status_batch(payload) -> Dict[str, str]:
+    """배치 payload를 ``{machine: status}`` 로 바꾼다 (같은 머신은 마지막 값)."""
+    items = payload.get("updates") if isinstance(payload, dict) else payload
+    updates: Dict[str, str] = {}
+    for item in items or []:
+        if isinstance(item, dict) and item.get("machine") and item.get("status"):
+            updates[item["machine"]] = item["status"]
+    return updates
+
+
+def encode_status_batch(updates: Dict[str, str]) -> str:
+    return json.dumps([{"machine": m, "status": s} for m, s in updates.items()])
+
+
+def set_machine_statuses(updates: Dict[str, str], mongo_uri: str, db: str, col: str) -> List[str]:
+    """여러 머신의 MachineStatus를 조회 한 번, ``bulk_write`` 한 번으로 갱신한다.
+
+    갱신한 머신 이름을 반환한다.
+    """
+    if not updates:
+        return []
+    collection = get_client(mongo_uri)[db][col]
+    by_file = {f"{name}.json": name for name in updates}
+    docs = collection.find({"filename": {"$in": list(by_file)}}, {"filename": 1, "json": 1})
+    requests = []
+    updated = []
+    for doc in docs:
+        name = by_file.get(doc.get("filename"))
+        if name is None:
+            continue
+        paths = _status_field_paths(doc.get("json", {}), name)
+        if not paths:
+            logger.warning("MachineStatus not found for %s", name)
+            continue
+        requests.append(UpdateOne({"filename": doc["filename"]}, {"$set": {p: updates[name] for p in paths}}))
+        updated.append(name)
+    missing = len(updates) - len(updated)
+    if missing:
+        logger.warning("%d machine(s) not updated in DB", missing)
+    if requests:
+        collection.bulk_write(requests, ordered=False)
+    for name in updated:
+        logger.info("Updated status of %s to %s", name, updates[name])
+    return updated
+
+
+def set_machine_status(machine_name: str, status: str, mongo_uri: str, db: str, col: str) -> bool:
+    """MachineStatus 필드만 ``$set`` 으로 갱신한다. 성공 여부를 반환."""
+    return bool(set_machine_statuses({machine_name: status}, mongo_uri, db, col))
+
+
+def mark_as_fault(machine_name: str, mongo_uri: str, db: str, col: str) -> None:
+    set_machine_status(machine_name, "Fault", mongo_uri, db, col)
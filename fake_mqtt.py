@@ -0,0 +1,230 @@
+"""로컬 시뮬레이션/부하 시험용 MQTT 브로커와 클라이언트 대역.
+
+- 구독은 토픽 트라이에 저장하므로 발행 시 매칭 비용은 구독 수가 아니라
+  토픽 깊이에 비례한다. ``+`` (한 단계)와 ``#`` (나머지 전체, 0단계 포함)
+  와일드카드를 지원한다.
+- 메시지는 미리 정의한 :class:`MQTTMessage` 객체 하나를 발행당 한 번 만들어
+  모든 구독자가 공유한다.
+- 각 클라이언트는 자기 수신 큐를 가지며, paho와 같이 ``loop_forever`` /
+  ``loop_start`` 를 돌리는 스레드에서 ``on_message`` 가 호출된다. 발행자는
+  구독자의 처리 속도와 관계없이 바로 반환한다.
+"""
+
+import itertools
+import logging
+import queue
+import threading
+import time
+import weakref
+from typing import Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class MQTTMessage:
+    __slots__ = ("topic", "payload", "qos", "retain", "mid")
+
+    def __init__(self, topic: str, payload: bytes, qos: int = 0, retain: bool = False, mid: int = 0):
+        self.topic = topic
+        self.payload = payload
+        self.qos = qos
+        self.retain = retain
+        self.mid = mid
+
+
+class _TrieNode:
+    __slots__ = ("children", "clients")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.clients: Set["FakeMQTTClient"] = set()
+
+
+class TopicTrie:
+    """토픽 필터 → 구독자 집합."""
+
+    def __init__(self):
+        self.root = _TrieNode()
+        self._lock = threading.Lock()
+
+    def add(self, topic_filter: str, client) -> None:
+        with self._lock:
+            node = self.root
+            for level in topic_filter.split("/"):
+                node = node.children.setdefault(level, _TrieNode())
+            node.clients.add(client)
+
+    def remove(self, topic_filter: str, client) -> None:
+        with self._lock:
+            path = [self.root]
+            for level in topic_filter.split("/"):
+                node = path[-1].children.get(level)
+                if node is None:
+                    return
+                path.append(node)
+            path[-1].clients.discard(client)
+            # 빈 가지는 정리한다
+            levels = topic_filter.split("/")
+            for depth in range(len(levels), 0, -1):
+                node = path[depth]
+                if node.clients or node.children:
+                    break
+                del path[depth - 1].children[levels[depth - 1]]
+
+    def match(self, topic: str) -> Set:
+        levels = topic.split("/")
+        result: Set = set()
+        with self._lock:
+            nodes = [self.root]
+            for depth, level in enumerate(levels):
+                nxt: List[_TrieNode] = []
+                # ``$`` 로 시작하는 토픽은 최상위 와일드카드와 매칭하지 않는다
+                wild = depth > 0 or not level.startswith("$")
+                for node in nodes:
+                    if wild:
+                        multi = node.children.get("#")
+                        if multi is not None:
+                            result |= multi.clients
+                        single = node.children.get("+")
+                        if single is not None:
+                            nxt.append(single)
+                    exact = node.children.get(level)
+                    if exact is not None:
+                        nxt.append(exact)
+                nodes = nxt
+                if not nodes:
+                    return result
+            for node in nodes:
+                result |= node.clients
+                # ``a/#`` 는 ``a`` 자체와도 매칭한다
+                multi = node.children.get("#")
+                if multi is not None:
+                    result |= multi.clients
+        return result
+
+
+class Broker:
+    def __init__(self):
+        self.trie = TopicTrie()
+        self._mid = itertools.count(1)
+        self.published = 0
+        self.delivered = 0
+
+    def subscribe(self, topic_filter: str, client) -> None:
+        self.trie.add(topic_filter, client)
+
+    def unsubscribe(self, topic_filter: str, client) -> None:
+        self.trie.remove(topic_filter, client)
+
+    def publish(self, topic: str, payload, qos: int = 0, retain: bool = False) -> MQTTMessage:
+        if isinstance(payload, str):
+            payload = payload.encode()
+        elif payload is None:
+            payload = b""
+        msg = MQTTMessage(topic, payload, qos, retain, next(self._mid))
+        clients = self.trie.match(topic)
+        self.published += 1
+        self.delivered += len(clients)
+        for client in clients:
+            client._inbox.put(msg)
+        return msg
+
+    def drain(self, clients=None, timeout: Optional[float] = None) -> bool:
+        """구독자들이 받은 메시지를 모두 처리할 때까지 기다린다."""
+        if clients is None:
+            clients = FakeMQTTClient._instances(self)
+        return all(client.wait_idle(timeout) for client in clients)
+
+
+BROKER = Broker()
+
+
+class FakeMQTTClient:
+    """``paho.mqtt.client.Client`` 중 시뮬레이션에 쓰는 부분만 흉내 낸다."""
+
+    _registry: "weakref.WeakSet[FakeMQTTClient]" = weakref.WeakSet()
+    _registry_lock = threading.Lock()
+
+    def __init__(self, *_, broker: Optional[Broker] = None, **__):
+        self.broker = broker or BROKER
+        self.on_message = None
+        self._inbox: "queue.Queue" = queue.Queue()
+        self._subscriptions: Set[str] = set()
+        self._thread: Optional[threading.Thread] = None
+        self._mid = itertools.count(1)
+        with FakeMQTTClient._registry_lock:
+            FakeMQTTClient._registry.add(self)
+
+    @classmethod
+    def _instances(cls, broker: Broker) -> List["FakeMQTTClient"]:
+        with cls._registry_lock:
+            return [c for c in cls._registry if c.broker is broker]
+
+    def connect(self, host, port=1883, keepalive=60):
+        return 0
+
+    def disconnect(self):
+        for topic in list(self._subscriptions):
+            self.unsubscribe(topic)
+        self._inbox.put(_STOP)
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+            self._thread = None
+        with FakeMQTTClient._registry_lock:
+            FakeMQTTClient._registry.discard(self)
+        return 0
+
+    def subscribe(self, topic, qos=0):
+        self._subscriptions.add(topic)
+        self.broker.subscribe(topic, self)
+        return (0, next(self._mid))
+
+    def unsubscribe(self, topic):
+        self._subscriptions.discard(topic)
+        self.broker.unsubscribe(topic, self)
+        return (0, next(self._mid))
+
+    def publish(self, topic, payload=None, qos=0, retain=False):
+        self.broker.publish(topic, payload, qos, retain)
+        return (0, next(self._mid))
+
+    # ────────────────────────────────────────────────────────────
+    def loop_forever(self):
+        """``disconnect`` 될 때까지 현재 스레드에서 메시지를 처리한다."""
+        while True:
+            msg = self._inbox.get()
+            try:
+                if msg is _STOP:
+                    return
+                if self.on_message:
+                    self.on_message(self, None, msg)
+            except Exception:
+                # paho와 같이 콜백 예외로 루프가 멈추지 않게 한다
+                logger.exception("on_message failed for %s", msg.topic)
+            finally:
+                self._inbox.task_done()
+
+    def loop_start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.loop_forever, name="fake-mqtt", daemon=True)
+            self._thread.start()
+
+    def loop_stop(self):
+        if self._thread is not None:
+            self._inbox.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """받은 메시지를 모두 처리할 때까지 기다린다. 시간 초과면 ``False``."""
+        end = None if timeout is None else time.monotonic() + timeout
+        inbox = self._inbox
+        with inbox.all_tasks_done:
+            while inbox.unfinished_tasks:
+                remaining = None if end is None else end - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                inbox.all_tasks_done.wait(remaining)
+        return True
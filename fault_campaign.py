@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""몬테카를로 고장 주입 캠페인.
+
+``run_simulation`` 은 머신 하나를 한 번 고장 내 본다. 공급망 회복력을
+보려면 여러 머신이 동시에 멈추는 무작위 시나리오 수천 개가 필요하다.
+
+- 머신은 공정별 고장 확률(``FaultModel.process_rates``)로 독립적으로 멈추고,
+  같은 좌표(같은 주소)를 공유하는 머신들은 사이트 단위로 함께 멈출 수 있다
+  (``site_outage_rate``).
+- fleet과 공정별 후보는 부모에서 한 번 만들어 워커마다 한 번만
+  넘기고(읽기 전용, 머신 수에 비례), 시나리오는 ``(seed, 번호)`` 에서
+  유도한 독립 시드로 프로세스 풀에서 돌린다.
+- 시나리오 결과(계획 비용 증가, 도달 불가 단계, 재계획 시간)는 끝나는
+  대로 흘려보내 :class:`CampaignReport` 에 누적한다.
+
+기준 계획은 :func:`process_planner.plan_greedy`, 시나리오별 재계획은
+:func:`process_planner.replan_partial` 로 하며 고장으로 선택이 바뀐 단계부터만
+다시 고른다.
+
+예::
+
+    python fault_campaign.py --scenarios 5000 --fault-rate Turning=0.1 --site-outage 0.02
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from aas_pathfinder import Machine
+from fleet_registry import is_running
+from process_planner import FLOW, Plan, plan_greedy, replan_partial
+from sim_common import percentile
+
+logger = logging.getLogger(__name__)
+
+# ────────────────────────────────────────────────────────────
+@dataclass(frozen=True)
+class FaultModel:
+    """시나리오마다 머신/사이트가 멈출 확률."""
+
+    default_rate: float = 0.02
+    process_rates: Dict[str, float] = field(default_factory=dict)
+    site_outage_rate: float = 0.0
+
+    def rate(self, process: str) -> float:
+        return self.process_rates.get(process, self.default_rate)
+
+
+@dataclass(frozen=True)
+class CampaignFleet:
+    """워커들이 공유하는 읽기 전용 fleet.
+
+    크기는 머신 수에 비례한다 (거리는 재계획이 실제로 보는 후보에 대해서만
+    계산하므로 거리표를 미리 만들거나 워커에 넘기지 않는다).
+    """
+
+    machines: Tuple[Machine, ...]
+    flow: Tuple[str, ...]
+    by_process: Dict[str, Tuple[Machine, ...]]  # 공정별 가동 중인 후보 (적재 순서)
+    sites: Tuple[Tuple[int, ...], ...]          # 같은 위치를 공유하는 머신 번호 묶음
+
+
+def build_fleet(machines: Iterable[Machine], flow: Sequence[str] = FLOW, site_precision: int = 4) -> CampaignFleet:
+    """공정별 후보와 사이트를 미리 계산한다.
+
+    사이트는 좌표를 ``site_precision`` 자리에서 반올림해 묶는다 (같은 주소는
+    같은 좌표로 지오코딩된다).
+    """
+    machines = tuple(machines)
+    by_process = {
+        step: tuple(m for m in machines if m.process == step and is_running(m.status))
+        for step in flow
+    }
+    by_site: Dict[Tuple[float, float], List[int]] = {}
+    for i, m in enumerate(machines):
+        key = (round(m.coords[0], site_precision), round(m.coords[1], site_precision))
+        by_site.setdefault(key, []).append(i)
+    return CampaignFleet(machines, tuple(flow), by_process, tuple(tuple(s) for s in by_site.values()))
+
+
+# ────────────────────────────────────────────────────────────
+def available(fleet: CampaignFleet, down: Set[int] = frozenset()) -> Dict[str, Sequence[Machine]]:
+    """``down`` 을 뺀 공정별 후보."""
+    if not down:
+        return fleet.by_process
+    names = {fleet.machines[i].name for i in down}
+    return {step: [m for m in candidates if m.name not in names] for step, candidates in fleet.by_process.items()}
+
+
+def base_plan(fleet: CampaignFleet) -> Plan:
+    return plan_greedy(fleet.by_process, fleet.flow)
+
+
+def replan(fleet: CampaignFleet, base: Plan, down: Set[int]) -> Plan:
+    """``base`` 에서 멈춘 머신이 선택된 단계부터만 다시 고른다 (:func:`process_planner.replan_partial`).
+
+    선택되지 않은 후보가 멈추는 것은 최근접 선택을 바꾸지 않으므로 선택된
+    머신만 변경으로 넘긴다.
+    """
+    selected = [fleet.machines[i] for i in down if base.position(fleet.machines[i].name) is not None]
+    if not selected:
+        return base
+    return replan_partial(base, available(fleet, down), selected).plan
+
+
+def scenario_seed(seed: int, index: int) -> int:
+    """캠페인 시드와 시나리오 번호에서 독립적인 64비트 시드를 유도한다."""
+    digest = hashlib.blake2b(f"{seed}:{index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def sample_faults(fleet: CampaignFleet, model: FaultModel, rng: random.Random) -> Tuple[Set[int], int]:
+    """멈출 머신 집합과 정전된 사이트 수."""
+    down: Set[int] = set()
+    sites_down = 0
+    if model.site_outage_rate > 0:
+        for site in fleet.sites:
+            if rng.random() < model.site_outage_rate:
+                down.update(site)
+                sites_down += 1
+    for i, m in enumerate(fleet.machines):
+        if i not in down and rng.random() < model.rate(m.process):
+            down.add(i)
+    return down, sites_down
+
+
+def run_scenario(fleet: CampaignFleet, model: FaultModel, base: Plan, index: int, seed: int) -> Dict[str, Any]:
+    rng = random.Random(scenario_seed(seed, index))
+    down, sites_down = sample_faults(fleet, model, rng)
+    started = time.perf_counter()
+    plan = replan(fleet, base, down)
+    replan_ms = (time.perf_counter() - started) * 1000.0
+    pairs = list(zip(base.stages, plan.stages))
+    cost = plan.total_distance
+    return {
+        "scenario": index,
+        "faults": len(down),
+        "sites_down": sites_down,
+        "changed_stages": sum(1 for a, b in pairs if (a and a.name) != (b and b.name)),
+        "unreachable_stages": [fleet.flow[i] for i, (a, b) in enumerate(pairs) if a is not None and b is None],
+        "cost_km": cost,
+        "cost_increase_km": cost - base.total_distance,
+        "replan_ms": replan_ms,
+    }
+
+
+# ────────────────────────────────────────────────────────────
+# 워커 프로세스 상태 (initializer 에서 한 번 설정)
+_WORKER: Optional[Tuple[CampaignFleet, FaultModel, Plan, int]] = None
+
+
+def _init_worker(fleet: CampaignFleet, model: FaultModel, base: Plan, seed: int) -> None:
+    global _WORKER
+    _WORKER = (fleet, model, base, seed)
+
+
+def _worker_scenario(index: int) -> Dict[str, Any]:
+    fleet, model, base, seed = _WORKER
+    return run_scenario(fleet, model, base, index, seed)
+
+
+class CampaignReport:
+    """시나리오 결과를 흘려받아 집계한다.
+
+    비용 증가 통계는 모든 단계에 도달 가능한 시나리오만 대상으로 한다
+    (도달 불가 단계가 있으면 구간이 빠져 비용이 오히려 줄어든다).
+    """
+
+    def __init__(self, flow: Sequence[str], base_cost: float):
+        self.flow = tuple(flow)
+        self.base_cost = base_cost
+        self.scenarios = 0
+        self.faults = 0
+        self.sites_down = 0
+        self.disrupted = 0
+        self.unreachable = 0
+        self.unreachable_by_stage: Counter = Counter()
+        self.cost_increases: List[float] = []
+        self.replan_ms: List[float] = []
+
+    def add(self, result: Dict[str, Any]) -> None:
+        self.scenarios += 1
+        self.faults += result["faults"]
+        self.sites_down += result["sites_down"]
+        self.replan_ms.append(result["replan_ms"])
+        if result["changed_stages"]:
+            self.disrupted += 1
+        if result["unreachable_stages"]:
+            self.unreachable += 1
+            self.unreachable_by_stage.update(result["unreachable_stages"])
+        else:
+            self.cost_increases.append(result["cost_increase_km"])
+
+    def summary(self) -> Dict[str, Any]:
+        n = self.scenarios or 1
+        costs = self.cost_increases
+        return {
+            "scenarios": self.scenarios,
+            "base_cost_km": self.base_cost,
+            "mean_faults": self.faults / n,
+            "mean_sites_down": self.sites_down / n,
+            "disrupted_ratio": self.disrupted / n,
+            "unreachable_ratio": self.unreachable / n,
+            "unreachable_by_stage": {step: self.unreachable_by_stage.get(step, 0) for step in self.flow},
+            "cost_increase_km": {
+                "mean": sum(costs) / len(costs) if costs else None,
+                "p50": percentile(costs, 50),
+                "p95": percentile(costs, 95),
+                "max": max(costs) if costs else None,
+            },
+            "replan_ms": {
+                "p50": percentile(self.replan_ms, 50),
+                "p95": percentile(self.replan_ms, 95),
+                "max": max(self.replan_ms) if self.replan_ms else None,
+            },
+        }
+
+
+def iter_scenarios(
+    fleet: CampaignFleet,
+    scenarios: int,
+    model: FaultModel,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    chunksize: int = 64,
+) -> Iterator[Dict[str, Any]]:
+    """시나리오 결과를 번호 순서대로 내보낸다. ``workers`` 가 1 이하이면 현재 프로세스에서 돈다."""
+    base = base_plan(fleet)
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    if workers <= 1:
+        for index in range(scenarios):
+            yield run_scenario(fleet, model, base, index, seed)
+        return
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(fleet, model, base, seed)) as pool:
+        yield from pool.map(_worker_scenario, range(scenarios), chunksize=chunksize)
+
+
+def run_campaign(
+    machines: Iterable[Machine],
+    scenarios: int = 1000,
+    model: Optional[FaultModel] = None,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    chunksize: int = 64,
+    flow: Sequence[str] = FLOW,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """캠페인을 돌리고 집계 보고서를 돌려준다. ``on_result`` 는 시나리오마다 호출된다."""
+    model = model or FaultModel()
+    fleet = build_fleet(machines, flow)
+    report = CampaignReport(fleet.flow, base_plan(fleet).total_distance)
+    started = time.perf_counter()
+    for result in iter_scenarios(fleet, scenarios, model, seed, workers, chunksize):
+        report.add(result)
+        if on_result is not None:
+            on_result(result)
+    summary = report.summary()
+    summary["elapsed_seconds"] = time.perf_counter() - started
+    return summary
+
+
+def _parse_rates(values: Sequence[str]) -> Dict[str, float]:
+    rates = {}
+    for value in values:
+        process, _, rate = value.partition("=")
+        if not rate:
+            raise argparse.ArgumentTypeError(f"공정=확률 형식이어야 합니다: {value}")
+        rates[process] = float(rate)
+    return rates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="몬테카를로 고장 주입 캠페인")
+    parser.add_argument("--scenarios", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수, 1이면 단일 프로세스)")
+    parser.add_argument("--chunksize", type=int, default=64)
+    parser.add_argument("--default-rate", type=float, default=0.02, help="머신별 기본 고장 확률")
+    parser.add_argument("--fault-rate", action="append", default=[], metavar="PROCESS=P", help="공정별 고장 확률")
+    parser.add_argument("--site-outage", type=float, default=0.0, help="사이트(같은 위치) 정전 확률")
+    parser.add_argument("--out", help="시나리오별 결과를 쓸 JSONL 파일")
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="test_db")
+    parser.add_argument("--collection", default="aas_documents")
+    parser.add_argument("--upload-dir", help="캠페인 전에 업로드할 AAS JSON 디렉토리")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    from aas_pathfinder import load_machines_from_mongo, upload_aas_documents
+
+    if args.upload_dir:
+        upload_aas_documents(args.upload_dir, args.mongo_uri, args.db, args.collection)
+    machines = load_machines_from_mongo(args.mongo_uri, args.db, args.collection)
+    model = FaultModel(args.default_rate, _parse_rates(args.fault_rate), args.site_outage)
+
+    out = open(args.out, "w", encoding="utf-8") if args.out else None
+    try:
+        on_result = (lambda r: out.write(json.dumps(r) + "\n")) if out else None
+        summary = run_campaign(
+            machines.values(), args.scenarios, model, args.seed, args.workers, args.chunksize, on_result=on_result,
+        )
+    finally:
+        if out:
+            out.close()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""이벤트 서버가 메모리에 유지하는 머신(fleet) 레지스트리.
+
+시작할 때 한 번 MongoDB에서 적재한 뒤에는 상태 이벤트를 변경분(delta)으로
+적용한다. 상태 변경은 해당 머신과 그 공정의 후보 집합만 갱신하고
+``version`` 을 올리므로, 이벤트당 비용은 fleet 크기가 아니라 변경 크기에
+비례한다.
+"""
+
+import dataclasses
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from aas_pathfinder import Machine
+
+
+def is_running(status: Optional[str]) -> bool:
+    return (status or "").lower() == "running"
+
+
+class FleetRegistry:
+    def __init__(self, machines: Optional[Dict[str, Machine]] = None):
+        self._lock = threading.RLock()
+        self.version = 0
+        self._machines: Dict[str, Machine] = {}
+        self._order: Dict[str, int] = {}
+        self._running: Dict[str, Set[str]] = {}
+        self._lists: Dict[str, List[Machine]] = {}
+        if machines is not None:
+            self.replace_all(machines)
+
+    # ────────────────────────────────────────────────────────────
+    def replace_all(self, machines: Dict[str, Machine]) -> None:
+        """전체 머신 목록을 교체한다 (초기 적재/재동기화)."""
+        with self._lock:
+            self._machines = dict(machines)
+            self._order = {name: i for i, name in enumerate(self._machines)}
+            self._running = {}
+            for m in self._machines.values():
+                if is_running(m.status):
+                    self._running.setdefault(m.process, set()).add(m.name)
+            self._lists = {}
+            self.version += 1
+
+    def apply_status(self, name: str, status: str) -> bool:
+        """머신 하나의 상태를 갱신한다. 실제로 바뀌었으면 ``True``."""
+        with self._lock:
+            machine = self._machines.get(name)
+            if machine is None or machine.status == status:
+                return False
+            self._set_status(machine, status)
+            self.version += 1
+            return True
+
+    def apply_statuses(self, updates: Dict[str, str]) -> List[str]:
+        """여러 머신의 상태를 한 번에(원자적으로) 갱신한다.
+
+        ``version`` 은 실제 변경이 있을 때 한 번만 오른다. 바뀐 머신 이름을 반환.
+        """
+        changed = []
+        with self._lock:
+            for name, status in updates.items():
+                machine = self._machines.get(name)
+                if machine is None or machine.status == status:
+                    continue
+                self._set_status(machine, status)
+                changed.append(name)
+            if changed:
+                self.version += 1
+        return changed
+
+    def _set_status(self, machine: Machine, status: str) -> None:
+        # 이미 넘겨준 스냅샷이 바뀌지 않도록 새 객체로 교체한다
+        updated = dataclasses.replace(machine, status=status)
+        self._machines[machine.name] = updated
+        running = self._running.setdefault(machine.process, set())
+        if is_running(status):
+            running.add(machine.name)
+        else:
+            running.discard(machine.name)
+        self._lists.pop(machine.process, None)
+
+    # ────────────────────────────────────────────────────────────
+    def __len__(self) -> int:
+        return len(self._machines)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._machines
+
+    def get(self, name: str) -> Optional[Machine]:
+        return self._machines.get(name)
+
+    def machines(self) -> Dict[str, Machine]:
+        with self._lock:
+            return dict(self._machines)
+
+    def candidates(self, process: str) -> List[Machine]:
+        """``process`` 의 가동 중 머신 목록 (적재 순서 유지, 변경 전까지 캐시)."""
+        with self._lock:
+            cached = self._lists.get(process)
+            if cached is None:
+                names = sorted(self._running.get(process, ()), key=self._order.__getitem__)
+                cached = self._lists[process] = [self._machines[n] for n in names]
+            return cached
+
+    def running_by_process(self) -> Dict[str, List[Machine]]:
+        with self._lock:
+            return {p: self.candidates(p) for p, names in self._running.items() if names}
+
+    def snapshot(self) -> Tuple[int, Dict[str, List[Machine]]]:
+        """``(version, running_by_process())`` 를 일관되게 읽는다."""
+        with self._lock:
+            return self.version, self.running_by_process()
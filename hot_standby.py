@@ -0,0 +1,137 @@
+"""현재 계획에 대한 단일 머신 고장(N-1) 대비 계획을 미리 계산해 둔다.
+
+계획에 선택된 머신 각각이 고장 났을 때의 대체 계획을 백그라운드 워커에서
+계산해 사전에 저장한다. 고장 이벤트가 하나만 들어오면 이벤트 서버는
+:meth:`HotStandby.lookup` 으로 바로 답한다. 선택되지 않은 머신의 고장은
+계획에 영향이 없으므로 저장하지 않는다.
+
+계획이 바뀌면 표를 처음부터 다시 만들지 않고, 고장 단계 이전 계획이 같고
+변경된 공정이 모두 그 단계보다 앞에 있는 항목은 그대로 재사용한다
+(그리디 계획의 각 단계는 직전 선택과 그 단계 이후 후보에만 의존한다).
+"""
+
+import dataclasses
+import logging
+import threading
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+from aas_pathfinder import Machine
+from process_planner import Plan, PlanDiff, replan_partial
+from work_queue import WorkQueue
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class StandbyTable:
+    plan: Plan
+    version: int  # 계산에 사용한 레지스트리 버전
+    entries: Dict[str, PlanDiff]
+    reused: int = 0
+
+
+def _prefix_names(plan: Plan, stop: int):
+    return tuple(m.name if m is not None else None for m in plan.stages[:stop])
+
+
+def compute_standby(
+    plan: Plan,
+    by_process: Dict[str, Sequence[Machine]],
+    version: int,
+    previous: Optional[StandbyTable] = None,
+    changed_processes: Optional[Iterable[str]] = None,
+) -> StandbyTable:
+    """``plan`` 의 선택 머신마다 고장 시 대체 계획을 계산한다.
+
+    ``previous`` 와 ``changed_processes`` (``previous`` 이후 후보가 바뀐 공정)가
+    주어지면 영향받지 않는 항목을 재사용한다. ``changed_processes`` 가
+    ``None`` 이면 모두 다시 계산한다.
+    """
+    changed_stages = None
+    if previous is not None and changed_processes is not None:
+        changed_stages = [plan.flow.index(p) for p in changed_processes if p in plan.flow]
+    entries: Dict[str, PlanDiff] = {}
+    reused = 0
+    for stage, machine in enumerate(plan.stages):
+        if machine is None:
+            continue
+        if changed_stages is not None and all(s < stage for s in changed_stages):
+            old = previous.entries.get(machine.name)
+            if old is not None and previous.plan.position(machine.name) == stage \
+                    and _prefix_names(previous.plan, stage + 1) == _prefix_names(plan, stage + 1):
+                entries[machine.name] = old
+                reused += 1
+                continue
+        remaining = [m for m in by_process.get(machine.process, ()) if m.name != machine.name]
+        faulted = dataclasses.replace(machine, status="Fault")
+        entries[machine.name] = replan_partial(plan, {**by_process, machine.process: remaining}, [faulted])
+    return StandbyTable(plan, version, entries, reused)
+
+
+class HotStandby:
+    """대체 계획 표를 백그라운드에서 유지한다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._table: Optional[StandbyTable] = None
+        # 레지스트리 버전별로 후보가 바뀐 공정 (``None`` 이면 알 수 없음 → 전체 계산)
+        self._history: List[Tuple[int, Optional[FrozenSet[str]]]] = []
+        # 계획이 연달아 바뀌면 마지막 요청만 계산한다
+        self._queue = WorkQueue(maxsize=1, policy="latest_wins", name="hot-standby")
+
+    def refresh(
+        self,
+        plan: Plan,
+        by_process: Dict[str, Sequence[Machine]],
+        version: int,
+        changed_processes: Optional[Iterable[str]] = None,
+    ):
+        """새 계획에 대한 표 계산을 예약한다. ``changed_processes`` 는
+        직전 ``refresh`` 이후 후보가 바뀐 공정 (모르면 ``None``)."""
+        changed = None if changed_processes is None else frozenset(changed_processes)
+        with self._lock:
+            self._history.append((version, changed))
+        return self._queue.submit(self._rebuild, plan, dict(by_process), version, key="standby")
+
+    def _changes_since(self, since: int, until: int) -> Optional[Set[str]]:
+        processes: Set[str] = set()
+        for version, changed in self._history:
+            if since < version <= until:
+                if changed is None:
+                    return None
+                processes |= changed
+        return processes
+
+    def _rebuild(self, plan, by_process, version) -> None:
+        with self._lock:
+            previous = self._table
+            if previous is not None and previous.version >= version:
+                return
+            changed = None if previous is None else self._changes_since(previous.version, version)
+        table = compute_standby(plan, by_process, version, previous, changed)
+        with self._lock:
+            self._table = table
+            self._history = [h for h in self._history if h[0] > version]
+        logger.debug("Standby table ready for %d machines (%d reused)", len(table.entries), table.reused)
+
+    def lookup(self, machine: str, plan: Plan, version: int) -> Optional[PlanDiff]:
+        """``plan`` 에서 ``machine`` 하나만 고장 난 경우의 대체 계획.
+
+        표가 ``plan`` 과 레지스트리 ``version - 1`` (고장 직전) 기준으로 계산된
+        것일 때만 돌려준다.
+        """
+        with self._lock:
+            table = self._table
+        if table is None or table.plan is not plan or table.version + 1 != version:
+            return None
+        return table.entries.get(machine)
+
+    def table(self) -> Optional[StandbyTable]:
+        with self._lock:
+            return self._table
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._queue.join(timeout)
+
+    def shutdown(self) -> None:
+        self._queue.shutdown(wait=True, cancel_pending=True)
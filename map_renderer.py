@@ -0,0 +1,156 @@
+"""계획 결과 지도(folium HTML) 렌더링.
+
+지도 생성과 HTML 저장은 계획보다 훨씬 느리므로 :class:`MapRenderer` 는
+계획 경로 밖의 백그라운드 스레드에서 렌더링한다.
+
+- 선택된 머신 체인(이름·좌표)의 해시가 마지막으로 그린 것과 같으면 건너뛴다.
+- ``min_interval`` 초에 한 번 이하로만 다시 그리고, 그 사이에 들어온 계획은
+  가장 마지막 것만 남긴다.
+- :func:`atomic_file.atomic_path` 로 같은 디렉토리의 임시 파일에 쓴 뒤
+  바꿔 넣으므로 읽는 쪽이 반쯤 쓰인 HTML을 보지 않는다.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional, Sequence
+
+from aas_pathfinder import Machine
+from atomic_file import atomic_path
+
+logger = logging.getLogger(__name__)
+
+PopupFormatter = Callable[[Machine], str]
+
+
+def default_popup(machine: Machine) -> str:
+    return f"{machine.name} ({machine.process})"
+
+
+def plan_digest(machines: Sequence[Machine]) -> str:
+    h = hashlib.sha1()
+    for m in machines:
+        h.update(f"{m.name}|{m.coords[0]:.6f}|{m.coords[1]:.6f};".encode())
+    return h.hexdigest()
+
+
+def render_map(machines: Sequence[Machine], path: str, popup: PopupFormatter = default_popup) -> bool:
+    """선택된 머신 체인을 folium 지도로 ``path`` 에 원자적으로 저장한다.
+
+    folium을 쓸 수 없거나 머신이 없으면 ``False``.
+    """
+    if not machines:
+        return False
+    try:
+        import folium
+    except Exception as exc:
+        logger.info("folium not available: %s", exc)
+        return False
+    m = folium.Map(location=machines[0].coords, zoom_start=5)
+    prev = None
+    for mach in machines:
+        folium.Marker(location=mach.coords, popup=popup(mach)).add_to(m)
+        if prev:
+            folium.PolyLine([prev, mach.coords], color="blue").add_to(m)
+        prev = mach.coords
+
+    with atomic_path(path, prefix=".map-", suffix=".html") as tmp:
+        m.save(tmp)
+    return True
+
+
+class MapRenderer:
+    """백그라운드에서 지도를 다시 그린다 (변경 시에만, 속도 제한)."""
+
+    def __init__(
+        self,
+        path: str,
+        min_interval: float = 1.0,
+        popup: PopupFormatter = default_popup,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.path = path
+        self.min_interval = min_interval
+        self.popup = popup
+        self.clock = clock
+        self._cond = threading.Condition()
+        self._pending: Optional[Sequence[Machine]] = None
+        self._busy = False
+        self._closed = False
+        self._last_digest: Optional[str] = None
+        self._last_render: Optional[float] = None
+        self.counters: Dict[str, int] = dict.fromkeys(("submitted", "rendered", "unchanged", "superseded", "failed"), 0)
+        self._thread = threading.Thread(target=self._run, name="map-renderer", daemon=True)
+        self._thread.start()
+
+    def submit(self, machines: Sequence[Machine]) -> None:
+        """렌더링을 요청한다. 바로 반환한다."""
+        with self._cond:
+            if self._closed:
+                return
+            self.counters["submitted"] += 1
+            if self._pending is not None:
+                self.counters["superseded"] += 1
+            self._pending = list(machines)
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """대기 중인 요청을 속도 제한과 관계없이 그리고 끝날 때까지 기다린다."""
+        end = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._last_render = None
+            self._cond.notify_all()
+            while self._pending is not None or self._busy:
+                remaining = None if end is None else end - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    # ────────────────────────────────────────────────────────────
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed and self._pending is None:
+                        return
+                    if self._pending is not None:
+                        wait = 0.0
+                        if self._last_render is not None:
+                            wait = self._last_render + self.min_interval - self.clock()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+                machines, self._pending = self._pending, None
+                self._busy = True
+            try:
+                self._render(machines)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _render(self, machines: Sequence[Machine]) -> None:
+        digest = plan_digest(machines)
+        if digest == self._last_digest:
+            self.counters["unchanged"] += 1
+            return
+        try:
+            if render_map(machines, self.path, self.popup):
+                self._last_digest = digest
+                self._last_render = self.clock()
+                self.counters["rendered"] += 1
+                logger.info("Updated %s", self.path)
+        except Exception:
+            self.counters["failed"] += 1
+            logger.exception("Failed to render %s", self.path)
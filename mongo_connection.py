@@ -0,0 +1,61 @@
+"""애플리케이션 전역에서 공유하는 MongoClient 관리 모듈.
+
+``MongoClient`` 는 내부에 소켓 풀과 인증 세션을 가지므로 호출마다 새로
+만들지 않고 URI(와 호출별 옵션)마다 하나만 생성해 재사용한다. 클라이언트는 처음 요청될 때
+만들어지며(lazy), 풀 크기 등 생성 옵션은 :func:`configure` 로 지정한다.
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from pymongo import MongoClient
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = int(os.environ.get("MONGO_POOL_SIZE", "10"))
+
+# (URI, 호출별 옵션) → 클라이언트
+_clients: Dict[Tuple[str, Tuple[Tuple[str, Any], ...]], MongoClient] = {}
+_options: Dict[str, Any] = {"maxPoolSize": DEFAULT_POOL_SIZE}
+_lock = threading.Lock()
+
+
+def configure(max_pool_size: Optional[int] = None, **client_options: Any) -> None:
+    """이후 새로 만들어질 클라이언트의 생성 옵션을 설정한다.
+
+    이미 생성된 클라이언트에는 영향을 주지 않는다.
+    """
+    with _lock:
+        if max_pool_size is not None:
+            _options["maxPoolSize"] = max_pool_size
+        _options.update(client_options)
+
+
+def get_client(mongo_uri: str, **client_options: Any) -> MongoClient:
+    """``mongo_uri`` 에 대한 공유 클라이언트를 반환한다. 없으면 생성한다.
+
+    ``client_options`` 가 다르면 같은 URI라도 다른 클라이언트를 쓴다.
+    """
+    key = (mongo_uri, tuple(sorted(client_options.items())))
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            options = {**_options, **client_options}
+            client = MongoClient(mongo_uri, connect=False, **options)
+            _clients[key] = client
+            logger.debug("Created MongoClient for %s (%s)", mongo_uri, options)
+    return client
+
+
+def close_all() -> None:
+    """모든 공유 클라이언트를 닫고 풀을 비운다."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
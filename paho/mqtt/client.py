@@ -9,5 +9,7 @@ class Client:
         pass
     def loop_forever(self):
         pass
+    def disconnect(self):
+        pass
     def publish(self, topic, payload=None, qos=0, retain=False):
         pass
@@ -0,0 +1,241 @@
+"""공정 흐름(FLOW)별 머신 선택(그리디 계획)과 부분 재계획.
+
+그리디 계획은 첫 공정에서 첫 번째 후보를, 이후 공정에서는 직전 머신과
+가장 가까운 후보를 고른다. 따라서 어떤 단계의 선택은 직전 선택과 그
+단계의 후보에만 의존한다. :func:`replan_partial` 은 이 성질을 이용해
+변경된 머신이 영향을 주는 단계부터만 다시 고르고, 새 선택이 이전과
+같아지면 나머지 하류 단계는 그대로 재사용한다.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from aas_pathfinder import Machine, haversine
+
+FLOW = ("Forging", "Turning", "Milling", "Grinding", "Assembly")
+
+
+def leg_distance(a: Machine, b: Machine) -> float:
+    return haversine(a.coords[0], a.coords[1], b.coords[0], b.coords[1])
+
+
+def _is_running(machine: Machine) -> bool:
+    return (machine.status or "").lower() == "running"
+
+
+@dataclass(frozen=True)
+class Plan:
+    """``flow`` 의 각 단계에 배정된 머신 (후보가 없으면 ``None``)."""
+
+    flow: Tuple[str, ...]
+    stages: Tuple[Optional[Machine], ...]
+    _index: Dict[str, int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "_index", {m.name: i for i, m in enumerate(self.stages) if m is not None})
+
+    @property
+    def machines(self) -> List[Machine]:
+        return [m for m in self.stages if m is not None]
+
+    @property
+    def names(self) -> List[str]:
+        return [m.name for m in self.machines]
+
+    def position(self, name: str) -> Optional[int]:
+        """머신이 배정된 단계 번호 (선택되지 않았으면 ``None``)."""
+        return self._index.get(name)
+
+    def legs(self) -> List[Tuple[Machine, Machine, float]]:
+        selected = self.machines
+        return [(a, b, leg_distance(a, b)) for a, b in zip(selected, selected[1:])]
+
+    @property
+    def total_distance(self) -> float:
+        return sum(d for _, _, d in self.legs())
+
+
+class StageChange(NamedTuple):
+    stage: int
+    process: str
+    old: Optional[Machine]
+    new: Optional[Machine]
+
+
+@dataclass
+class PlanDiff:
+    plan: Plan
+    changes: List[StageChange]
+    recomputed: int = 0  # 실제로 다시 고른 단계 수
+
+    def __bool__(self) -> bool:
+        return bool(self.changes)
+
+
+# ────────────────────────────────────────────────────────────
+def group_by_process(machines: Iterable[Machine], running_only: bool = False) -> Dict[str, List[Machine]]:
+    """머신을 공정별 후보 목록으로 묶는다 (입력 순서 유지)."""
+    by_process: Dict[str, List[Machine]] = {}
+    for m in machines:
+        if running_only and not _is_running(m):
+            continue
+        by_process.setdefault(m.process, []).append(m)
+    return by_process
+
+
+def _choose(prev: Optional[Machine], candidates: Sequence[Machine], start: Optional[str] = None) -> Optional[Machine]:
+    if not candidates:
+        return None
+    if prev is None:
+        if start is not None:
+            for m in candidates:
+                if m.name == start:
+                    return m
+        return candidates[0]
+    return min(candidates, key=lambda m: leg_distance(prev, m))
+
+
+def plan_greedy(
+    by_process: Dict[str, Sequence[Machine]],
+    flow: Sequence[str] = FLOW,
+    start: Optional[str] = None,
+) -> Plan:
+    """공정별 후보(적재 순서)로 그리디 계획을 세운다.
+
+    첫 단계는 ``start`` 머신(후보에 있을 때) 또는 첫 번째 후보를 고른다.
+    """
+    stages: List[Optional[Machine]] = []
+    prev = None
+    for step in flow:
+        chosen = _choose(prev, by_process.get(step, ()), start)
+        stages.append(chosen)
+        prev = chosen or prev
+    return Plan(tuple(flow), tuple(stages))
+
+
+def _affected_stages(plan: Plan, changed: Iterable[Machine]) -> List[int]:
+    stages = set()
+    for machine in changed:
+        pos = plan.position(machine.name)
+        if pos is not None:
+            # 선택된 머신이 멈췄거나 (가동 중이라도) 좌표 등이 바뀌었다
+            stages.add(pos)
+        elif _is_running(machine) and machine.process in plan.flow:
+            # 새로 가동된 머신은 자기 공정 단계의 선택을 바꿀 수 있다
+            stages.add(plan.flow.index(machine.process))
+        # 선택되지 않은 머신이 멈춘 경우는 계획에 영향이 없다
+    return sorted(stages)
+
+
+def replan_partial(
+    plan: Plan,
+    by_process: Dict[str, Sequence[Machine]],
+    changed: Iterable[Machine],
+    start: Optional[str] = None,
+) -> PlanDiff:
+    """이전 계획과 변경된 머신(갱신 후 상태)으로 영향받는 단계만 다시 고른다.
+
+    ``by_process`` 는 변경이 반영된 현재 후보이다. 결과는
+    ``plan_greedy(by_process, plan.flow, start)`` 와 같다 (``plan`` 도 같은
+    ``start`` 로 세운 계획이어야 한다).
+    """
+    affected = _affected_stages(plan, changed)
+    if not affected:
+        return PlanDiff(plan, [])
+
+    first, last = affected[0], affected[-1]
+    stages = list(plan.stages)
+    prev = next((m for m in reversed(stages[:first]) if m is not None), None)
+    changes: List[StageChange] = []
+    recomputed = 0
+    for i in range(first, len(stages)):
+        old = plan.stages[i]
+        chosen = _choose(prev, by_process.get(plan.flow[i], ()), start)
+        recomputed += 1
+        if chosen is not old and (chosen is None or old is None or chosen.name != old.name or chosen.coords != old.coords):
+            changes.append(StageChange(i, plan.flow[i], old, chosen))
+        stages[i] = chosen
+        if i >= last and chosen is not None and old is not None and chosen.name == old.name and chosen.coords == old.coords:
+            # 하류 단계는 직전 선택에만 의존하므로 이후는 이전 계획과 같다
+            break
+        prev = chosen or prev
+    if not changes:
+        return PlanDiff(plan, [], recomputed)
+    return PlanDiff(Plan(plan.flow, tuple(stages)), changes, recomputed)
+
+
+# ────────────────────────────────────────────────────────────
+def fleet_fingerprint(by_process: Dict[str, Sequence[Machine]]) -> Hashable:
+    """버전 정보가 없는 후보 집합의 식별값 (계획에 쓰이는 이름·좌표만 반영)."""
+    return tuple(sorted(
+        (process, tuple((m.name, tuple(m.coords)) for m in machines))
+        for process, machines in by_process.items()
+    ))
+
+
+class Planner:
+    """그리디 계획을 (fleet 버전, flow, 시작 조건) 키로 LRU 캐시한다.
+
+    ``version`` 을 넘기면(예: :class:`fleet_registry.FleetRegistry` 의
+    ``version``) 캐시 적중은 상수 시간이다. 한 ``Planner`` 의 ``version`` 은
+    하나의 레지스트리 기준이어야 한다. ``version`` 이 없으면 후보 집합의
+    지문(:func:`fleet_fingerprint`)을 키로 쓰는데, 지문을 만드는 비용은 후보
+    수에 비례해 그리디 계획 자체와 비슷하다. 이때 캐시가 아끼는 것은 구간
+    거리 계산과 ``Plan`` 생성뿐이므로, 같은 fleet을 반복해 계획하는 곳에서는
+    버전을 넘긴다.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._cache: "OrderedDict[Hashable, Plan]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(by_process, flow, start, version) -> Hashable:
+        fleet = ("v", version) if version is not None else ("f", fleet_fingerprint(by_process))
+        return fleet, tuple(flow), start
+
+    def plan(
+        self,
+        by_process: Dict[str, Sequence[Machine]],
+        flow: Sequence[str] = FLOW,
+        start: Optional[str] = None,
+        version: Optional[Hashable] = None,
+    ) -> Plan:
+        key = self._key(by_process, flow, start, version)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+        plan = plan_greedy(by_process, flow, start)
+        self._store(key, plan)
+        return plan
+
+    def store(self, plan: Plan, version: Hashable, start: Optional[str] = None) -> None:
+        """다른 경로(예: 부분 재계획)로 얻은 계획을 캐시에 넣는다."""
+        self._store(self._key(None, plan.flow, start, version), plan)
+
+    def _store(self, key, plan: Plan) -> None:
+        with self._lock:
+            self._cache[key] = plan
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+# 버전 없이 호출하는 스크립트들이 함께 쓰는 기본 플래너 (지문 키, 위 참고)
+default_planner = Planner()
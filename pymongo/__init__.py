@@ -1,45 +1,849 @@
-"""아주 단순한 pymongo 대체 모듈."""
+"""아주 단순한 pymongo 대체 모듈.
 
+실제 MongoDB 없이 시뮬레이션과 테스트를 돌릴 수 있도록 메모리 상에서
+동작하는 최소한의 ``MongoClient``/``Database``/``Collection`` 을 제공한다.
+``create_index`` 로 만든 해시 인덱스(단일/복합 필드, unique 제약)는
+등호 조건 검색에 사용되므로 문서 수가 늘어나도 ``find_one``/``replace_one``
+이 컬렉션 전체를 훑지 않는다. URI로 파일 저장소를 지정하면 연산 로그와
+스냅샷으로 데이터를 영속화한다 (``_filestore`` 참고).
+"""
 
-class Collection:
-    """메모리 상의 문서 컬렉션."""
+import copy
+import os
+from contextlib import contextmanager
+from itertools import islice, product
+from urllib.parse import parse_qs, urlparse
+
+from ._filestore import FileStore
+from .errors import BulkWriteError, DuplicateKeyError, OperationFailure
+
+ASCENDING = 1
+DESCENDING = -1
+
+# 필드가 존재하지 않음을 나타내는 표식 (``None`` 값과 구분하기 위함)
+_MISSING = object()
+
+
+# ────────────────────────────────────────────────────────────
+# 필드 접근/비교 헬퍼
+def _get_field(doc, path):
+    """``a.b.0.c`` 형태의 점 경로 값을 반환한다. 없으면 ``_MISSING``."""
+    cur = doc
+    for part in path.split("."):
+        if isinstance(cur, dict):
+            cur = cur.get(part, _MISSING)
+        elif isinstance(cur, list) and part.isdigit():
+            idx = int(part)
+            cur = cur[idx] if idx < len(cur) else _MISSING
+        else:
+            return _MISSING
+        if cur is _MISSING:
+            return _MISSING
+    return cur
+
+
+def _value(doc, path):
+    """등호 비교용 값. MongoDB와 같이 누락된 필드는 ``None`` 으로 취급한다."""
+    val = _get_field(doc, path)
+    return None if val is _MISSING else val
+
+
+def _freeze(value):
+    """인덱스 키로 쓸 수 있도록 dict/list 값을 해시 가능한 형태로 바꾼다."""
+    if isinstance(value, dict):
+        return ("__dict__", tuple((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return ("__list__", tuple(_freeze(v) for v in value))
+    return value
+
+
+def _compare(op):
+    def _cmp(value, arg):
+        if value is _MISSING or value is None:
+            return False
+        try:
+            return op(value, arg)
+        except TypeError:
+            return False
+    return _cmp
+
+
+_OPERATORS = {
+    "$eq": lambda v, a: (None if v is _MISSING else v) == a,
+    "$ne": lambda v, a: (None if v is _MISSING else v) != a,
+    "$in": lambda v, a: (None if v is _MISSING else v) in a,
+    "$nin": lambda v, a: (None if v is _MISSING else v) not in a,
+    "$gt": _compare(lambda v, a: v > a),
+    "$gte": _compare(lambda v, a: v >= a),
+    "$lt": _compare(lambda v, a: v < a),
+    "$lte": _compare(lambda v, a: v <= a),
+    "$exists": lambda v, a: (v is not _MISSING) == bool(a),
+}
+
+
+def _is_operator_dict(cond):
+    return isinstance(cond, dict) and bool(cond) and all(str(k).startswith("$") for k in cond)
+
+
+def _match_condition(value, cond):
+    if _is_operator_dict(cond):
+        for op, arg in cond.items():
+            fn = _OPERATORS.get(op)
+            if fn is None:
+                raise OperationFailure(f"unknown operator: {op}")
+            if not fn(value, arg):
+                return False
+        return True
+    return (None if value is _MISSING else value) == cond
+
+
+def _match(doc, filt):
+    for key, cond in filt.items():
+        if key == "$and":
+            if not all(_match(doc, f) for f in cond):
+                return False
+        elif key == "$or":
+            if not any(_match(doc, f) for f in cond):
+                return False
+        elif not _match_condition(_get_field(doc, key), cond):
+            return False
+    return True
+
+
+# ────────────────────────────────────────────────────────────
+# 프로젝션/정렬 헬퍼
+def _set_path(target, path, value):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        target = target.setdefault(part, {})
+    target[parts[-1]] = value
+
+
+def _without(doc, parts):
+    """``parts`` 경로만 제거한 얕은 복사본을 만든다."""
+    if not isinstance(doc, dict) or parts[0] not in doc:
+        return doc
+    out = dict(doc)
+    if len(parts) == 1:
+        del out[parts[0]]
+    else:
+        out[parts[0]] = _without(out[parts[0]], parts[1:])
+    return out
+
+
+def _project(doc, projection):
+    if not projection:
+        return doc
+    if isinstance(projection, (list, tuple)):
+        projection = {f: 1 for f in projection}
+    include = [f for f, on in projection.items() if on]
+    exclude = [f for f, on in projection.items() if not on]
+    if include and exclude:
+        raise OperationFailure("cannot mix inclusion and exclusion in projection")
+    if include:
+        out = {}
+        for field in include:
+            val = _get_field(doc, field)
+            if val is not _MISSING:
+                _set_path(out, field, val)
+        return out
+    for field in exclude:
+        doc = _without(doc, field.split("."))
+    return doc
+
+
+def _assign(doc, path, value):
+    """``$set`` 처리: 점 경로 위치에 값을 기록하고 변경 여부를 반환한다."""
+    parts = path.split(".")
+    cur = doc
+    for i, part in enumerate(parts):
+        last = i == len(parts) - 1
+        if isinstance(cur, list):
+            if not part.isdigit():
+                raise OperationFailure(f"cannot use the part ({part}) of ({path}) to traverse the element")
+            key = int(part)
+            while len(cur) <= key:
+                cur.append(None)
+        elif isinstance(cur, dict):
+            key = part
+        else:
+            raise OperationFailure(f"cannot create field '{part}' in element of ({path})")
+        if last:
+            existed = key in cur if isinstance(cur, dict) else True
+            changed = not existed or cur[key] != value
+            cur[key] = value
+            return changed
+        if isinstance(cur, dict):
+            if cur.get(key) is None:
+                cur[key] = {}
+        elif cur[key] is None:
+            cur[key] = {}
+        cur = cur[key]
+    return False
+
+
+def _copy_paths(doc, paths):
+    """``paths`` 를 따라 내려가는 컨테이너만 얕게 복사한 문서를 만든다.
+
+    ``_apply_update`` 는 경로 위의 컨테이너만 고치므로, 결과에 적용해도 원본
+    문서는 바뀌지 않는다.
+    """
+    out = dict(doc)
+    for path in paths:
+        cur = out
+        for part in path.split(".")[:-1]:
+            if isinstance(cur, dict) and isinstance(cur.get(part), (dict, list)):
+                key = part
+            elif isinstance(cur, list) and part.isdigit() and int(part) < len(cur) \
+                    and isinstance(cur[int(part)], (dict, list)):
+                key = int(part)
+            else:
+                break
+            cur[key] = copy.copy(cur[key])
+            cur = cur[key]
+    return out
+
+
+def _unassign(doc, path):
+    """``$unset`` 처리: 필드를 제거(배열 원소는 ``None``)하고 변경 여부를 반환한다."""
+    parts = path.split(".")
+    parent = _get_field(doc, ".".join(parts[:-1])) if len(parts) > 1 else doc
+    last = parts[-1]
+    if isinstance(parent, dict) and last in parent:
+        del parent[last]
+        return True
+    if isinstance(parent, list) and last.isdigit() and int(last) < len(parent):
+        parent[int(last)] = None
+        return True
+    return False
+
+
+def _apply_update(doc, update):
+    changed = False
+    for op, fields in update.items():
+        if op == "$set":
+            for path, value in fields.items():
+                changed = _assign(doc, path, copy.deepcopy(value)) or changed
+        elif op == "$unset":
+            for path in fields:
+                changed = _unassign(doc, path) or changed
+        else:
+            raise OperationFailure(f"unsupported update operator: {op}")
+    return changed
 
+
+def _paths_overlap(a, b):
+    return a == b or a.startswith(b + ".") or b.startswith(a + ".")
+
+
+def _sort_key(field):
+    def _key(doc):
+        val = _get_field(doc, field)
+        # MongoDB처럼 누락/None 값이 가장 앞에 오도록 한다
+        if val is _MISSING or val is None:
+            return (0, 0)
+        return (1, val)
+    return _key
+
+
+def _normalize_keys(keys, direction=ASCENDING):
+    if isinstance(keys, str):
+        return [(keys, direction)]
+    spec = []
+    for item in keys:
+        if isinstance(item, str):
+            spec.append((item, ASCENDING))
+        else:
+            spec.append((item[0], item[1]))
+    return spec
+
+
+# ────────────────────────────────────────────────────────────
+# 결과 객체 (pymongo.results 와 같은 속성만 제공)
+class InsertOneResult:
+    def __init__(self, inserted_id):
+        self.inserted_id = inserted_id
+        self.acknowledged = True
+
+
+class InsertManyResult:
+    def __init__(self, inserted_ids):
+        self.inserted_ids = inserted_ids
+        self.acknowledged = True
+
+
+class UpdateResult:
+    def __init__(self, matched_count, modified_count, upserted_id=None):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+        self.upserted_id = upserted_id
+        self.acknowledged = True
+
+
+class DeleteResult:
+    def __init__(self, deleted_count):
+        self.deleted_count = deleted_count
+        self.acknowledged = True
+
+
+class BulkWriteResult:
     def __init__(self):
-        self._docs = []
+        self.inserted_count = 0
+        self.matched_count = 0
+        self.modified_count = 0
+        self.deleted_count = 0
+        self.upserted_ids = {}
+        self.acknowledged = True
 
-    # MongoDB 컬렉션 호환 메서드
-    def replace_one(self, filt, doc, upsert=False):
-        for i, existing in enumerate(self._docs):
-            if all(existing.get(k) == v for k, v in filt.items()):
-                self._docs[i] = doc
-                return
-        if upsert:
-            self._docs.append(doc)
-
-    def find_one(self, filt):
-        for doc in self._docs:
-            if all(doc.get(k) == v for k, v in filt.items()):
-                return doc
+    @property
+    def upserted_count(self):
+        return len(self.upserted_ids)
+
+    @property
+    def bulk_api_result(self):
+        return {
+            "nInserted": self.inserted_count,
+            "nMatched": self.matched_count,
+            "nModified": self.modified_count,
+            "nRemoved": self.deleted_count,
+            "nUpserted": self.upserted_count,
+        }
+
+
+# ────────────────────────────────────────────────────────────
+# bulk_write 요청 객체
+class InsertOne:
+    def __init__(self, document):
+        self._doc = document
+
+    def _apply(self, collection, result, index):
+        collection._insert(self._doc)
+        result.inserted_count += 1
+
+
+class _UpdateRequest:
+    def __init__(self, filter, update, upsert=False):
+        self._filter = filter
+        self._update = update
+        self._upsert = upsert
+
+    def _record(self, res, result, index):
+        result.matched_count += res.matched_count
+        result.modified_count += res.modified_count
+        if res.upserted_id is not None:
+            result.upserted_ids[index] = res.upserted_id
+
+
+class UpdateOne(_UpdateRequest):
+    def _apply(self, collection, result, index):
+        res = collection._update_one(self._filter, self._update, self._upsert)
+        self._record(res, result, index)
+
+
+class UpdateMany(_UpdateRequest):
+    def _apply(self, collection, result, index):
+        res = collection._update_ids(collection._matching_ids(self._filter or {}), self._filter, self._update, self._upsert)
+        self._record(res, result, index)
+
+
+class ReplaceOne(_UpdateRequest):
+    def _apply(self, collection, result, index):
+        res = collection._replace_one(self._filter, self._update, self._upsert)
+        self._record(res, result, index)
+
+
+class DeleteOne:
+    def __init__(self, filter):
+        self._filter = filter
+
+    def _apply(self, collection, result, index):
+        result.deleted_count += collection._delete_one(self._filter).deleted_count
+
+
+# ────────────────────────────────────────────────────────────
+class _Index:
+    """필드 값 튜플 → 문서 id 집합 해시 인덱스."""
+
+    def __init__(self, name, spec, unique=False):
+        self.name = name
+        self.spec = spec
+        self.fields = tuple(f for f, _ in spec)
+        self.unique = unique
+        self.buckets = {}
+
+    def key_for(self, doc):
+        return tuple(_freeze(_value(doc, f)) for f in self.fields)
+
+    def conflicts(self, doc, doc_id=None):
+        if not self.unique:
+            return False
+        bucket = self.buckets.get(self.key_for(doc))
+        return bool(bucket) and any(i != doc_id for i in bucket)
+
+    def add(self, doc_id, doc):
+        self.buckets.setdefault(self.key_for(doc), {})[doc_id] = None
+
+    def remove(self, doc_id, doc):
+        key = self.key_for(doc)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            return
+        bucket.pop(doc_id, None)
+        if not bucket:
+            del self.buckets[key]
+
+    def lookup_keys(self, filt):
+        """필터가 모든 인덱스 필드에 등호(또는 ``$in``) 조건을 주면 키 목록을 반환."""
+        per_field = []
+        for field in self.fields:
+            cond = filt.get(field, _MISSING)
+            if cond is _MISSING:
+                return None
+            if _is_operator_dict(cond):
+                if set(cond) == {"$eq"}:
+                    per_field.append([cond["$eq"]])
+                elif set(cond) == {"$in"}:
+                    per_field.append(list(cond["$in"]))
+                else:
+                    return None
+            else:
+                per_field.append([cond])
+        return [tuple(_freeze(v) for v in combo) for combo in product(*per_field)]
+
+
+class Cursor:
+    """``find`` 결과를 지연 평가하는 커서. ``sort``/``skip``/``limit`` 체이닝 지원."""
+
+    def __init__(self, collection, filt=None, projection=None):
+        self._collection = collection
+        self._filter = filt or {}
+        self._projection = projection
+        self._sort = None
+        self._skip = 0
+        self._limit = 0
+        self._iter = None
+
+    def sort(self, key_or_list, direction=ASCENDING):
+        self._sort = _normalize_keys(key_or_list, direction)
+        return self
+
+    def skip(self, count):
+        self._skip = count
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._iter is None:
+            self._iter = self._execute()
+        return next(self._iter)
+
+    def _execute(self):
+        self._collection._sync()
+        docs = self._collection._iter_matching(self._filter)
+        if self._sort:
+            docs = list(docs)
+            # 안정 정렬을 뒤쪽 키부터 적용해 복합 정렬을 구현
+            for field, direction in reversed(self._sort):
+                docs.sort(key=_sort_key(field), reverse=direction < 0)
+        stop = self._skip + self._limit if self._limit else None
+        for doc in islice(docs, self._skip, stop):
+            yield _project(doc, self._projection)
+
+
+class Collection:
+    """메모리 상의 문서 컬렉션.
+
+    문서는 내부 id 순서(삽입 순서)로 보관하며 쓰기 시 복사본을 저장한다.
+    읽기 메서드는 저장된 문서를 그대로 돌려주므로 호출 측에서 수정하지 않는다.
+    ``storage`` 가 주어지면 모든 쓰기를 파일 로그에 남기고, 읽기 전에 다른
+    프로세스의 기록을 반영한다.
+    """
+
+    def __init__(self, name=None, storage=None):
+        self.name = name
+        self._docs = {}
+        self._next_id = 0
+        self._indexes = {}
+        self._storage = storage
+
+    # ── 파일 저장소 연동 ─────────────────────────────────────
+    def _sync(self):
+        if self._storage is not None:
+            with self._storage.locked():
+                self._storage.refresh(self._load_state, self._replay)
+
+    @contextmanager
+    def _writing(self):
+        storage = self._storage
+        if storage is None:
+            yield
+            return
+        with storage.locked(exclusive=True):
+            storage.refresh(self._load_state, self._replay)
+            yield
+            if storage.pending >= storage.compact_every:
+                storage.compact(self._dump_state())
+
+    def _journal(self, entry):
+        if self._storage is not None:
+            self._storage.append(entry)
+
+    def _dump_state(self):
+        return {
+            "next_id": self._next_id,
+            "indexes": [
+                {"name": idx.name, "spec": idx.spec, "unique": idx.unique}
+                for idx in self._indexes.values()
+            ],
+            "docs": [[doc_id, doc] for doc_id, doc in self._docs.items()],
+        }
+
+    def _load_state(self, state):
+        self._docs = {}
+        self._indexes = {}
+        self._next_id = 0
+        if not state:
+            return
+        for doc_id, doc in state["docs"]:
+            self._docs[doc_id] = doc
+        self._next_id = state["next_id"]
+        for idx in state["indexes"]:
+            self._build_index(idx["name"], [tuple(k) for k in idx["spec"]], idx["unique"])
+
+    def _replay(self, entry):
+        op = entry["op"]
+        if op == "put":
+            self._store(entry["id"], entry["doc"])
+            self._next_id = max(self._next_id, entry["id"] + 1)
+        elif op == "update":
+            doc = self._updated(entry["id"], entry["update"])
+            if doc is not None:
+                self._swap(entry["id"], doc, entry["update"])
+        elif op == "del":
+            self._unstore(entry["id"])
+        elif op == "index":
+            self._build_index(entry["name"], [tuple(k) for k in entry["spec"]], entry["unique"])
+        elif op == "dropindex":
+            self._indexes.pop(entry["name"], None)
+
+    def checkpoint(self):
+        """파일 저장소 사용 시 현재 상태를 스냅샷으로 압축한다."""
+        if self._storage is None:
+            return
+        with self._writing():
+            if self._storage.pending:
+                self._storage.compact(self._dump_state())
+
+    # ── 인덱스 ────────────────────────────────────────────────
+    def _build_index(self, name, spec, unique):
+        index = _Index(name, spec, unique=unique)
+        for doc_id, doc in self._docs.items():
+            if index.conflicts(doc):
+                raise DuplicateKeyError(f"duplicate key for index {name}: {index.key_for(doc)}")
+            index.add(doc_id, doc)
+        self._indexes[name] = index
+
+    def create_index(self, keys, unique=False, name=None, **kwargs):
+        spec = _normalize_keys(keys)
+        name = name or "_".join(f"{f}_{d}" for f, d in spec)
+        with self._writing():
+            if name not in self._indexes:
+                self._build_index(name, spec, unique)
+                self._journal({"op": "index", "name": name, "spec": spec, "unique": unique})
+        return name
+
+    def drop_index(self, name):
+        with self._writing():
+            if self._indexes.pop(name, None) is None:
+                raise OperationFailure(f"index not found: {name}")
+            self._journal({"op": "dropindex", "name": name})
+
+    def index_information(self):
+        self._sync()
+        return {
+            idx.name: {"key": list(idx.spec), "unique": idx.unique}
+            for idx in self._indexes.values()
+        }
+
+    def _candidate_ids(self, filt):
+        best = None
+        for index in self._indexes.values():
+            keys = index.lookup_keys(filt)
+            if keys is not None and (best is None or len(index.fields) > len(best[0].fields)):
+                best = (index, keys)
+        if best is None:
+            return list(self._docs)
+        index, keys = best
+        ids = set()
+        for key in keys:
+            ids.update(index.buckets.get(key, ()))
+        return sorted(ids)
+
+    def _iter_matching(self, filt):
+        for doc_id in self._candidate_ids(filt):
+            doc = self._docs.get(doc_id)
+            if doc is not None and _match(doc, filt):
+                yield doc
+
+    def _matching_ids(self, filt):
+        return [i for i in self._candidate_ids(filt) if _match(self._docs[i], filt)]
+
+    def _first_id(self, filt):
+        for doc_id in self._candidate_ids(filt or {}):
+            doc = self._docs.get(doc_id)
+            if doc is not None and _match(doc, filt or {}):
+                return doc_id
         return None
 
-    def find(self):
-        # 리스트를 그대로 순회하는 제너레이터 반환
-        for doc in list(self._docs):
-            yield doc
+    def _check_unique(self, doc, doc_id=None):
+        for index in self._indexes.values():
+            if index.conflicts(doc, doc_id):
+                raise DuplicateKeyError(f"duplicate key for index {index.name}: {index.key_for(doc)}")
+
+    def _store(self, doc_id, doc):
+        old = self._docs.get(doc_id)
+        for index in self._indexes.values():
+            if old is not None:
+                index.remove(doc_id, old)
+            index.add(doc_id, doc)
+        self._docs[doc_id] = doc
+
+    def _unstore(self, doc_id):
+        doc = self._docs.pop(doc_id)
+        for index in self._indexes.values():
+            index.remove(doc_id, doc)
+
+    def _insert(self, doc):
+        doc = copy.deepcopy(doc)
+        self._check_unique(doc)
+        doc_id = self._next_id
+        self._next_id += 1
+        self._store(doc_id, doc)
+        self._journal({"op": "put", "id": doc_id, "doc": doc})
+        return doc_id
+
+    def _touched_indexes(self, update):
+        paths = [p for fields in update.values() for p in fields]
+        return [
+            idx for idx in self._indexes.values()
+            if any(_paths_overlap(p, f) for p in paths for f in idx.fields)
+        ]
+
+    def _updated(self, doc_id, update):
+        """문서 하나에 갱신 연산자를 적용한 새 문서를 만든다 (바뀐 게 없으면 ``None``).
+
+        저장된 문서는 건드리지 않는다. 바뀌는 경로의 컨테이너만 복사하므로
+        비용은 문서 전체가 아니라 바뀌는 필드 크기에 비례한다.
+        """
+        doc = _copy_paths(self._docs[doc_id], [p for fields in update.values() for p in fields])
+        if not _apply_update(doc, update):
+            return None
+        if self._touched_indexes(update):
+            self._check_unique(doc, doc_id)
+        return doc
+
+    def _swap(self, doc_id, doc, update):
+        """:meth:`_updated` 로 만든 문서로 바꿔 넣는다."""
+        if self._touched_indexes(update):
+            self._store(doc_id, doc)
+        else:
+            self._docs[doc_id] = doc
+
+    def _upsert_update(self, filt, update):
+        seed = {}
+        for path, value in filt.items():
+            if not path.startswith("$") and not _is_operator_dict(value):
+                _assign(seed, path, value)
+        _apply_update(seed, update)
+        return self._insert(seed)
+
+    def _modify(self, ids, update):
+        modified = 0
+        for doc_id in ids:
+            doc = self._updated(doc_id, update)
+            if doc is not None:
+                # 기록이 남은 뒤에만 메모리의 문서를 바꾼다
+                self._journal({"op": "update", "id": doc_id, "update": update})
+                self._swap(doc_id, doc, update)
+                modified += 1
+        return modified
+
+    # ── MongoDB 컬렉션 호환 메서드 ───────────────────────────
+    def insert_one(self, doc):
+        with self._writing():
+            return InsertOneResult(self._insert(doc))
+
+    def insert_many(self, docs):
+        with self._writing():
+            return InsertManyResult([self._insert(d) for d in docs])
+
+    def _replace_one(self, filt, doc, upsert):
+        doc_id = self._first_id(filt)
+        if doc_id is None:
+            if upsert:
+                return UpdateResult(0, 0, self._insert(doc))
+            return UpdateResult(0, 0)
+        doc = copy.deepcopy(doc)
+        self._check_unique(doc, doc_id)
+        self._store(doc_id, doc)
+        self._journal({"op": "put", "id": doc_id, "doc": doc})
+        return UpdateResult(1, 1)
+
+    def replace_one(self, filt, doc, upsert=False):
+        with self._writing():
+            return self._replace_one(filt, doc, upsert)
+
+    def _update_ids(self, ids, filt, update, upsert):
+        if not update or not all(k.startswith("$") for k in update):
+            raise OperationFailure("update only works with $ operators")
+        if not ids:
+            if upsert:
+                return UpdateResult(0, 0, self._upsert_update(filt, update))
+            return UpdateResult(0, 0)
+        return UpdateResult(len(ids), self._modify(ids, update))
+
+    def _update_one(self, filt, update, upsert):
+        doc_id = self._first_id(filt)
+        return self._update_ids([] if doc_id is None else [doc_id], filt, update, upsert)
+
+    def update_one(self, filt, update, upsert=False):
+        with self._writing():
+            return self._update_one(filt, update, upsert)
+
+    def update_many(self, filt, update, upsert=False):
+        with self._writing():
+            return self._update_ids(self._matching_ids(filt or {}), filt, update, upsert)
+
+    def _delete_one(self, filt):
+        doc_id = self._first_id(filt)
+        if doc_id is None:
+            return DeleteResult(0)
+        self._unstore(doc_id)
+        self._journal({"op": "del", "id": doc_id})
+        return DeleteResult(1)
+
+    def delete_one(self, filt):
+        with self._writing():
+            return self._delete_one(filt)
+
+    def delete_many(self, filt):
+        with self._writing():
+            ids = self._matching_ids(filt or {})
+            for doc_id in ids:
+                self._unstore(doc_id)
+                self._journal({"op": "del", "id": doc_id})
+            return DeleteResult(len(ids))
+
+    def bulk_write(self, requests, ordered=True):
+        """여러 쓰기 연산을 한 번에 적용한다 (파일 저장소 잠금도 한 번).
+
+        ``ordered`` 이면 첫 오류에서 멈추고, 아니면 나머지를 계속 적용한 뒤
+        :class:`~pymongo.errors.BulkWriteError` 를 발생시킨다.
+        """
+        result = BulkWriteResult()
+        errors = []
+        with self._writing():
+            for index, request in enumerate(requests):
+                try:
+                    request._apply(self, result, index)
+                except OperationFailure as exc:
+                    errors.append({"index": index, "errmsg": str(exc), "op": request})
+                    if ordered:
+                        break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, **result.bulk_api_result})
+        return result
+
+    def find_one(self, filt=None, projection=None):
+        self._sync()
+        doc_id = self._first_id(filt)
+        if doc_id is None:
+            return None
+        return _project(self._docs[doc_id], projection)
+
+    def find(self, filt=None, projection=None):
+        return Cursor(self, filt, projection)
+
+    def count_documents(self, filt=None):
+        self._sync()
+        return sum(1 for _ in self._iter_matching(filt or {}))
 
 
 class Database:
-    def __init__(self):
+    def __init__(self, name=None, storage_path=None, compact_every=1000):
+        self.name = name
         self._cols = {}
+        self._storage_path = storage_path
+        self._compact_every = compact_every
 
     def __getitem__(self, name):
-        return self._cols.setdefault(name, Collection())
+        col = self._cols.get(name)
+        if col is None:
+            storage = None
+            if self._storage_path:
+                storage = FileStore(os.path.join(self._storage_path, self.name, name), self._compact_every)
+            col = self._cols[name] = Collection(name, storage)
+        return col
+
+    def get_collection(self, name):
+        return self[name]
+
+    def list_collection_names(self):
+        names = set(self._cols)
+        db_dir = os.path.join(self._storage_path, self.name) if self._storage_path else None
+        if db_dir and os.path.isdir(db_dir):
+            for fname in os.listdir(db_dir):
+                for suffix in (".snapshot.json", ".oplog.jsonl"):
+                    if fname.endswith(suffix):
+                        names.add(fname[: -len(suffix)])
+        return sorted(names)
+
+
+def _storage_path_from_uri(uri):
+    """``mongodb+file://<경로>`` 또는 ``mongodb://...?storagePath=<경로>`` 해석."""
+    if not uri:
+        return None
+    parsed = urlparse(uri)
+    if parsed.scheme == "mongodb+file":
+        return (parsed.netloc + parsed.path) or None
+    values = parse_qs(parsed.query).get("storagePath")
+    return values[0] if values else None
 
 
 class MongoClient:
-    def __init__(self, uri=None, *args, **kwargs):
+    """대체 클라이언트.
+
+    기본은 프로세스 메모리에만 데이터를 둔다. ``mongodb+file:///data/db``
+    스킴이나 ``storagePath`` URI 옵션(또는 ``storage_path`` 인자)을 주면
+    컬렉션을 파일 저장소에 영속화하여 재시작 시 스냅샷만 읽으면 되고
+    여러 로컬 프로세스가 같은 데이터를 공유할 수 있다.
+    """
+
+    def __init__(self, uri=None, *args, storage_path=None, compact_every=1000, **kwargs):
         self.uri = uri
+        self.storage_path = storage_path or _storage_path_from_uri(uri)
+        self.compact_every = compact_every
         self._dbs = {}
 
     def __getitem__(self, name):
-        return self._dbs.setdefault(name, Database())
+        db = self._dbs.get(name)
+        if db is None:
+            db = self._dbs[name] = Database(name, self.storage_path, self.compact_every)
+        return db
+
+    def get_database(self, name):
+        return self[name]
+
+    def close(self):
+        """파일 저장소 사용 시 남은 로그를 스냅샷으로 압축하고 파일을 닫는다."""
+        for db in self._dbs.values():
+            for col in db._cols.values():
+                col.checkpoint()
+                if col._storage is not None:
+                    col._storage.close()
@@ -0,0 +1,126 @@
+"""컬렉션 단위 파일 저장소: append-only 연산 로그 + 주기적 압축 스냅샷.
+
+파일 구성 (``base`` 는 ``<storage>/<db>/<collection>``)::
+
+    base.snapshot.json   마지막으로 압축된 전체 상태 (seq 포함)
+    base.oplog.jsonl     스냅샷 이후의 연산 기록, 한 줄에 하나
+    base.lock            프로세스 간 잠금 파일
+
+모든 연산에는 단조 증가하는 ``s`` 번호가 붙는다. 다른 프로세스는 스냅샷이
+교체되면 다시 읽고, 로그는 마지막으로 읽은 위치부터 이어서 적용하므로 여러
+프로세스가 같은 저장소를 동시에 읽을 수 있다. 쓰기는 배타 잠금 안에서
+최신 상태를 반영한 뒤 수행된다.
+"""
+
+import json
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows 등에서는 프로세스 간 잠금 없이 동작
+    fcntl = None
+
+
+def _signature(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class FileStore:
+    def __init__(self, base_path, compact_every=1000):
+        os.makedirs(os.path.dirname(base_path) or ".", exist_ok=True)
+        self.snapshot_path = base_path + ".snapshot.json"
+        self.oplog_path = base_path + ".oplog.jsonl"
+        self.lock_path = base_path + ".lock"
+        self.compact_every = compact_every
+        self.seq = 0
+        self._snapshot_seq = 0
+        self._snapshot_sig = None
+        self._offset = 0
+        self._locked = False
+        self._log = None
+
+    @property
+    def pending(self):
+        """마지막 스냅샷 이후 쌓인 연산 수."""
+        return self.seq - self._snapshot_seq
+
+    @contextmanager
+    def locked(self, exclusive=False):
+        if fcntl is None or self._locked:
+            yield
+            return
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._locked = True
+            yield
+        finally:
+            self._locked = False
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def refresh(self, load_state, apply_entry):
+        """다른 프로세스가 기록한 스냅샷/로그를 반영한다. 잠금은 호출 측 책임."""
+        sig = _signature(self.snapshot_path)
+        if sig != self._snapshot_sig:
+            state = None
+            if sig is not None:
+                with open(self.snapshot_path, encoding="utf-8") as f:
+                    state = json.load(f)
+            load_state(state)
+            self._snapshot_sig = sig
+            self.seq = self._snapshot_seq = state["seq"] if state else 0
+            self._offset = 0
+
+        size = _signature(self.oplog_path)
+        size = size[2] if size else 0
+        if size < self._offset:
+            # 다른 프로세스가 압축 후 로그를 비웠다
+            self._offset = 0
+        if size == self._offset:
+            return
+        with open(self.oplog_path, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # 기록 중인 마지막 줄
+                self._offset += len(line)
+                entry = json.loads(line)
+                if entry["s"] > self.seq:
+                    apply_entry(entry)
+                    self.seq = entry["s"]
+
+    def append(self, entry):
+        self.seq += 1
+        entry["s"] = self.seq
+        line = (json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        if self._log is None:
+            self._log = open(self.oplog_path, "ab")
+        self._log.write(line)
+        self._log.flush()
+        self._offset += len(line)
+
+    def compact(self, state):
+        """현재 상태를 스냅샷으로 원자적으로 기록하고 로그를 비운다."""
+        state["seq"] = self.seq
+        tmp = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        with open(self.oplog_path, "wb"):
+            pass
+        self._snapshot_sig = _signature(self.snapshot_path)
+        self._snapshot_seq = self.seq
+        self._offset = 0
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
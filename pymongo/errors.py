@@ -0,0 +1,21 @@
+"""pymongo.errors 대체 모듈."""
+
+
+class PyMongoError(Exception):
+    """모든 대체 모듈 예외의 기반 클래스."""
+
+
+class OperationFailure(PyMongoError):
+    """지원하지 않는 연산자 등 잘못된 요청."""
+
+
+class DuplicateKeyError(OperationFailure):
+    """unique 인덱스 제약 위반."""
+
+
+class BulkWriteError(OperationFailure):
+    """``bulk_write`` 중 하나 이상의 연산 실패. ``details`` 에 결과를 담는다."""
+
+    def __init__(self, details):
+        super().__init__(f"batch op errors occurred: {details.get('writeErrors')}")
+        self.details = details
@@ -0,0 +1,176 @@
+"""상태 이벤트를 모아 한 번에 재계획하는 스케줄러.
+
+교대 시간처럼 상태 이벤트가 몰려 들어오면 이벤트마다 재계획하는 것은
+낭비다(결과가 곧바로 다음 이벤트에 의해 무효가 된다). 이 스케줄러는
+
+- 마지막 이벤트 후 ``window`` 초 동안 새 이벤트가 없거나,
+- 첫 이벤트 후 ``max_delay`` 초가 지나면
+
+그동안 모인 이벤트를 머신별 최종 상태 하나로 합쳐 ``callback`` 을 한 번
+호출한다. 시계는 주입할 수 있으므로(``clock``) 테스트나 시뮬레이션에서는
+``poll(now)`` 로 직접 구동하고, 서버에서는 :meth:`start` 가 띄운 스레드가
+주기적으로 ``poll`` 한다.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# ``callback(updates)`` 가 ``False`` 를 돌려주면 실제 재계획이 없었던 것으로 센다
+ReplanCallback = Callable[[Dict[str, str]], Optional[bool]]
+
+
+class ReplanScheduler:
+    def __init__(
+        self,
+        callback: ReplanCallback,
+        window: float = 0.5,
+        max_delay: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if window < 0 or max_delay < window:
+            raise ValueError("0 <= window <= max_delay 이어야 합니다")
+        self.callback = callback
+        self.window = window
+        self.max_delay = max_delay
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._pending: Dict[str, str] = {}
+        self._dirty = False
+        self._first: Optional[float] = None
+        self._last: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # 카운터
+        self.events_received = 0
+        self.events_coalesced = 0
+        self.replans_run = 0
+        self.replans_skipped = 0
+
+    # ────────────────────────────────────────────────────────────
+    def submit(self, machine: Optional[str], status: Optional[str] = None, now: Optional[float] = None) -> None:
+        """이벤트 하나를 기록한다. ``machine`` 이 없으면 재계획만 예약한다."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            self.events_received += 1
+            if self._dirty:
+                self.events_coalesced += 1
+            else:
+                self._first = now
+            self._dirty = True
+            self._last = now
+            if machine and status:
+                # 같은 머신의 이벤트는 마지막 상태만 남긴다
+                self._pending[machine] = status
+
+    def submit_many(self, updates: Dict[str, str], now: Optional[float] = None) -> None:
+        """여러 머신의 이벤트(배치 메시지)를 한 번에 기록한다."""
+        if not updates:
+            return
+        now = self.clock() if now is None else now
+        with self._lock:
+            self.events_received += len(updates)
+            if self._dirty:
+                self.events_coalesced += len(updates)
+            else:
+                self.events_coalesced += len(updates) - 1
+                self._first = now
+            self._dirty = True
+            self._last = now
+            self._pending.update(updates)
+
+    def due(self, now: Optional[float] = None) -> bool:
+        now = self.clock() if now is None else now
+        with self._lock:
+            if not self._dirty:
+                return False
+            return now - self._last >= self.window or now - self._first >= self.max_delay
+
+    def next_deadline(self) -> Optional[float]:
+        """다음 ``poll`` 이 의미 있는 시각 (대기 중인 이벤트가 없으면 ``None``)."""
+        with self._lock:
+            if not self._dirty:
+                return None
+            return min(self._last + self.window, self._first + self.max_delay)
+
+    def poll(self, now: Optional[float] = None) -> bool:
+        """기한이 지났으면 모인 이벤트로 재계획한다. 실행했으면 ``True``."""
+        if not self.due(now):
+            return False
+        return self.flush()
+
+    def flush(self) -> bool:
+        """기한과 관계없이 모인 이벤트를 즉시 처리한다."""
+        with self._lock:
+            if not self._dirty:
+                return False
+            updates, self._pending = self._pending, {}
+            self._dirty = False
+            self._first = self._last = None
+        result = self.callback(updates)
+        with self._lock:
+            if result is False:
+                self.replans_skipped += 1
+            else:
+                self.replans_run += 1
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return self._counters()
+
+    def _counters(self) -> Dict[str, int]:
+        return {
+            "events_received": self.events_received,
+            "events_coalesced": self.events_coalesced,
+            "replans_run": self.replans_run,
+            "replans_skipped": self.replans_skipped,
+        }
+
+    def export_state(self) -> Dict[str, object]:
+        """대기 중인 이벤트와 카운터 (체크포인트용)."""
+        with self._lock:
+            return {
+                "counters": self._counters(),
+                "pending": dict(self._pending),
+                "dirty": self._dirty,
+                "first": self._first,
+                "last": self._last,
+            }
+
+    def restore_state(self, state: Dict[str, object]) -> None:
+        with self._lock:
+            self._pending = dict(state["pending"])
+            self._dirty = state["dirty"]
+            self._first = state["first"]
+            self._last = state["last"]
+            for name, value in state["counters"].items():
+                setattr(self, name, value)
+
+    # ────────────────────────────────────────────────────────────
+    def start(self, interval: Optional[float] = None) -> None:
+        """백그라운드 스레드에서 주기적으로 ``poll`` 한다."""
+        if self._thread is not None:
+            return
+        interval = interval if interval is not None else max(self.window / 4, 0.01)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="replan-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, flush: bool = True) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        if flush:
+            self.flush()
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Replan failed")
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""시뮬레이션 결과(계획 기록) 저장소.
+
+호출마다 파일을 다시 열고 헤더를 확인하는 대신, :class:`ResultSink` 는
+파일을 한 번 열어 두고 기록을 메모리에 모았다가
+
+- ``max_records`` 개가 모이거나,
+- 마지막 flush 후 ``max_interval`` 초가 지나면
+
+한 번에 쓴다. :meth:`ResultSink.checkpoint` 는 flush 후 ``fsync`` 까지
+해서 그 시점까지의 기록이 디스크에 남도록 한다. 여러 스레드가 같은
+sink에 동시에 써도 된다 (버퍼 추가와 파일 쓰기는 각각 잠금으로 보호하며,
+파일 쓰기 중에도 다른 스레드는 버퍼에 계속 쓸 수 있다).
+
+체크포인트 때의 :attr:`ResultSink.offset` 을 ``resume_offset`` 으로 넘겨
+다시 열면 그 뒤에 쓰인 기록을 잘라 내고 이어 쓴다 (시뮬레이션 재개용).
+
+구현:
+
+- :class:`CSVSink`: 사람이 읽는 CSV (기존 ``result.csv`` 형식과 호환)
+- :class:`ColumnarSink`: 분석용 열 기반 파일. 확장자가 ``.parquet`` 이면
+  Parquet (flush마다 row group 하나, pyarrow 필요), 그 밖(예: ``.rec``)에는
+  numpy 구조체 배열을 이어 붙인 바이너리 파일과 dtype 정보
+  (``<path>.dtype.json``)를 쓴다. 필요한 패키지가 없으면 ``ImportError``.
+  :func:`read_columnar` 로 다시 읽는다.
+"""
+
+import abc
+import csv
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # numpy 구조체 파일로 대신한다
+    pa = pq = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# 열 이름 → 타입 ("str", "int", "float", "bool")
+Columns = Mapping[str, str]
+Record = Mapping[str, Any]
+
+
+class ResultSink(abc.ABC):
+    """버퍼링된 기록 저장소의 공통 부분.
+
+    하위 클래스는 ``_file`` 을 열고 :meth:`_write_rows`, :meth:`_sync`,
+    :meth:`_close` 를 구현한다.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        columns: Columns,
+        max_records: int = 10000,
+        max_interval: Optional[float] = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.path = path
+        self.columns = dict(columns)
+        self.max_records = max_records
+        self.max_interval = max_interval
+        self.clock = clock
+        self._buffer: List[Record] = []
+        self._lock = threading.Lock()        # 버퍼
+        self._io_lock = threading.Lock()     # 파일
+        self._last_flush = clock()
+        self._closed = False
+        self.records_written = 0
+        self.flushes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ────────────────────────────────────────────────────────────
+    def write(self, record: Record) -> None:
+        self.write_many((record,))
+
+    def write_many(self, records: Iterable[Record]) -> None:
+        with self._lock:
+            if self._closed:
+                raise ValueError(f"이미 닫힌 sink 입니다: {self.path}")
+            self._buffer.extend(records)
+            due = len(self._buffer) >= self.max_records or (
+                self.max_interval is not None and self.clock() - self._last_flush >= self.max_interval
+            )
+        if due:
+            self.flush()
+
+    def flush(self, fsync: bool = False) -> int:
+        """버퍼를 파일에 쓴다. 쓴 기록 수를 돌려준다."""
+        with self._io_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+                self._last_flush = self.clock()
+            if rows:
+                self._write_rows(rows)
+                self.records_written += len(rows)
+                self.flushes += 1
+            if fsync:
+                self._sync()
+        return len(rows)
+
+    def checkpoint(self) -> int:
+        """flush 후 디스크까지 동기화한다."""
+        return self.flush(fsync=True)
+
+    @property
+    def offset(self) -> int:
+        """지금까지 파일에 쓴 바이트 수 (버퍼에 남은 기록은 제외)."""
+        with self._io_lock:
+            return self._file.tell()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self.checkpoint()
+        with self._io_lock:
+            self._close()
+
+    # ────────────────────────────────────────────────────────────
+    @abc.abstractmethod
+    def _write_rows(self, rows: List[Record]) -> None:
+        """기록을 파일에 쓴다 (``_io_lock`` 을 잡은 상태로 불린다)."""
+
+    @abc.abstractmethod
+    def _sync(self) -> None:
+        """쓴 내용을 디스크까지 동기화한다."""
+
+    @abc.abstractmethod
+    def _close(self) -> None:
+        """파일을 닫는다."""
+
+
+def _truncate(path: str, offset: Optional[int]) -> None:
+    """``offset`` 이후의 내용을 버린다 (체크포인트 뒤에 쓰인 기록)."""
+    if offset is None or not os.path.exists(path):
+        return
+    with open(path, "r+b") as f:
+        f.truncate(offset)
+
+
+class CSVSink(ResultSink):
+    """CSV 파일에 이어 쓴다. 파일이 없거나 비어 있을 때만 헤더를 쓴다."""
+
+    def __init__(self, path: str, columns: Columns, resume_offset: Optional[int] = None, **kwargs):
+        super().__init__(path, columns, **kwargs)
+        _truncate(path, resume_offset)
+        self._file = open(path, "a", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        if self._file.tell() == 0:
+            self._writer.writerow(list(self.columns))
+            self._file.flush()
+
+    def _write_rows(self, rows: List[Record]) -> None:
+        names = list(self.columns)
+        self._writer.writerows([row.get(name, "") for name in names] for row in rows)
+        self._file.flush()
+
+    def _sync(self) -> None:
+        os.fsync(self._file.fileno())
+
+    def _close(self) -> None:
+        self._file.close()
+
+
+_ARROW_TYPES = {"str": "string", "int": "int64", "float": "float64", "bool": "bool_"}
+_NUMPY_TYPES = {"int": "<i8", "float": "<f8", "bool": "?"}
+_MISSING = {"str": "", "int": 0, "float": float("nan"), "bool": False}
+
+
+def _dtype_path(path: str) -> str:
+    return path + ".dtype.json"
+
+
+class ColumnarSink(ResultSink):
+    """열 기반 파일 (Parquet 또는 numpy 구조체 배열).
+
+    형식은 확장자로 정한다: ``.parquet`` 은 Parquet, 그 밖에는 numpy 형식.
+    Parquet은 :meth:`close` 에서 footer를 써야 읽을 수 있다. numpy 형식은
+    flush된 기록까지 언제든 읽을 수 있으며, 문자열 열은 ``string_width``
+    글자로 잘린다.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        columns: Columns,
+        string_width: int = 64,
+        resume_offset: Optional[int] = None,
+        **kwargs,
+    ):
+        super().__init__(path, columns, **kwargs)
+        for name, kind in self.columns.items():
+            if kind not in _MISSING:
+                raise ValueError(f"지원하지 않는 열 타입입니다: {name}={kind}")
+        if path.lower().endswith(".parquet"):
+            if pq is None:
+                raise ImportError("Parquet 파일을 쓰려면 pyarrow 가 필요합니다 (numpy 형식은 .rec 등 다른 확장자를 쓴다)")
+            if resume_offset is not None:
+                raise ValueError("Parquet 파일은 중간부터 이어 쓸 수 없습니다")
+            self.format = "parquet"
+            self._schema = pa.schema([(name, getattr(pa, _ARROW_TYPES[kind])()) for name, kind in self.columns.items()])
+            self._file = open(path, "wb")
+            self._parquet = pq.ParquetWriter(self._file, self._schema)
+        elif np is not None:
+            self.format = "numpy"
+            self._dtype = np.dtype([
+                (name, f"<U{string_width}" if kind == "str" else _NUMPY_TYPES[kind])
+                for name, kind in self.columns.items()
+            ])
+            with open(_dtype_path(path), "w", encoding="utf-8") as f:
+                json.dump({"descr": self._dtype.descr}, f)
+            if resume_offset is not None and os.path.exists(path):
+                _truncate(path, resume_offset)
+                self._file = open(path, "ab")
+            else:
+                self._file = open(path, "wb")
+        else:
+            raise ImportError("numpy 구조체 파일을 쓰려면 numpy 가 필요합니다")
+
+    def _column(self, rows: List[Record], name: str) -> list:
+        missing = _MISSING[self.columns[name]]
+        return [row.get(name, missing) for row in rows]
+
+    def _write_rows(self, rows: List[Record]) -> None:
+        if self.format == "parquet":
+            table = pa.table({name: self._column(rows, name) for name in self.columns}, schema=self._schema)
+            self._parquet.write_table(table)
+        else:
+            array = np.empty(len(rows), dtype=self._dtype)
+            for name in self.columns:
+                array[name] = self._column(rows, name)
+            array.tofile(self._file)
+        self._file.flush()
+
+    def _sync(self) -> None:
+        os.fsync(self._file.fileno())
+
+    def _close(self) -> None:
+        if self.format == "parquet":
+            self._parquet.close()
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._file.close()
+
+
+def read_columnar(path: str) -> Dict[str, list]:
+    """:class:`ColumnarSink` 로 쓴 파일을 열 이름 → 값 목록으로 읽는다."""
+    if os.path.exists(_dtype_path(path)):
+        if np is None:
+            raise ImportError("numpy 구조체 파일을 읽으려면 numpy 가 필요합니다")
+        with open(_dtype_path(path), encoding="utf-8") as f:
+            dtype = np.dtype([tuple(d) for d in json.load(f)["descr"]])
+        size = os.path.getsize(path) // dtype.itemsize
+        array = np.fromfile(path, dtype=dtype, count=size)
+        return {name: array[name].tolist() for name in dtype.names}
+    if pq is None:
+        raise ImportError("Parquet 파일을 읽으려면 pyarrow 가 필요합니다")
+    return pq.read_table(path).to_pydict()
+
+
+def open_sink(path: str, columns: Columns, **kwargs) -> ResultSink:
+    """확장자가 ``.csv`` 이면 :class:`CSVSink`, 그 밖에는 :class:`ColumnarSink`."""
+    if path.lower().endswith(".csv"):
+        kwargs.pop("string_width", None)
+        return CSVSink(path, columns, **kwargs)
+    return ColumnarSink(path, columns, **kwargs)
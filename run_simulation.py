@@ -16,65 +16,13 @@ import random
 import threading
 import time
 
-import pymongo
-
 import aas_pathfinder
 import event_server
-
-# ────────────────────────────────────────────────────────────
-# 간단한 MQTT 브로커/클라이언트 구현
-class _Broker:
-    def __init__(self):
-        self.subs = []
-
-    def subscribe(self, topic, client):
-        self.subs.append((topic, client))
-
-    def publish(self, topic, payload):
-        for pat, cli in self.subs:
-            if pat.endswith('#'):
-                prefix = pat[:-1]
-                if topic.startswith(prefix):
-                    msg = type('Msg', (), {'payload': payload.encode()})
-                    if cli.on_message:
-                        cli.on_message(cli, None, msg)
-            elif pat == topic:
-                msg = type('Msg', (), {'payload': payload.encode()})
-                if cli.on_message:
-                    cli.on_message(cli, None, msg)
-
-BROKER = _Broker()
-
-class FakeMQTTClient:
-    def __init__(self, *_, **__):
-        self.on_message = None
-
-    def connect(self, host, port=1883, keepalive=60):
-        return 0
-
-    def subscribe(self, topic):
-        BROKER.subscribe(topic, self)
-        return (0, 0)
-
-    def loop_start(self):
-        pass
-
-    def loop_forever(self):
-        pass
-
-    def publish(self, topic, payload=None, qos=0, retain=False):
-        BROKER.publish(topic, payload or '')
-        return (0, 0)
-
-# ────────────────────────────────────────────────────────────
-# 데이터베이스 클라이언트 공유
-DB_CLIENT = pymongo.MongoClient()
-
-def _shared_mongo(*args, **kwargs):
-    return DB_CLIENT
-
-aas_pathfinder.MongoClient = _shared_mongo
-event_server.MongoClient = _shared_mongo
+import mongo_connection
+from fake_mqtt import BROKER, FakeMQTTClient
+from map_renderer import MapRenderer
+from process_planner import default_planner, group_by_process
+from result_sink import CSVSink
 
 # MQTT 클라이언트 패치
 event_server.mqtt.Client = FakeMQTTClient
@@ -110,37 +58,33 @@ def load_address_company_map(dir_path: str = '데이터(정리본)') -> dict:
 ADDRESS_COMPANY_MAP = load_address_company_map()
 
 # ────────────────────────────────────────────────────────────
+_RENDERERS = {}
+
+
+def _renderer(html_path: str) -> MapRenderer:
+    if html_path not in _RENDERERS:
+        _RENDERERS[html_path] = MapRenderer(html_path, min_interval=0.0)
+    return _RENDERERS[html_path]
+
+
+_SINKS = {}
+RESULT_COLUMNS = {'label': 'str', 'from': 'str', 'to': 'str', 'distance_km': 'str'}
+
+
+def _sink(csv_path: str) -> CSVSink:
+    if csv_path not in _SINKS:
+        _SINKS[csv_path] = CSVSink(csv_path, RESULT_COLUMNS)
+    return _SINKS[csv_path]
+
+
 def compute_and_save(label: str, html_path: str, csv_path: str):
     machines = aas_pathfinder.load_machines_from_mongo(MONGO_URI, DB_NAME, COL_NAME)
-    running = {n: m for n, m in machines.items() if m.status.lower() == 'running'}
-    if not running:
+    by_proc = group_by_process(machines.values(), running_only=True)
+    if not by_proc:
         logging.info('No running machines available')
         return
-    by_proc = {}
-    for m in running.values():
-        by_proc.setdefault(m.process, []).append(m)
-    flow = ['Forging', 'Turning', 'Milling', 'Grinding', 'Assembly']
-    selected = []
-    for step in flow:
-        cand = by_proc.get(step, [])
-        if not cand:
-            continue
-        if not selected:
-            chosen = cand[0]
-        else:
-            prev = selected[-1]
-            chosen = min(
-                cand,
-                key=lambda m: aas_pathfinder.dijkstra_path(
-                    aas_pathfinder.build_graph_from_aas({prev.name: prev.coords, m.name: m.coords}),
-                    prev.name,
-                    m.name
-                )[1]
-            )
-        selected.append(chosen)
-
-    coords = {m.name: m.coords for m in selected}
-    graph = aas_pathfinder.build_graph_from_aas(coords)
+    plan = default_planner.plan(by_proc)
+    selected = plan.machines
     total = 0.0
     rows = []
     def _addr(machine):
@@ -150,45 +94,28 @@ def compute_and_save(label: str, html_path: str, csv_path: str):
         return aas_pathfinder._find_address(sub_index[key]) if key else None
 
     path_names = []
-    for a, b in zip(selected, selected[1:]):
-        path, dist = aas_pathfinder.dijkstra_path(graph, a.name, b.name)
+    for a, b, dist in plan.legs():
         total += dist
         addr_a = _addr(a)
         addr_b = _addr(b)
         name_a = ADDRESS_COMPANY_MAP.get(addr_a, a.name)
         name_b = ADDRESS_COMPANY_MAP.get(addr_b, b.name)
         logging.info('%s → %s: %.1f km', name_a, name_b, dist)
-        rows.append([name_a, name_b, f'{dist:.2f}'])
+        rows.append({'label': label, 'from': name_a, 'to': name_b, 'distance_km': f'{dist:.2f}'})
         if not path_names:
             path_names.append(name_a)
         path_names.append(name_b)
     logging.info('Total distance: %.1f km', total)
 
-    # CSV 저장
-    write_header = not os.path.exists(csv_path)
-    with open(csv_path, 'a', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        if write_header:
-            writer.writerow(['label', 'from', 'to', 'distance_km'])
-        for r in rows:
-            writer.writerow([label] + r)
-        writer.writerow([label, 'TOTAL', '', f'{total:.2f}'])
-        writer.writerow([label, 'PATH', ' -> '.join(path_names), ''])
-
-    # folium 시각화
-    try:
-        import folium
-        m = folium.Map(location=selected[0].coords, zoom_start=5)
-        prev = None
-        for mach in selected:
-            folium.Marker(location=mach.coords, popup=f'{mach.name} ({mach.process})').add_to(m)
-            if prev:
-                folium.PolyLine([prev, mach.coords], color='blue').add_to(m)
-            prev = mach.coords
-        m.save(html_path)
-        logging.info('Updated %s', html_path)
-    except Exception as exc:
-        logging.info('folium not available: %s', exc)
+    # CSV 저장 (파일은 열어 둔 채 계산 단위로 flush)
+    rows.append({'label': label, 'from': 'TOTAL', 'to': '', 'distance_km': f'{total:.2f}'})
+    rows.append({'label': label, 'from': 'PATH', 'to': ' -> '.join(path_names), 'distance_km': ''})
+    sink = _sink(csv_path)
+    sink.write_many(rows)
+    sink.flush()
+
+    # folium 시각화 (백그라운드, 경로가 바뀐 경우에만)
+    _renderer(html_path).submit(selected)
 
 # ────────────────────────────────────────────────────────────
 def main():
@@ -228,11 +155,19 @@ def main():
     payload = json.dumps({'machine': target.name, 'status': 'Fault'})
     server.mqtt.publish(f'aas/status/{target.name}', payload)
 
-    # 처리 시간 대기
+    # 서버가 이벤트를 받을 때까지 대기한 뒤 처리 시간 대기
+    BROKER.drain(timeout=5)
     time.sleep(1)
 
     logging.info('Recalculating after fault')
     compute_and_save('after_fault', 'process_flow_simulated.html', 'result.csv')
+    server.stop()
+    t.join()
+    for renderer in _RENDERERS.values():
+        renderer.close()
+    for sink in _SINKS.values():
+        sink.close()
+    mongo_connection.close_all()
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""시뮬레이션·부하 시험·분석 스크립트가 함께 쓰는 도구.
+
+- :func:`synthetic_fleet`: 실제 AAS 문서 없이 시험할 가상의 fleet
+- :func:`percentile`: 지연 시간·비용 분포 요약용 백분위수
+"""
+
+import math
+import random
+from typing import Dict, List, Optional
+
+from aas_pathfinder import Machine
+from process_planner import FLOW
+
+
+def synthetic_fleet(count: int, seed: int = 0) -> Dict[str, Machine]:
+    """미국 본토 범위에 흩어진 가상의 머신 ``count`` 대 (FLOW 공정을 차례로 배정)."""
+    rng = random.Random(seed)
+    machines = {}
+    for i in range(count):
+        name = f"Machine_{i}"
+        machines[name] = Machine(
+            name=name,
+            process=FLOW[i % len(FLOW)],
+            coords=(rng.uniform(30.0, 47.0), rng.uniform(-122.0, -72.0)),
+            status="Running",
+        )
+    return machines
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """최근접 순위(nearest-rank) 백분위수."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
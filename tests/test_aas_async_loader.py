@@ -0,0 +1,51 @@
+import asyncio
+import os
+import sys
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pymongo
+
+import aas_async_loader
+import aas_pathfinder
+
+AAS_DIR = os.path.join(os.path.dirname(__file__), "..", "aas_instances")
+
+
+def test_async_pipeline_matches_sync_loader():
+    sync_client = pymongo.MongoClient()
+    async_client = pymongo.MongoClient()
+
+    with mock.patch("aas_pathfinder.get_client", return_value=sync_client):
+        sync_count = aas_pathfinder.upload_aas_documents(AAS_DIR, "mongodb://x", "db", "col")
+        expected = aas_pathfinder.load_machines_from_mongo("mongodb://x", "db", "col")
+
+    with mock.patch("aas_async_loader.get_client", return_value=async_client):
+        async_count = asyncio.run(aas_async_loader.upload_aas_documents_async(
+            AAS_DIR, "mongodb://x", "db", "col", concurrency=3, batch_size=7, queue_size=2))
+        machines = asyncio.run(aas_async_loader.load_machines_async(
+            "mongodb://x", "db", "col", concurrency=3, batch_size=5, queue_size=2))
+
+    assert async_count == sync_count > 0
+    assert list(machines) == list(expected)
+    assert machines == expected
+
+
+@pytest.mark.parametrize("target", ["parse_machine_documents", "geocode_address"])
+def test_async_loader_raises_when_a_stage_fails(target):
+    client = pymongo.MongoClient()
+    with mock.patch("aas_pathfinder.get_client", return_value=client):
+        aas_pathfinder.upload_aas_documents(AAS_DIR, "mongodb://x", "db", "col")
+
+    async def load():
+        # 큐가 작아 실패한 단계가 멈추면 조회 단계가 put 에서 막힌다 → 시간 초과가 아니라 예외여야 한다
+        return await asyncio.wait_for(aas_async_loader.load_machines_async(
+            "mongodb://x", "db", "col", concurrency=2, batch_size=1, queue_size=1), timeout=10)
+
+    with mock.patch("aas_async_loader.get_client", return_value=client), \
+            mock.patch(f"aas_pathfinder.{target}", side_effect=ValueError("malformed")):
+        with pytest.raises(ValueError, match="malformed"):
+            asyncio.run(load())
@@ -0,0 +1,101 @@
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "sdk"))
+
+pytest.importorskip("pandas")
+pytest.importorskip("basyx.aas.adapter.json")
+
+import aas_batch_generator  # noqa: E402
+
+DATA_DIR = os.path.join(ROOT, "데이터(정리본)")
+
+
+def _read_all(folder):
+    """파일 이름 → JSON (AAS의 서브모델 참조는 집합이므로 정렬해서 비교한다)."""
+    result = {}
+    for name in os.listdir(folder):
+        with open(os.path.join(folder, name), encoding="utf-8") as f:
+            doc = json.load(f)
+        for shell in doc.get("assetAdministrationShells", []):
+            shell["submodels"] = sorted(shell.get("submodels", []), key=json.dumps)
+        result[name] = doc
+    return result
+
+
+def test_rows_match_concat_order():
+    import pandas as pd
+
+    frames = []
+    for name, fname in aas_batch_generator.FILES.items():
+        path = os.path.join(DATA_DIR, fname)
+        try:
+            df = pd.read_csv(path, encoding="utf-8")
+        except UnicodeDecodeError:
+            df = pd.read_csv(path, encoding="cp949")
+        df["_category"] = name
+        frames.append(df)
+    expected = pd.concat(frames, ignore_index=True)
+
+    rows = list(aas_batch_generator.iter_rows(DATA_DIR, chunksize=7))
+    assert len(rows) == len(expected)
+    assert list(rows[0]) == list(expected.columns)
+    assert [r["Equipment"] for r in rows] == list(expected["Equipment"])
+
+
+def test_parallel_output_matches_serial(tmp_path):
+    serial, parallel = tmp_path / "serial", tmp_path / "parallel"
+    assert aas_batch_generator.generate_aas_instances(DATA_DIR, str(serial), workers=1) == 103
+    assert aas_batch_generator.generate_aas_instances(DATA_DIR, str(parallel), workers=2, chunksize=10) == 103
+    assert _read_all(serial) == _read_all(parallel)
+    assert set(_read_all(serial)) == set(os.listdir(os.path.join(ROOT, "aas_instances")))
+
+    repeated = tmp_path / "repeated"
+    assert aas_batch_generator.generate_aas_instances(DATA_DIR, str(repeated), workers=2, count=250) == 250
+    assert len(os.listdir(repeated)) == 250
+
+
+def _raw(folder):
+    result = {}
+    for name in os.listdir(folder):
+        with open(os.path.join(folder, name), "rb") as f:
+            result[name] = f.read()
+    return result
+
+
+def test_stamped_instances_are_byte_identical():
+    rows = list(aas_batch_generator.iter_rows(DATA_DIR))
+    tricky = dict(rows[1])
+    tricky.update({"Brand": 'Say "hi" \\ 한글\n', "Location": float("nan"), "Size": "  tab\t"})
+    missing = {k: v for k, v in rows[2].items() if k not in {"Brand", "Location"}}
+    templates = aas_batch_generator.TemplateCache()
+    for index, row in enumerate(rows + [tricky, missing]):
+        expected = aas_batch_generator.render_instance(row, index)
+        assert aas_batch_generator.stamp_instance(row, index, templates) == expected
+    # 공정 분류와 기술 데이터 열 조합마다 템플릿은 하나
+    assert 0 < len(templates) < len(rows)
+    assert aas_batch_generator.stamp_instance(rows[0], 0) == aas_batch_generator.render_instance(rows[0], 0)
+
+
+def test_template_cache_is_bounded():
+    rows = list(aas_batch_generator.iter_rows(DATA_DIR))
+    templates = aas_batch_generator.TemplateCache(maxsize=2)
+    for index, row in enumerate(rows):
+        assert aas_batch_generator.stamp_instance(row, index, templates) == \
+            aas_batch_generator.render_instance(row, index)
+        assert len(templates) <= 2
+
+
+def test_fast_generation_matches_slow_path(tmp_path):
+    slow, fast = tmp_path / "slow", tmp_path / "fast"
+    aas_batch_generator.generate_aas_instances(DATA_DIR, str(slow), workers=1)
+    aas_batch_generator.generate_aas_instances(DATA_DIR, str(fast), workers=1, fast=True)
+    assert _raw(slow) == _raw(fast)
+    pooled = tmp_path / "pooled"
+    aas_batch_generator.generate_aas_instances(DATA_DIR, str(pooled), workers=2, chunksize=10, fast=True)
+    assert _read_all(pooled) == _read_all(slow)
@@ -0,0 +1,85 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from aas_path_query import PathExtractor, compile_path
+
+
+def _submodels(uid, street, order=("Nameplate", "Operation")):
+    sms = {
+        "Nameplate": {
+            "id": f"https://example.com/submodel/Nameplate_{uid}",
+            "submodelElements": [
+                {"idShort": "ManufacturerName", "value": [{"language": "en", "text": "ACME"}]},
+                {
+                    "idShort": "AddressInformation",
+                    "value": [{"idShort": "Street", "value": [{"language": "en", "text": street}]}],
+                },
+            ],
+        },
+        "Operation": {
+            "id": f"https://example.com/submodel/Operation_{uid}",
+            "submodelElements": [{"idShort": "MachineStatus", "value": "Running"}],
+        },
+    }
+    return [sms[name] for name in order]
+
+
+def test_compiled_path_matches_case_insensitive_and_descendants():
+    elements = _submodels("M1", "Main St")[0]["submodelElements"]
+    assert compile_path("**/addressinformation/STREET[text]").first(elements) == "Main St"
+    assert compile_path("AddressInformation/Street[text]").first(elements) == "Main St"
+    assert compile_path("Street[text]").first(elements) is None
+    assert compile_path("**/Zipcode|Street[text]").first(elements) == "Main St"
+    assert compile_path("**/Street[text]") is compile_path("**/Street[text]")
+
+
+def test_extractor_memoizes_layout_per_template():
+    extractor = PathExtractor({
+        "street": "Nameplate/**/AddressInformation/Street[text]",
+        "status": "Operation/MachineStatus",
+        "missing": "Category/MachineType",
+    })
+    first = extractor.extract(_submodels("M1", "Main St"))
+    assert first == {"street": "Main St", "status": "Running", "missing": None}
+    assert len(extractor._layouts) == 1
+
+    # 최상위 순서가 달라도 같은 템플릿으로 보고 기억한 위치를 사용한다
+    second = extractor.extract(_submodels("M2", "Side Rd", order=("Operation", "Nameplate")))
+    assert second == {"street": "Side Rd", "status": "Running", "missing": None}
+    assert len(extractor._layouts) == 1
+
+
+def test_extractor_rescans_paths_missing_from_earlier_document():
+    extractor = PathExtractor({
+        "street": "Nameplate/**/AddressInformation/Street[text]",
+        "status": "Operation/MachineStatus",
+    })
+    no_street = _submodels("M1", "unused")
+    no_street[0]["submodelElements"][1]["value"] = [{"idShort": "Zipcode", "value": "12345"}]
+    assert extractor.extract(no_street) == {"street": None, "status": "Running"}
+
+    # 얕은 서명은 같지만 이번 문서에는 Street 가 있다
+    assert extractor.extract(_submodels("M2", "Main St")) == {"street": "Main St", "status": "Running"}
+    assert extractor.extract(_submodels("M3", "Side Rd")) == {"street": "Side Rd", "status": "Running"}
+    assert len(extractor._layouts) == 1
+
+
+def test_parse_machine_document_takes_first_mapped_process():
+    import aas_pathfinder
+
+    def doc(uid, elements):
+        return {"json": {"assetAdministrationShells": [{
+            "id": f"https://example.com/aas/{uid}",
+            "submodels": [{"id": f"https://example.com/submodel/Category_{uid}", "submodelElements": elements}],
+        }]}}
+
+    unmapped_first = [
+        {"idShort": "MachineType", "value": "Prototype"},
+        {"idShort": "Details", "submodelElements": [{"idShort": "MachineType", "value": "밀링"}]},
+    ]
+    assert aas_pathfinder.parse_machine_document(doc("M1", unmapped_first))[1] == "Milling"
+    mapped_first = [{"idShort": "MachineType", "value": "선반"}, {"idShort": "ProcessID", "value": "밀링"}]
+    assert aas_pathfinder.parse_machine_document(doc("M2", mapped_first))[1] == "Turning"
+    assert aas_pathfinder.parse_machine_document(doc("M3", [{"idShort": "MachineType", "value": "?"}]))[1] == "Unknown"
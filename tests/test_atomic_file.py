@@ -0,0 +1,40 @@
+import os
+import stat
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import atomic_file
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_write_atomic_uses_umask_mode_like_open(tmp_path):
+    plain = tmp_path / "plain.txt"
+    with open(plain, "w") as f:
+        f.write("x")
+    path = tmp_path / "out.json"
+    atomic_file.write_atomic(str(path), lambda f: f.write("{}"), prefix=".out-")
+    assert path.read_text() == "{}"
+    assert _mode(path) == _mode(plain) == atomic_file.default_mode()
+
+    atomic_file.write_atomic(str(path), lambda f: f.write(b"\x00"), binary=True, mode=0o600, fsync=True)
+    assert path.read_bytes() == b"\x00"
+    assert _mode(path) == 0o600
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["out.json", "plain.txt"]
+
+
+def test_atomic_path_keeps_target_on_error(tmp_path):
+    path = tmp_path / "map.html"
+    path.write_text("old")
+    with pytest.raises(RuntimeError):
+        with atomic_file.atomic_path(str(path), prefix=".map-") as tmp:
+            with open(tmp, "w") as f:
+                f.write("half")
+            raise RuntimeError("boom")
+    assert path.read_text() == "old"
+    assert [p.name for p in tmp_path.iterdir()] == ["map.html"]
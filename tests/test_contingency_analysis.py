@@ -0,0 +1,70 @@
+import itertools
+import math
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import contingency_analysis
+from aas_pathfinder import Machine
+from contingency_analysis import analyze
+from process_planner import FLOW, leg_distance
+
+
+def _fleet(seed, size=24):
+    rng = random.Random(seed)
+    sites = [(rng.uniform(30, 45), rng.uniform(-120, -75)) for _ in range(size // 2)]
+    return [
+        Machine(f"M{i}", FLOW[i % 4] if i < 8 else rng.choice(FLOW[:4]), rng.choice(sites),
+                "Running" if rng.random() < 0.9 else "Fault")
+        for i in range(size)
+    ]
+
+
+def _brute_force(machines, removed=()):
+    by_process = {}
+    for m in machines:
+        if m.status == "Running" and m.name not in removed:
+            by_process.setdefault(m.process, []).append(m)
+    steps = [s for s in FLOW if any(m.process == s and m.status == "Running" for m in machines)]
+    if any(s not in by_process for s in steps):
+        return math.inf
+    return min(
+        sum(leg_distance(a, b) for a, b in zip(chain, chain[1:]))
+        for chain in itertools.product(*(by_process[s] for s in steps))
+    )
+
+
+def _check(report, machines):
+    assert report.base_cost == pytest.approx(_brute_force(machines))
+    for row in report.rows:
+        expected = _brute_force(machines, set(row.members))
+        if math.isinf(expected):
+            assert row.unreachable
+        else:
+            assert row.cost == pytest.approx(expected)
+
+
+def test_n1_and_site_costs_match_brute_force():
+    for seed in range(3):
+        machines = _fleet(seed)
+        report = analyze(machines, sites=True)
+        assert {r.kind for r in report.rows} == {"machine", "site"}
+        _check(report, machines)
+        ranked = report.ranked()
+        assert ranked[0].increase == max(r.increase for r in ranked)
+        assert all(r.regret == 0 for r in report.rows if r.key in report.base_chain)
+
+
+def test_numpy_backend_matches_pure_python(monkeypatch):
+    pytest.importorskip("numpy")
+    machines = _fleet(5)
+    vectorized = analyze(machines, sites=True)
+    monkeypatch.setattr(contingency_analysis, "np", None)
+    pure = analyze(machines, sites=True)
+    assert vectorized.backend == "numpy" and pure.backend == "python"
+    expected = {(r.kind, r.key): r.cost for r in pure.rows}
+    assert {(r.kind, r.key): r.cost for r in vectorized.rows} == pytest.approx(expected)
@@ -6,6 +6,10 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 import types
 import importlib
+import multiprocessing
+
+import pytest
+import atomic_file
 import convert_to_aas
 
 class Dummy:
@@ -47,3 +51,85 @@ def test_ident_str_alias(monkeypatch):
     obj = convert_to_aas._create(Dummy, id_short="x", identification=ident)
     assert isinstance(obj, Dummy)
     assert obj.identification == "bar"
+
+
+def _fake_sdk(monkeypatch, calls):
+    def fake_convert(path):
+        calls.append(os.path.basename(path))
+        with open(path, encoding="utf-8") as f:
+            data = f.read()
+        if "broken" in data:
+            raise ValueError("broken input")
+        return data.upper()
+
+    def fake_write(f, env):
+        f.write(env)
+
+    monkeypatch.setattr(convert_to_aas, "convert_file", fake_convert)
+    monkeypatch.setattr(convert_to_aas, "write_aas_json_file", fake_write)
+
+
+def _write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_convert_directory_skips_unchanged(tmp_path, monkeypatch):
+    calls = []
+    _fake_sdk(monkeypatch, calls)
+    src, out = tmp_path / "in", tmp_path / "out"
+    src.mkdir()
+    _write(src / "a.json", '{"a": 1}')
+    _write(src / "b.json", '{"b": 2}')
+    _write(src / "bad.json", "broken")
+    _write(src / "notes.txt", "ignored")
+
+    results = convert_to_aas.convert_directory(str(src), str(out))
+    assert {r["name"]: r["status"] for r in results} == {"a.json": "converted", "b.json": "converted", "bad.json": "failed"}
+    assert (out / "a.json").read_text(encoding="utf-8") == '{"A": 1}'
+    assert not (out / "bad.json").exists()
+    assert not [p for p in os.listdir(out) if p.startswith(".convert-")]
+    # mkstemp 의 0600 이 아니라 open(..., "w") 과 같은 권한으로 공개한다
+    for name in ("a.json", convert_to_aas.MANIFEST_NAME):
+        assert os.stat(out / name).st_mode & 0o777 == atomic_file.default_mode()
+
+    calls.clear()
+    _write(src / "b.json", '{"b": 3}')
+    results = convert_to_aas.convert_directory(str(src), str(out))
+    assert {r["name"]: r["status"] for r in results} == {"a.json": "skipped", "b.json": "converted", "bad.json": "failed"}
+    assert sorted(calls) == ["b.json", "bad.json"]
+
+    # 출력이 지워졌거나 --force 이면 다시 변환한다
+    calls.clear()
+    os.remove(out / "a.json")
+    convert_to_aas.convert_directory(str(src), str(out))
+    assert sorted(calls) == ["a.json", "bad.json"]
+    calls.clear()
+    convert_to_aas.convert_directory(str(src), str(out), force=True)
+    assert sorted(calls) == ["a.json", "b.json", "bad.json"]
+
+    report = convert_to_aas.format_timings(results)
+    assert "converted 1, skipped 1, failed 1" in report
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_convert_directory_parallel_matches_serial(tmp_path, monkeypatch):
+    # 가짜 SDK는 monkeypatch로 넣으므로 작업 프로세스가 이를 물려받도록 fork로 띄운다
+    _fake_sdk(monkeypatch, [])
+    src = tmp_path / "in"
+    src.mkdir()
+    for i in range(6):
+        _write(src / f"m{i}.json", f'{{"id": {i}}}')
+    convert_to_aas.convert_directory(str(src), str(tmp_path / "serial"))
+    results = convert_to_aas.convert_directory(str(src), str(tmp_path / "parallel"), jobs=3, mp_context=multiprocessing.get_context("fork"))
+    assert all(r["status"] == "converted" for r in results)
+    for i in range(6):
+        name = f"m{i}.json"
+        assert (tmp_path / "serial" / name).read_text() == (tmp_path / "parallel" / name).read_text()
+
+
+def test_manifest_invalidated_by_converter_change(tmp_path, monkeypatch):
+    convert_to_aas.save_manifest(str(tmp_path), {"a.json": {"sha256": "x"}})
+    assert convert_to_aas.load_manifest(str(tmp_path)) == {"a.json": {"sha256": "x"}}
+    monkeypatch.setattr(convert_to_aas, "converter_digest", lambda: "other")
+    assert convert_to_aas.load_manifest(str(tmp_path)) == {}
@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from des_simulation import PLAN_COLUMNS, EventLoop, FaultSimulation, load_snapshot
+from result_sink import CSVSink
+from sim_common import synthetic_fleet
+
+
+def test_event_loop_orders_by_time_then_schedule_order():
+    loop = EventLoop()
+    seen = []
+    loop.on("tick", lambda label: seen.append((loop.now, label)))
+    loop.schedule(5.0, "tick", label="late")
+    loop.schedule(1.0, "tick", label="first")
+    loop.schedule(1.0, "tick", label="second")
+    loop.run(until=3.0)
+    assert seen == [(1.0, "first"), (1.0, "second")]
+    assert loop.now == 3.0 and len(loop) == 1
+    loop.run()
+    assert seen[-1] == (5.0, "late")
+
+
+def test_fault_simulation_is_deterministic_and_fast():
+    fleet = synthetic_fleet(60, seed=1)
+    start = time.perf_counter()
+    first = FaultSimulation(fleet, seed=3, default_mtbf=50.0).run(2000)
+    assert time.perf_counter() - start < 30
+    second = FaultSimulation(fleet, seed=3, default_mtbf=50.0).run(2000)
+    assert first == second
+    assert first["faults"] > 0 and first["replans"] > 0
+    assert first["simulated_hours"] == 2000
+    assert 0.0 <= first["order_fill_rate"] <= 1.0
+
+
+def test_resume_from_checkpoint_matches_uninterrupted_run(tmp_path):
+    fleet = synthetic_fleet(40, seed=2)
+    full_csv, part_csv, snapshot = (str(tmp_path / n) for n in ("full.csv", "part.csv", "sim.bin"))
+
+    with CSVSink(full_csv, PLAN_COLUMNS) as sink:
+        expected = FaultSimulation(fleet, seed=5, default_mtbf=40.0, sink=sink).run(1500)
+
+    with CSVSink(part_csv, PLAN_COLUMNS) as sink:
+        first = FaultSimulation(fleet, seed=5, default_mtbf=40.0, sink=sink)
+        first.run(1200, checkpoint_path=snapshot, checkpoint_every=500)
+    state = load_snapshot(snapshot)
+    assert state["loop"]["now"] == 1200 * 3600.0
+
+    with CSVSink(part_csv, PLAN_COLUMNS, resume_offset=state["sink_offset"]) as sink:
+        resumed = FaultSimulation.resume(state, sink).run(1500)
+    assert resumed == expected
+    with open(full_csv) as a, open(part_csv) as b:
+        assert a.read() == b.read()
+
+
+def test_event_loop_stop_keeps_clock():
+    loop = EventLoop()
+    loop.on("tick", lambda: loop.stop())
+    loop.schedule(1.0, "tick")
+    loop.schedule(2.0, "tick")
+    loop.run(until=10.0)
+    assert loop.now == 1.0 and len(loop) == 1
+
+
+def test_resume_rejects_parquet_records_before_loading(tmp_path, monkeypatch, capsys):
+    import des_simulation
+
+    checkpoint = str(tmp_path / "missing.bin")
+    monkeypatch.setattr(sys, "argv", ["des_simulation", "--resume", "--records", "plans.parquet", "--checkpoint", checkpoint])
+    with pytest.raises(SystemExit) as exc:
+        des_simulation.main()
+    assert exc.value.code == 2
+    assert ".parquet" in capsys.readouterr().err
@@ -0,0 +1,29 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from event_load_test import recorded_events, run_load_test, synthetic_events
+from sim_common import synthetic_fleet
+
+
+def test_load_test_reports_every_event(tmp_path):
+    fleet = synthetic_fleet(200, seed=1)
+    events = list(synthetic_events(list(fleet), 300, seed=1))
+    report = run_load_test(iter(events), fleet, rate=0, coalesce_window=0.01, max_delay=0.05, timeout=10)
+    assert report["events"] == report["handled"] == 300
+    assert report["planned_events"] + report["noop_events"] == 300
+    assert report["replans_run"] >= 1
+    assert report["time_to_plan"]["p50"] <= report["time_to_plan"]["p99"]
+
+    batched = run_load_test(iter(events), fleet, rate=0, coalesce_window=0.01, max_delay=0.05,
+                            timeout=10, batch_size=64)
+    assert batched["handled"] == batched["planned_events"] + batched["noop_events"] == 300
+
+    path = tmp_path / "events.jsonl"
+    path.write_text("\n".join(json.dumps({"machine": m, "status": s, "t": i * 0.001})
+                              for i, (_, m, s) in enumerate(events[:20])))
+    replayed = list(recorded_events(str(path), speed=2.0))
+    assert replayed[1] == (0.0005, events[1][1], events[1][2])
+
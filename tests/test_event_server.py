@@ -0,0 +1,89 @@
+import os
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pymongo
+
+import event_server
+
+
+def _stored_doc(machine):
+    return {
+        "filename": f"{machine}.json",
+        "json": {
+            "assetAdministrationShells": [
+                {
+                    "id": f"https://example.com/aas/{machine}",
+                    "submodels": [
+                        {"id": f"https://example.com/submodel/Nameplate_{machine}", "submodelElements": []},
+                        {
+                            "id": f"https://example.com/submodel/Operation_{machine}",
+                            "submodelElements": [
+                                {"idShort": "MachineStatus", "value": "Running"},
+                            ],
+                        },
+                    ],
+                }
+            ]
+        },
+    }
+
+
+def test_mark_as_fault_sets_only_status_field():
+    client = pymongo.MongoClient()
+    col = client["db"]["col"]
+    col.create_index("filename", unique=True)
+    col.insert_one(_stored_doc("M1"))
+
+    with mock.patch("event_server.get_client", return_value=client):
+        event_server.mark_as_fault("M1", "mongodb://localhost", "db", "col")
+
+    doc = col.find_one({"filename": "M1.json"})
+    assert "raw" not in doc
+    op = doc["json"]["assetAdministrationShells"][0]["submodels"][1]
+    assert op["submodelElements"][0]["value"] == "Fault"
+
+
+def test_set_machine_status_unknown_machine():
+    client = pymongo.MongoClient()
+    with mock.patch("event_server.get_client", return_value=client):
+        assert not event_server.set_machine_status("nope", "Fault", "mongodb://localhost", "db", "col")
+
+
+def test_status_batch_is_one_bulk_write_and_one_replan(tmp_path):
+    client = pymongo.MongoClient()
+    col = client["db"]["col"]
+    col.create_index("filename", unique=True)
+    for name in ("M1", "M2", "M3"):
+        col.insert_one(_stored_doc(name))
+    fleet = {
+        name: event_server.Machine(name, "Turning", (37.0 + i, 127.0), "Running")
+        for i, name in enumerate(("M1", "M2", "M3"))
+    }
+    server = event_server.StatusEventServer("mongodb://localhost", "db", "col", "mqtt://localhost", map_path=None)
+    payload = event_server.encode_status_batch({"M1": "Fault", "M3": "Fault", "M9": "Fault"})
+    msg = mock.Mock(topic=event_server.BATCH_TOPIC, payload=payload.encode())
+
+    with mock.patch("event_server.get_client", return_value=client), \
+            mock.patch.object(server, "load_machines", side_effect=lambda: dict(fleet)), \
+            mock.patch.object(col, "bulk_write", wraps=col.bulk_write) as bulk, \
+            mock.patch.object(server, "recalculate") as recalc:
+        server.registry
+        version = server.registry.version
+        server.on_message(None, None, msg)
+        # MQTT 콜백에서는 DB에 쓰지 않는다
+        assert bulk.call_count == 0
+        server.scheduler.flush()
+        server.work_queue.join()
+
+    assert bulk.call_count == 1
+    statuses = [col.find_one({"filename": f"{n}.json"})["json"]["assetAdministrationShells"][0]["submodels"][1]
+                ["submodelElements"][0]["value"] for n in ("M1", "M2", "M3")]
+    assert statuses == ["Fault", "Running", "Fault"]
+    assert recalc.call_count == 1
+    # 모르는 머신(M9)은 건너뛰고(시작 직후라 다시 적재하지 않는다) 나머지를 한 번에 반영한다
+    assert [m.name for m in server.registry.candidates("Turning")] == ["M2"]
+    assert server.registry.version == version + 1
+    server.shutdown()
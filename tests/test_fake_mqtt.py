@@ -0,0 +1,65 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fake_mqtt import Broker, FakeMQTTClient, TopicTrie
+
+
+def test_trie_wildcards():
+    trie = TopicTrie()
+    for pattern in ("aas/status/#", "aas/+/M1", "aas/status/M1", "#", "aas/#", "other/+"):
+        trie.add(pattern, pattern)
+    assert trie.match("aas/status/M1") == {"aas/status/#", "aas/+/M1", "aas/status/M1", "#", "aas/#"}
+    assert trie.match("aas/status") == {"aas/status/#", "#", "aas/#"}
+    assert trie.match("other/x") == {"#", "other/+"}
+    assert trie.match("other/x/y") == {"#"}
+    assert trie.match("$SYS/load") == set()
+
+    trie.remove("aas/+/M1", "aas/+/M1")
+    assert "aas/+/M1" not in trie.match("aas/status/M1")
+    assert "+" not in trie.root.children["aas"].children
+
+
+def test_async_delivery_and_drain():
+    broker = Broker()
+    received = []
+    gate = threading.Event()
+    sub = FakeMQTTClient(broker=broker)
+
+    def on_message(client, userdata, msg):
+        gate.wait()
+        received.append((msg.topic, msg.payload))
+
+    sub.on_message = on_message
+    sub.subscribe("aas/status/#")
+    sub.subscribe("aas/+/M2")  # 겹치는 구독이어도 한 번만 받는다
+    sub.loop_start()
+
+    pub = FakeMQTTClient(broker=broker)
+    for i in range(3):
+        pub.publish(f"aas/status/M{i}", f"{i}")
+    pub.publish("aas/other", "x")
+    # 발행자는 구독자 처리를 기다리지 않는다
+    assert received == []
+    assert not broker.drain(timeout=0.05)
+    gate.set()
+    assert broker.drain(timeout=5)
+    assert received == [("aas/status/M0", b"0"), ("aas/status/M1", b"1"), ("aas/status/M2", b"2")]
+    assert broker.delivered == 3
+
+    sub.disconnect()
+    pub.publish("aas/status/M9", "9")
+    assert broker.delivered == 3
+
+
+def test_loop_forever_returns_on_disconnect():
+    broker = Broker()
+    client = FakeMQTTClient(broker=broker)
+    client.subscribe("a")
+    t = threading.Thread(target=client.loop_forever)
+    t.start()
+    client.disconnect()
+    t.join(5)
+    assert not t.is_alive()
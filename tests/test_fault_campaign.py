@@ -0,0 +1,63 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from aas_pathfinder import Machine
+from fault_campaign import (
+    FaultModel, available, base_plan, build_fleet, iter_scenarios, replan, run_campaign, sample_faults,
+)
+from process_planner import FLOW, group_by_process, plan_greedy
+
+
+def _random_fleet(rng, size=60):
+    return [
+        Machine(f"M{i}", rng.choice(FLOW), (rng.uniform(30, 45), rng.uniform(-120, -75)),
+                "Running" if rng.random() < 0.8 else "Fault")
+        for i in range(size)
+    ]
+
+
+def test_replan_matches_greedy_planner():
+    rng = random.Random(5)
+    machines = _random_fleet(rng)
+    fleet = build_fleet(machines)
+    base = base_plan(fleet)
+    assert base.names == plan_greedy(group_by_process(machines, running_only=True)).names
+    for _ in range(200):
+        down = set(rng.sample(range(len(machines)), rng.randint(0, 20)))
+        expected = plan_greedy(available(fleet, down), fleet.flow)
+        assert [m and m.name for m in replan(fleet, base, down).stages] == [m and m.name for m in expected.stages]
+
+
+def test_site_outage_takes_down_colocated_machines():
+    machines = [
+        Machine("A", "Forging", (37.0, -122.0), "Running"),
+        Machine("B", "Turning", (37.0, -122.0), "Running"),
+        Machine("C", "Turning", (40.0, -80.0), "Running"),
+    ]
+    fleet = build_fleet(machines)
+    assert sorted(map(sorted, fleet.sites)) == [[0, 1], [2]]
+    down, sites = sample_faults(fleet, FaultModel(default_rate=0.0, site_outage_rate=1.0), random.Random(0))
+    assert down == {0, 1, 2} and sites == 2
+
+
+def test_campaign_is_reproducible_across_workers():
+    machines = _random_fleet(random.Random(7))
+    model = FaultModel(default_rate=0.05, process_rates={"Forging": 0.8}, site_outage_rate=0.01)
+    fleet = build_fleet(machines)
+
+    def strip(results):
+        return [{k: v for k, v in r.items() if k != "replan_ms"} for r in results]
+
+    inline = strip(iter_scenarios(fleet, 200, model, seed=3, workers=1))
+    pooled = strip(iter_scenarios(fleet, 200, model, seed=3, workers=2, chunksize=16))
+    assert inline == pooled
+    assert inline != strip(iter_scenarios(fleet, 200, model, seed=4, workers=1))
+
+    streamed = []
+    summary = run_campaign(machines, 200, model, seed=3, workers=1, on_result=streamed.append)
+    assert len(streamed) == summary["scenarios"] == 200
+    assert summary["unreachable_by_stage"]["Forging"] > 0
+    assert 0.0 <= summary["unreachable_ratio"] <= summary["disrupted_ratio"] <= 1.0
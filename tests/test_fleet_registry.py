@@ -0,0 +1,102 @@
+import os
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from aas_pathfinder import Machine
+from fleet_registry import FleetRegistry
+import event_server
+
+
+def _fleet():
+    return {
+        "T1": Machine("T1", "Turning", (37.0, 127.0), "Running"),
+        "T2": Machine("T2", "Turning", (36.0, 127.0), "Running"),
+        "M1": Machine("M1", "Milling", (35.0, 128.0), "Idle"),
+    }
+
+
+def test_apply_status_updates_candidates_incrementally():
+    registry = FleetRegistry(_fleet())
+    version = registry.version
+    before = registry.candidates("Turning")
+    assert [m.name for m in before] == ["T1", "T2"]
+    assert "Milling" not in registry.running_by_process()
+
+    assert registry.apply_status("T1", "Fault")
+    assert registry.version == version + 1
+    assert [m.name for m in registry.candidates("Turning")] == ["T2"]
+    # 이미 넘겨준 목록과 머신 객체는 바뀌지 않는다
+    assert [m.status for m in before] == ["Running", "Running"]
+
+    assert not registry.apply_status("T1", "Fault")
+    assert not registry.apply_status("nope", "Fault")
+    assert registry.version == version + 1
+
+    registry.apply_status("T1", "Running")
+    registry.apply_status("M1", "Running")
+    assert [m.name for m in registry.candidates("Turning")] == ["T1", "T2"]
+    assert [m.name for m in registry.candidates("Milling")] == ["M1"]
+
+
+def test_event_server_loads_once_and_applies_deltas():
+    now = [0.0]
+    server = event_server.StatusEventServer("mongodb://x", "db", "col", "mqtt://localhost",
+                                            resync_interval=30.0, clock=lambda: now[0])
+    with mock.patch.object(server, "load_machines", side_effect=lambda: _fleet()) as load:
+        assert server.apply_event("T1", "Fault")
+        assert server.apply_event("M1", "Running")
+        assert load.call_count == 1
+        # 모르는 머신: 재적재는 resync_interval 초에 한 번 이하
+        assert not server.apply_event("X9", "Running")
+        assert load.call_count == 1
+        now[0] = 60.0
+        assert not server.apply_event("X9", "Running")
+        assert load.call_count == 2
+        # 다시 적재해도 없던 이름은 기억해 두고 더 이상 재적재하지 않는다
+        now[0] = 120.0
+        assert not server.apply_event("X9", "Fault")
+        assert server.apply_event("T1", "Fault")
+        assert load.call_count == 2
+    assert [m.name for m in server.registry.candidates("Turning")] == ["T2"]
+
+
+def test_event_burst_runs_one_replan():
+    server = event_server.StatusEventServer("mongodb://x", "db", "col", "mqtt://localhost")
+    msgs = [mock.Mock(payload=f'{{"machine": "T1", "status": "{s}"}}'.encode()) for s in ("Fault", "Idle", "Fault")]
+    with mock.patch.object(server, "load_machines", side_effect=lambda: _fleet()), \
+            mock.patch.object(server, "recalculate") as recalc:
+        for msg in msgs:
+            server.on_message(None, None, msg)
+        server.scheduler.flush()
+        server.work_queue.join()
+        assert recalc.call_count == 1
+        assert server.registry.get("T1").status == "Fault"
+
+        # 이미 같은 상태이면 재계획하지 않는다
+        server.on_message(None, None, mock.Mock(payload=b'{"machine": "T1", "status": "Fault"}'))
+        server.scheduler.flush()
+        server.work_queue.join()
+        assert recalc.call_count == 1
+    server.shutdown()
+    assert server.scheduler.stats()["replans_skipped"] == 1
+
+
+def test_recalculate_replans_only_after_changes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    server = event_server.StatusEventServer("mongodb://x", "db", "col", "mqtt://localhost")
+    with mock.patch.object(server, "load_machines", side_effect=lambda: _fleet()):
+        server.recalculate()
+        assert server.plan.names == ["T1"]
+        assert server.standby.wait(5)
+        server.apply_event("T1", "Fault")
+        # 단일 고장은 대체 계획 표에서 바로 답한다
+        with mock.patch("event_server.replan_partial") as partial:
+            server.recalculate()
+        partial.assert_not_called()
+        assert server.plan.names == ["T2"]
+        plan = server.plan
+        server.recalculate()
+        assert server.plan is plan
+    server.shutdown()
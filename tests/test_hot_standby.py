@@ -0,0 +1,56 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fleet_registry import FleetRegistry
+from hot_standby import HotStandby, compute_standby
+from process_planner import plan_greedy
+
+from test_process_planner import _random_fleet
+
+
+def test_standby_entries_match_fresh_replans():
+    registry = FleetRegistry(_random_fleet(random.Random(5)))
+    version, by_process = registry.snapshot()
+    plan = plan_greedy(by_process)
+    table = compute_standby(plan, by_process, version)
+    assert set(table.entries) == set(plan.names)
+    for name, diff in table.entries.items():
+        trial = FleetRegistry(registry.machines())
+        trial.apply_status(name, "Fault")
+        expected = plan_greedy(trial.running_by_process())
+        assert diff.plan.names == expected.names
+
+
+def test_standby_reuses_entries_upstream_of_change():
+    registry = FleetRegistry(_random_fleet(random.Random(6)))
+    version, by_process = registry.snapshot()
+    plan = plan_greedy(by_process)
+    first = compute_standby(plan, by_process, version)
+
+    # 첫 단계 공정의 (선택되지 않은) 후보만 바뀌면 이후 단계 항목은 재사용된다
+    head = plan.machines[0]
+    spare = next(m for m in registry.machines().values() if m.process == head.process and m.name != head.name)
+    registry.apply_status(spare.name, "Fault" if spare.status == "Running" else "Running")
+    version, by_process = registry.snapshot()
+    second = compute_standby(plan, by_process, version, first, [head.process])
+    assert second.reused == len(plan.machines) - 1
+    assert second.entries[head.name] is not first.entries[head.name]
+
+
+def test_lookup_only_matches_current_plan_and_version():
+    registry = FleetRegistry(_random_fleet(random.Random(7)))
+    version, by_process = registry.snapshot()
+    plan = plan_greedy(by_process)
+    standby = HotStandby()
+    standby.refresh(plan, by_process, version)
+    assert standby.wait(5)
+    victim = plan.names[0]
+    registry.apply_status(victim, "Fault")
+    diff = standby.lookup(victim, plan, registry.version)
+    assert diff is not None and victim not in diff.plan.names
+    assert standby.lookup(victim, plan, registry.version + 1) is None
+    assert standby.lookup(victim, plan_greedy(by_process), registry.version) is None
+    standby.shutdown()
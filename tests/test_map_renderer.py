@@ -0,0 +1,47 @@
+import os
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import atomic_file
+import map_renderer
+from aas_pathfinder import Machine
+from map_renderer import MapRenderer, plan_digest, render_map
+
+A = Machine("A", "Forging", (37.0, -122.0), "Running")
+B = Machine("B", "Turning", (41.0, -87.0), "Running")
+C = Machine("C", "Turning", (40.0, -80.0), "Running")
+
+
+def test_render_map_writes_atomically(tmp_path):
+    path = tmp_path / "flow.html"
+    assert render_map([A, B], str(path))
+    assert path.read_text().startswith("<html>")
+    assert [p.name for p in tmp_path.iterdir()] == ["flow.html"]
+    # mkstemp 의 0600 이 아니라 일반 파일과 같은 권한으로 공개한다
+    assert os.stat(path).st_mode & 0o777 == atomic_file.default_mode()
+    assert not render_map([], str(path))
+
+
+def test_renderer_skips_unchanged_and_throttles(tmp_path):
+    now = [0.0]
+    path = str(tmp_path / "flow.html")
+    renderer = MapRenderer(path, min_interval=10.0, clock=lambda: now[0])
+    with mock.patch("map_renderer.render_map", wraps=map_renderer.render_map) as render:
+        renderer.submit([A, B])
+        assert renderer.flush(5)
+        renderer.submit([A, B])
+        assert renderer.flush(5)
+        assert render.call_count == 1
+        assert renderer.counters["unchanged"] == 1
+
+        # 속도 제한 안에서는 마지막 요청만 남는다
+        renderer.submit([A, C])
+        renderer.submit([A, B, C])
+        now[0] = 20.0
+        renderer.close(5)
+        assert render.call_count == 2
+        assert render.call_args[0][0] == [A, B, C]
+    assert renderer.counters["superseded"] == 1
+    assert plan_digest([A, B]) != plan_digest([A, C])
@@ -0,0 +1,58 @@
+import os
+import sys
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import mongo_connection
+
+
+@pytest.fixture
+def fresh(monkeypatch):
+    """모듈 전역 캐시/옵션을 테스트마다 새로 두고 MongoClient 생성을 기록한다."""
+    monkeypatch.setattr(mongo_connection, "_clients", {})
+    monkeypatch.setattr(mongo_connection, "_options", {"maxPoolSize": 10})
+    with mock.patch("mongo_connection.MongoClient", side_effect=lambda *a, **kw: mock.Mock(args=a, kwargs=kw)) as cls:
+        yield cls
+
+
+def test_get_client_reuses_one_client_per_uri(fresh):
+    a = mongo_connection.get_client("mongodb://a")
+    assert mongo_connection.get_client("mongodb://a") is a
+    b = mongo_connection.get_client("mongodb://b")
+    assert b is not a
+    assert fresh.call_count == 2
+    assert a.args == ("mongodb://a",)
+    assert a.kwargs == {"connect": False, "maxPoolSize": 10}
+
+
+def test_configure_changes_defaults_for_new_clients_only(fresh):
+    before = mongo_connection.get_client("mongodb://a")
+    mongo_connection.configure(max_pool_size=50, appname="scres")
+    after = mongo_connection.get_client("mongodb://b")
+    assert before.kwargs["maxPoolSize"] == 10
+    assert after.kwargs == {"connect": False, "maxPoolSize": 50, "appname": "scres"}
+    # 호출별 옵션이 기본값보다 우선한다
+    assert mongo_connection.get_client("mongodb://c", maxPoolSize=5).kwargs["maxPoolSize"] == 5
+
+
+
+def test_client_options_are_part_of_the_cache_key(fresh):
+    default = mongo_connection.get_client("mongodb://a")
+    short = mongo_connection.get_client("mongodb://a", serverSelectionTimeoutMS=100)
+    assert short is not default
+    assert short.kwargs["serverSelectionTimeoutMS"] == 100
+    assert mongo_connection.get_client("mongodb://a", serverSelectionTimeoutMS=100) is short
+    assert mongo_connection.get_client("mongodb://a") is default
+    assert fresh.call_count == 2
+
+def test_close_all_closes_and_clears_cache(fresh):
+    a = mongo_connection.get_client("mongodb://a")
+    b = mongo_connection.get_client("mongodb://b")
+    mongo_connection.close_all()
+    a.close.assert_called_once_with()
+    b.close.assert_called_once_with()
+    assert mongo_connection.get_client("mongodb://a") is not a
+    assert fresh.call_count == 3
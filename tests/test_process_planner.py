@@ -0,0 +1,100 @@
+import dataclasses
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from aas_pathfinder import Machine
+from fleet_registry import FleetRegistry
+from process_planner import FLOW, plan_greedy, replan_partial
+
+
+def _random_fleet(rng, size=40):
+    machines = {}
+    for i in range(size):
+        name = f"M{i}"
+        machines[name] = Machine(
+            name, rng.choice(FLOW[:4]), (rng.uniform(30, 45), rng.uniform(-120, -75)),
+            "Running" if rng.random() < 0.8 else "Fault",
+        )
+    return machines
+
+
+def test_fault_on_unselected_machine_is_noop():
+    registry = FleetRegistry(_random_fleet(random.Random(1)))
+    plan = plan_greedy(registry.running_by_process())
+    spare = next(m for m in registry.machines().values() if plan.position(m.name) is None)
+    registry.apply_status(spare.name, "Fault")
+    diff = replan_partial(plan, registry.running_by_process(), [registry.get(spare.name)])
+    assert not diff
+    assert diff.plan is plan
+    assert diff.recomputed == 0
+
+
+def test_fault_keeps_upstream_and_reports_diff():
+    registry = FleetRegistry(_random_fleet(random.Random(2)))
+    plan = plan_greedy(registry.running_by_process())
+    victim = plan.stages[2]
+    registry.apply_status(victim.name, "Fault")
+    diff = replan_partial(plan, registry.running_by_process(), [registry.get(victim.name)])
+    assert diff.plan.stages[:2] == plan.stages[:2]
+    assert diff.changes[0].stage == 2 and diff.changes[0].old is victim
+    assert diff.plan.position(victim.name) is None
+
+
+def test_partial_replan_matches_full_replan():
+    rng = random.Random(3)
+    for _ in range(50):
+        registry = FleetRegistry(_random_fleet(rng))
+        plan = plan_greedy(registry.running_by_process())
+        names = rng.sample(list(registry.machines()), 3)
+        for name in names:
+            registry.apply_status(name, rng.choice(["Running", "Fault"]))
+        by_process = registry.running_by_process()
+        diff = replan_partial(plan, by_process, [registry.get(n) for n in names])
+        expected = plan_greedy(by_process)
+        assert [m and m.name for m in diff.plan.stages] == [m and m.name for m in expected.stages]
+        assert bool(diff) == (diff.plan.names != plan.names)
+
+
+def test_partial_replan_honours_start():
+    a = Machine("A", "Forging", (37.0, -122.0), "Fault")
+    b = Machine("B", "Forging", (41.0, -87.0), "Running")
+    t = Machine("T", "Turning", (40.0, -90.0), "Running")
+    plan = plan_greedy({"Forging": [b], "Turning": [t]}, start="B")
+    revived = dataclasses.replace(a, status="Running")
+    by_process = {"Forging": [revived, b], "Turning": [t]}
+    diff = replan_partial(plan, by_process, [revived], start="B")
+    assert diff.plan.names == plan_greedy(by_process, start="B").names == ["B", "T"]
+    assert not diff
+
+def test_plan_distance_matches_legs():
+    a = Machine("A", "Forging", (37.0, -122.0), "Running")
+    b = Machine("B", "Turning", (41.0, -87.0), "Running")
+    plan = plan_greedy({"Forging": [a], "Turning": [b, dataclasses.replace(b, name="C", coords=(0.0, 0.0))]})
+    assert plan.names == ["A", "B"]
+    assert plan.stages[2:] == (None, None, None)
+    assert plan.total_distance == plan.legs()[0][2] > 0
+
+
+def test_planner_caches_by_version_and_fingerprint():
+    from process_planner import Planner, group_by_process
+
+    fleet = _random_fleet(random.Random(8))
+    planner = Planner(maxsize=2)
+    by_process = group_by_process(fleet.values(), running_only=True)
+    first = planner.plan(by_process, version=1)
+    assert planner.plan(by_process, version=1) is first
+    assert planner.plan(group_by_process(fleet.values(), running_only=True)) is not first
+    assert planner.plan(group_by_process(fleet.values(), running_only=True)).names == first.names
+    assert (planner.hits, planner.misses) == (2, 2)
+
+    # 다른 flow나 시작 조건은 다른 키이고, 가장 오래된 항목부터 밀려난다
+    alt = planner.plan(by_process, flow=FLOW[1:], version=1)
+    assert alt.flow == FLOW[1:]
+    assert len(planner) == 2
+    assert planner.plan(by_process, version=1) is not first
+
+    head = by_process[FLOW[0]][-1].name
+    assert planner.plan(by_process, start=head, version=1).names[0] == head
@@ -0,0 +1,160 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pymongo import DESCENDING, DeleteOne, InsertOne, MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+
+def _collection():
+    col = MongoClient()["db"]["col"]
+    for i in range(10):
+        col.insert_one({"filename": f"m{i}.json", "process": "Milling" if i % 2 else "Turning", "order": i})
+    return col
+
+
+def test_unique_index_lookup_and_replace():
+    col = _collection()
+    assert col.create_index("filename", unique=True) == "filename_1"
+    assert col.find_one({"filename": "m3.json"})["order"] == 3
+
+    col.replace_one({"filename": "m3.json"}, {"filename": "m3.json", "order": 30})
+    assert col.find_one({"filename": "m3.json"})["order"] == 30
+    assert col.count_documents({}) == 10
+
+    col.replace_one({"filename": "new.json"}, {"filename": "new.json"}, upsert=True)
+    assert col.count_documents({}) == 11
+
+    with pytest.raises(DuplicateKeyError):
+        col.insert_one({"filename": "m1.json"})
+    with pytest.raises(DuplicateKeyError):
+        col.replace_one({"filename": "m2.json"}, {"filename": "m1.json"})
+    assert col.find_one({"filename": "m2.json"}) is not None
+
+
+def test_compound_index_uses_buckets():
+    col = _collection()
+    col.create_index([("process", 1), ("order", 1)])
+    index = col._indexes["process_1_order_1"]
+    assert ("Milling", 5) in index.buckets
+    assert col.find_one({"process": "Milling", "order": 5})["filename"] == "m5.json"
+    assert col.find_one({"process": "Milling", "order": 4}) is None
+
+    col.delete_one({"filename": "m5.json"})
+    assert ("Milling", 5) not in index.buckets
+
+
+def test_find_filter_projection_sort_limit():
+    col = _collection()
+    col.create_index("process")
+    names = [d["filename"] for d in col.find({"process": "Milling"}, {"filename": 1}).sort("order", DESCENDING).limit(2)]
+    assert names == ["m9.json", "m7.json"]
+
+    doc = col.find_one({"order": {"$gte": 8}}, {"process": 0})
+    assert doc == {"filename": "m8.json", "order": 8}
+
+    assert col.count_documents({"process": {"$in": ["Turning"]}}) == 5
+    assert col.count_documents({"order": {"$lt": 3}, "process": "Turning"}) == 2
+    assert col.count_documents({"missing": {"$exists": False}}) == 10
+
+
+def test_stored_documents_are_copies():
+    col = MongoClient()["db"]["col"]
+    doc = {"filename": "a.json", "json": {"status": "Running"}}
+    col.insert_one(doc)
+    doc["json"]["status"] = "Fault"
+    assert col.find_one({"filename": "a.json"})["json"]["status"] == "Running"
+
+
+def test_update_one_set_nested_path():
+    col = MongoClient()["db"]["col"]
+    col.create_index("filename", unique=True)
+    col.insert_one({"filename": "a.json", "json": {"items": [{"value": "Running"}]}})
+
+    res = col.update_one({"filename": "a.json"}, {"$set": {"json.items.0.value": "Fault"}})
+    assert (res.matched_count, res.modified_count) == (1, 1)
+    assert col.find_one({"filename": "a.json"})["json"]["items"][0]["value"] == "Fault"
+
+    res = col.update_one({"filename": "a.json"}, {"$set": {"json.items.0.value": "Fault"}})
+    assert res.modified_count == 0
+
+    col.update_one({"filename": "a.json"}, {"$set": {"filename": "b.json"}})
+    assert col.find_one({"filename": "a.json"}) is None
+    assert col.find_one({"filename": "b.json"}) is not None
+
+    res = col.update_one({"filename": "c.json"}, {"$set": {"json.status": "Idle"}}, upsert=True)
+    assert res.upserted_id is not None
+    assert col.find_one({"filename": "c.json"})["json"] == {"status": "Idle"}
+
+
+def test_update_does_not_touch_previously_returned_documents():
+    col = MongoClient()["db"]["col"]
+    res = col.insert_many([{"filename": "a.json", "json": {"items": [{"value": "Running"}]}}, {"filename": "b.json"}])
+    assert len(res.inserted_ids) == 2
+
+    before = col.find_one({"filename": "a.json"})
+    col.update_one({"filename": "a.json"}, {"$set": {"json.items.0.value": "Fault", "json.extra": 1}})
+    assert before["json"] == {"items": [{"value": "Running"}]}
+    assert col.find_one({"filename": "a.json"})["json"] == {"items": [{"value": "Fault"}], "extra": 1}
+
+
+def test_failed_journal_leaves_document_unchanged(tmp_path):
+    col = MongoClient(f"mongodb+file://{tmp_path}")["db"]["col"]
+    col.insert_one({"filename": "a.json", "status": "Running"})
+
+    def fail(entry):
+        raise OSError("disk full")
+
+    col._storage.append = fail
+    with pytest.raises(OSError):
+        col.update_one({"filename": "a.json"}, {"$set": {"status": "Fault"}})
+    assert col._docs[0]["status"] == "Running"
+
+def test_file_backed_restart_and_shared_readers(tmp_path):
+    uri = f"mongodb+file://{tmp_path}"
+    writer = MongoClient(uri, compact_every=3)
+    col = writer["db"]["col"]
+    col.create_index("filename", unique=True)
+    for i in range(4):
+        col.insert_one({"filename": f"m{i}.json", "status": "Running"})
+
+    # 다른 프로세스 역할의 클라이언트가 같은 저장소를 읽는다
+    reader = MongoClient(f"mongodb://localhost/?storagePath={tmp_path}")["db"]["col"]
+    assert reader.count_documents({}) == 4
+
+    col.update_one({"filename": "m1.json"}, {"$set": {"status": "Fault"}})
+    assert reader.find_one({"filename": "m1.json"})["status"] == "Fault"
+    assert "filename_1" in reader.index_information()
+
+    writer.close()
+    assert (tmp_path / "db" / "col.oplog.jsonl").read_text() == ""
+
+    restarted = MongoClient(uri)
+    assert restarted["db"].list_collection_names() == ["col"]
+    col = restarted["db"]["col"]
+    assert col.count_documents({"status": "Running"}) == 3
+    with pytest.raises(DuplicateKeyError):
+        col.insert_one({"filename": "m0.json"})
+
+
+def test_bulk_write_counts_and_errors(tmp_path):
+    col = MongoClient(f"mongodb+file://{tmp_path}")["db"]["col"]
+    col.create_index("filename", unique=True)
+    res = col.bulk_write([
+        InsertOne({"filename": "a.json", "status": "Running"}),
+        InsertOne({"filename": "b.json", "status": "Running"}),
+        UpdateOne({"filename": "a.json"}, {"$set": {"status": "Fault"}}),
+        UpdateOne({"filename": "z.json"}, {"$set": {"status": "Fault"}}, upsert=True),
+        DeleteOne({"filename": "b.json"}),
+    ])
+    assert (res.inserted_count, res.matched_count, res.modified_count, res.deleted_count) == (2, 1, 1, 1)
+    assert list(res.upserted_ids) == [3]
+    assert MongoClient(f"mongodb+file://{tmp_path}")["db"]["col"].find_one({"filename": "a.json"})["status"] == "Fault"
+
+    with pytest.raises(BulkWriteError) as err:
+        col.bulk_write([InsertOne({"filename": "a.json"}), InsertOne({"filename": "c.json"})], ordered=False)
+    assert err.value.details["writeErrors"][0]["index"] == 0
+    assert err.value.details["nInserted"] == 1
@@ -0,0 +1,47 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from replan_scheduler import ReplanScheduler
+
+
+def test_burst_is_coalesced_into_one_replan():
+    calls = []
+    sched = ReplanScheduler(calls.append, window=0.5, max_delay=2.0, clock=lambda: 0.0)
+    for i in range(200):
+        sched.submit(f"M{i % 10}", "Fault" if i % 2 else "Running", now=i * 0.001)
+    assert not sched.poll(now=0.3)
+    assert sched.poll(now=0.7)
+    assert len(calls) == 1
+    assert len(calls[0]) == 10
+    assert calls[0]["M1"] == "Fault"
+    assert sched.stats() == {
+        "events_received": 200,
+        "events_coalesced": 199,
+        "replans_run": 1,
+        "replans_skipped": 0,
+    }
+    assert not sched.poll(now=10.0)
+
+
+def test_max_delay_caps_a_continuous_stream():
+    calls = []
+    sched = ReplanScheduler(calls.append, window=0.5, max_delay=2.0)
+    t = 0.0
+    while t < 5.0:
+        sched.submit("M1", "Running", now=t)
+        sched.poll(now=t)
+        t += 0.1
+    assert 2 <= len(calls) <= 3
+    assert sched.next_deadline() is not None
+    sched.flush()
+    assert sched.next_deadline() is None
+
+
+def test_skipped_replans_are_counted():
+    sched = ReplanScheduler(lambda updates: False, window=0.0, max_delay=0.0)
+    sched.submit("M1", "Running", now=1.0)
+    assert sched.poll(now=1.0)
+    assert sched.stats()["replans_skipped"] == 1
+    assert sched.stats()["replans_run"] == 0
@@ -0,0 +1,108 @@
+import csv
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import result_sink
+from result_sink import ColumnarSink, CSVSink, open_sink, read_columnar
+
+COLUMNS = {"label": "str", "worker": "int", "distance_km": "float"}
+
+
+def _rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+
+def test_csv_sink_flushes_by_size_and_time(tmp_path):
+    path = str(tmp_path / "result.csv")
+    now = [0.0]
+    sink = CSVSink(path, COLUMNS, max_records=3, max_interval=10.0, clock=lambda: now[0])
+    sink.write({"label": "a", "worker": 0, "distance_km": 1.5})
+    sink.write({"label": "b", "worker": 0})
+    assert _rows(path) == [["label", "worker", "distance_km"]]
+    sink.write({"label": "c", "worker": 0, "distance_km": 2})
+    assert len(_rows(path)) == 4
+    sink.write({"label": "d", "worker": 0, "distance_km": 3})
+    now[0] = 11.0
+    sink.write({"label": "e", "worker": 0, "distance_km": 4})
+    assert [r[0] for r in _rows(path)[1:]] == ["a", "b", "c", "d", "e"]
+    assert _rows(path)[2] == ["b", "0", ""]
+    sink.close()
+    sink.close()
+    with pytest.raises(ValueError):
+        sink.write({"label": "f"})
+
+    # 다시 열어도 헤더는 한 번만
+    with CSVSink(path, COLUMNS) as again:
+        again.write({"label": "g", "worker": 1, "distance_km": 0})
+    assert [r[0] for r in _rows(path)].count("label") == 1
+
+
+def test_concurrent_writers(tmp_path):
+    path = str(tmp_path / "result.csv")
+    sink = open_sink(path, COLUMNS, max_records=7)
+
+    def worker(n):
+        for i in range(500):
+            sink.write({"label": f"{n}-{i}", "worker": n, "distance_km": i})
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    sink.close()
+    rows = _rows(path)[1:]
+    assert len(rows) == sink.records_written == 4000
+    assert len({r[0] for r in rows}) == 4000
+
+
+def test_columnar_round_trip(tmp_path):
+    pytest.importorskip("numpy")
+    path = str(tmp_path / "plans.rec")
+    with ColumnarSink(path, COLUMNS, max_records=2) as sink:
+        assert sink.format == "numpy"
+        for i in range(5):
+            sink.write({"label": f"plan-{i}", "worker": i, "distance_km": i / 2})
+        sink.checkpoint()
+    data = read_columnar(path)
+    assert data["label"] == [f"plan-{i}" for i in range(5)]
+    assert data["worker"] == list(range(5))
+    assert data["distance_km"] == [i / 2 for i in range(5)]
+
+
+def test_columnar_requires_a_backend(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_sink, "pq", None)
+    monkeypatch.setattr(result_sink, "np", None)
+    with pytest.raises(ImportError):
+        ColumnarSink(str(tmp_path / "plans.rec"), COLUMNS)
+
+
+def test_result_sink_is_abstract(tmp_path):
+    with pytest.raises(TypeError):
+        result_sink.ResultSink(str(tmp_path / "x"), COLUMNS)
+
+def test_parquet_path_requires_pyarrow(tmp_path, monkeypatch):
+    # numpy 형식을 .parquet 이름으로 쓰지 않는다
+    monkeypatch.setattr(result_sink, "pq", None)
+    path = tmp_path / "plans.parquet"
+    with pytest.raises(ImportError):
+        ColumnarSink(str(path), COLUMNS)
+    assert not path.exists()
+
+
+def test_parquet_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "plans.parquet")
+    with ColumnarSink(path, COLUMNS, max_records=2) as sink:
+        assert sink.format == "parquet"
+        for i in range(3):
+            sink.write({"label": f"plan-{i}", "worker": i})
+    data = read_columnar(path)
+    assert data["worker"] == [0, 1, 2]
+    assert data["distance_km"][0] != data["distance_km"][0]  # 빠진 값은 NaN
@@ -0,0 +1,21 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from process_planner import FLOW
+from sim_common import percentile, synthetic_fleet
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([], 50) is None
+
+
+def test_synthetic_fleet_covers_every_stage():
+    fleet = synthetic_fleet(len(FLOW) * 2)
+    assert {m.process for m in fleet.values()} == set(FLOW)
+    assert synthetic_fleet(10, seed=3) == synthetic_fleet(10, seed=3)
@@ -0,0 +1,87 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import update_aas_events
+
+
+def _doc(machine):
+    return {
+        "assetAdministrationShells": [{"id": f"https://example.com/aas/{machine}"}],
+        "submodels": [
+            {"id": f"https://example.com/submodel/Nameplate_{machine}", "submodelElements": []},
+            {
+                "id": f"https://example.com/submodel/Operation_{machine}",
+                "submodelElements": [{"idShort": "MachineStatus", "value": "Running"}],
+            },
+        ],
+    }
+
+
+def _legacy_patch(data):
+    """이전 구현 (JSON 왕복 복사)과 같은 결과인지 비교하기 위한 기준."""
+    submodels = data.get("submodels", [])
+    if not any(sm.get("idShort") == "MQTTBrokerConfig" for sm in submodels):
+        submodels.append(json.loads(json.dumps(update_aas_events.BROKER_SUBMODEL)))
+    for sm in submodels:
+        sid = sm.get("id", "")
+        if "Operation_" in sid:
+            evt = json.loads(json.dumps(update_aas_events.EVENT_TEMPLATE))
+            evt["messageTopic"] = f"aas/status/{sid.split('Operation_')[-1]}"
+            sm["submodelElements"].append(evt)
+    return data
+
+
+def _write(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def test_patch_matches_legacy_output_and_is_idempotent(tmp_path):
+    path = tmp_path / "M1.json"
+    _write(path, _doc("M1"))
+    assert update_aas_events.patch_aas_file(str(path)) is True
+    expected = json.dumps(_legacy_patch(_doc("M1")), indent=2)
+    assert path.read_text(encoding="utf-8") == expected
+
+    mtime = os.stat(path).st_mtime_ns
+    assert update_aas_events.patch_aas_file(str(path)) is False
+    assert os.stat(path).st_mtime_ns == mtime
+    assert not [p for p in os.listdir(tmp_path) if p.startswith(".patch-")]
+
+
+def test_templates_are_not_shared():
+    a, b = update_aas_events.make_event("A"), update_aas_events.make_event("B")
+    a["messageBroker"]["keys"][0]["value"] = "changed"
+    assert b["messageBroker"]["keys"][0]["value"] == "MQTTBrokerConfig"
+    assert update_aas_events.EVENT_TEMPLATE["messageBroker"]["keys"][0]["value"] == "MQTTBrokerConfig"
+    assert b["messageTopic"] == "aas/status/B"
+
+
+def test_check_mode_and_parallel_directory(tmp_path, capsys):
+    for i in range(5):
+        _write(tmp_path / f"M{i}.json", _doc(f"M{i}"))
+    (tmp_path / "bad.json").write_text("{", encoding="utf-8")
+    before = {p: (tmp_path / p).read_bytes() for p in os.listdir(tmp_path)}
+
+    assert update_aas_events.main([str(tmp_path), "--check"]) == 2
+    assert {p: (tmp_path / p).read_bytes() for p in os.listdir(tmp_path)} == before
+    out = capsys.readouterr()
+    assert out.out.count("Needs patch") == 5
+    assert "Failed to patch bad.json" in out.err
+
+    os.remove(tmp_path / "bad.json")
+    results = update_aas_events.patch_directory(str(tmp_path), jobs=2, chunksize=2)
+    assert [(name, changed) for name, changed, _ in results] == [(f"M{i}.json", True) for i in range(5)]
+    assert update_aas_events.main([str(tmp_path), "--check", "--jobs", "2"]) == 0
+
+
+def test_main_accepts_legacy_directory_string(tmp_path):
+    _write(tmp_path / "M0.json", _doc("M0"))
+    with pytest.warns(DeprecationWarning):
+        assert update_aas_events.main(str(tmp_path)) == 0
+    assert update_aas_events.patch_aas_file(str(tmp_path / "M0.json")) is False
@@ -11,6 +11,10 @@ class FakeCollection:
     def __init__(self):
         self.calls = []
         self.data = {}
+        self.indexes = []
+
+    def create_index(self, keys, unique=False):
+        self.indexes.append((keys, unique))
 
     def replace_one(self, filter, doc, upsert=False):
         self.calls.append((filter, doc, upsert))
@@ -48,7 +52,7 @@ def test_upload_aas_documents(tmp_path):
     }
     (tmp_path / "sample.json").write_text(json.dumps(sample), encoding="utf-8")
     fake_client = FakeClient()
-    with mock.patch("aas_pathfinder.MongoClient", return_value=fake_client):
+    with mock.patch("aas_pathfinder.get_client", return_value=fake_client):
         count = upload_aas_documents(str(tmp_path), "mongodb://localhost", "db", "col")
     assert count == 1
     collection = fake_client["db"]["col"]
@@ -61,6 +65,7 @@ def test_upload_aas_documents(tmp_path):
     aas_submodels = doc["json"]["assetAdministrationShells"][0]["submodels"]
     assert aas_submodels[0]["id"] == "sm1"
     assert upsert is True
+    assert collection.indexes == [("filename", True)]
 
 
 def test_upload_then_load(tmp_path):
@@ -76,22 +81,38 @@ def test_upload_then_load(tmp_path):
             }
         ],
         "submodels": [
-            {"id": "Nameplate_aas1", "modelType": "Submodel", "submodelElements": []},
-            {"id": "Category_aas1", "modelType": "Submodel", "submodelElements": []},
-            {"id": "Operation_aas1", "modelType": "Submodel", "submodelElements": []},
+            {
+                "id": "Nameplate_aas1",
+                "modelType": "Submodel",
+                "submodelElements": [
+                    {
+                        "idShort": "AddressInformation",
+                        "value": [{"idShort": "Street", "value": [{"language": "en", "text": "addr "}]}],
+                    }
+                ],
+            },
+            {
+                "id": "Category_aas1",
+                "modelType": "Submodel",
+                "submodelElements": [{"idShort": "MachineType", "value": "CNC LATHE"}],
+            },
+            {
+                "id": "Operation_aas1",
+                "modelType": "Submodel",
+                "submodelElements": [{"idShort": "MachineStatus", "value": "Running"}],
+            },
         ],
     }
     (tmp_path / "sample.json").write_text(json.dumps(sample), encoding="utf-8")
     fake_client = FakeClient()
-    with mock.patch("aas_pathfinder.MongoClient", return_value=fake_client):
+    with mock.patch("aas_pathfinder.get_client", return_value=fake_client):
         upload_aas_documents(str(tmp_path), "mongodb://localhost", "db", "col")
-        with mock.patch("aas_pathfinder.geocode_address", return_value=(0.0, 0.0)):
-            with mock.patch("aas_pathfinder._find_address", return_value="addr"):
-                with mock.patch("aas_pathfinder._find_process", return_value="proc"):
-                    with mock.patch("aas_pathfinder._find_status", return_value="run"):
-                        machines = load_machines_from_mongo("mongodb://localhost", "db", "col")
+        with mock.patch("aas_pathfinder.geocode_address", return_value=(0.0, 0.0)) as geocode:
+            machines = load_machines_from_mongo("mongodb://localhost", "db", "col")
 
+    geocode.assert_called_once_with("addr")
     assert "aas1" in machines
     machine = machines["aas1"]
+    assert (machine.process, machine.status) == ("Turning", "Running")
     stored = fake_client["db"]["col"].data["sample.json"]["json"]
     assert machine.data == stored
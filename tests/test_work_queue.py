@@ -0,0 +1,92 @@
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from work_queue import QueueClosed, WorkQueue
+
+
+def _blocked_queue(**kwargs):
+    """첫 작업이 ``gate`` 에서 멈춰 있는 큐."""
+    gate = threading.Event()
+    started = threading.Event()
+    q = WorkQueue(**kwargs)
+
+    def hold():
+        started.set()
+        gate.wait()
+
+    q.submit(hold)
+    started.wait()
+    return q, gate
+
+
+def test_drop_oldest_keeps_newest_jobs():
+    q, gate = _blocked_queue(maxsize=2, policy="drop_oldest")
+    ran = []
+    jobs = [q.submit(ran.append, i) for i in range(4)]
+    gate.set()
+    q.join()
+    assert ran == [2, 3]
+    assert [j.state for j in jobs] == ["dropped", "dropped", "done", "done"]
+    assert q.counters["dropped"] == 2
+    q.shutdown()
+
+
+def test_latest_wins_replaces_pending_job_with_same_key():
+    q, gate = _blocked_queue(maxsize=4, policy="latest_wins")
+    ran = []
+    first = q.submit(ran.append, "a1", key="a")
+    q.submit(ran.append, "b1", key="b")
+    q.submit(ran.append, "a2", key="a")
+    gate.set()
+    q.join()
+    assert ran == ["a2", "b1"]
+    assert first.state == "dropped"
+    assert q.counters["replaced"] == 1
+    q.shutdown()
+
+
+def test_expired_jobs_are_skipped():
+    now = [0.0]
+    q, gate = _blocked_queue(maxsize=4, clock=lambda: now[0])
+    ran = []
+    late = q.submit(ran.append, "late", timeout=1.0)
+    ok = q.submit(ran.append, "ok")
+    now[0] = 5.0
+    gate.set()
+    q.join()
+    assert ran == ["ok"]
+    assert late.state == "expired" and ok.state == "done"
+    q.shutdown()
+
+
+def test_shutdown_drains_or_cancels():
+    q, gate = _blocked_queue(maxsize=4)
+    ran = []
+    kept = q.submit(ran.append, 1)
+    gate.set()
+    q.shutdown(wait=True)
+    assert kept.state == "done" and ran == [1]
+    with pytest.raises(QueueClosed):
+        q.submit(ran.append, 2)
+
+    q, gate = _blocked_queue(maxsize=4)
+    dropped = q.submit(ran.append, 3)
+    q.shutdown(wait=False, cancel_pending=True)
+    gate.set()
+    q.shutdown()
+    assert dropped.state == "cancelled" and ran == [1]
+
+
+def test_failed_job_does_not_stop_worker():
+    q = WorkQueue()
+    bad = q.submit(lambda: 1 / 0)
+    good = q.submit(lambda: 42)
+    assert good.wait(5)
+    assert bad.state == "failed" and isinstance(bad.error, ZeroDivisionError)
+    assert good.result == 42
+    q.shutdown()
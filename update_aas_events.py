@@ -1,6 +1,25 @@
+"""AAS JSON 파일에 MQTT 브로커 서브모델과 상태 변경 이벤트 요소를 넣는다.
+
+- 브로커 서브모델(``MQTTBrokerConfig``)이 없으면 추가한다.
+- ``Operation_<머신>`` 서브모델마다 ``StatusChangeEvent`` 가 없으면 추가한다
+  (토픽 ``aas/status/<머신>``).
+
+템플릿은 JSON 왕복 대신 :func:`_clone` 으로 복사한다. 바뀐 파일만 같은
+디렉토리의 임시 파일에 쓴 뒤 ``os.replace`` 로 바꿔 넣고, ``--check`` 는
+패치가 필요한 파일만 알려 주고 쓰지 않는다. ``--jobs`` 로 여러 프로세스에서
+처리한다.
+"""
+
+import argparse
 import json
 import os
+import stat
 import sys
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, List, Optional, Tuple, Union
+
+from atomic_file import write_atomic
 
 BROKER_SUBMODEL = {
     "idShort": "MQTTBrokerConfig",
@@ -53,12 +72,25 @@ EVENT_TEMPLATE = {
     }
 }
 
-def patch_aas_file(path: str) -> bool:
-    with open(path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+def _clone(obj: Any) -> Any:
+    """dict/list 로만 된 템플릿의 구조 복사 (``json.loads(json.dumps(...))`` 대신)."""
+    if isinstance(obj, dict):
+        return {k: _clone(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_clone(v) for v in obj]
+    return obj
+
 
+def make_event(machine: str) -> dict:
+    evt = _clone(EVENT_TEMPLATE)
+    evt["messageTopic"] = f"aas/status/{machine}"
+    return evt
+
+
+def patch_data(data: dict) -> bool:
+    """``data`` 를 제자리에서 패치한다. 바뀐 것이 있으면 ``True``."""
     changed = False
-    submodels = data.get("submodels", [])
+    submodels = data.setdefault("submodels", [])
 
     has_broker = any(
         (sm.get("idShort") == "MQTTBrokerConfig") or
@@ -66,7 +98,7 @@ def patch_aas_file(path: str) -> bool:
         for sm in submodels
     )
     if not has_broker:
-        submodels.append(json.loads(json.dumps(BROKER_SUBMODEL)))
+        submodels.append(_clone(BROKER_SUBMODEL))
         changed = True
 
     for sm in submodels:
@@ -75,26 +107,90 @@ def patch_aas_file(path: str) -> bool:
             machine = sid.split("Operation_")[-1]
             elements = sm.setdefault("submodelElements", [])
             if not any(e.get("idShort") == "StatusChangeEvent" for e in elements):
-                evt = json.loads(json.dumps(EVENT_TEMPLATE))
-                evt["messageTopic"] = f"aas/status/{machine}"
-                elements.append(evt)
+                elements.append(make_event(machine))
                 changed = True
+    return changed
+
+
+def _write_atomic(path: str, data: dict) -> None:
+    """같은 디렉토리의 임시 파일에 쓴 뒤 원래 파일과 바꾼다 (권한 유지)."""
+    write_atomic(
+        path,
+        lambda f: json.dump(data, f, indent=2),
+        prefix=".patch-",
+        suffix=".json",
+        mode=stat.S_IMODE(os.stat(path).st_mode),
+    )
+
 
-    if changed:
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
+def patch_aas_file(path: str, check: bool = False) -> bool:
+    """파일을 패치한다. ``check`` 이면 쓰지 않고 패치가 필요한지만 돌려준다."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    changed = patch_data(data)
+    if changed and not check:
+        _write_atomic(path, data)
     return changed
 
-def main(dir_path: str):
-    for filename in os.listdir(dir_path):
-        if not filename.endswith('.json'):
-            continue
-        path = os.path.join(dir_path, filename)
-        if patch_aas_file(path):
-            print(f"Patched {filename}")
+
+# ────────────────────────────────────────────────────────────
+# 디렉토리 처리
+
+Result = Tuple[str, bool, Optional[str]]   # (파일 이름, 바뀜/바뀌어야 함, 오류)
+
+
+def _patch_one(path: str, check: bool) -> Result:
+    name = os.path.basename(path)
+    try:
+        return name, patch_aas_file(path, check), None
+    except Exception as e:
+        return name, False, f"{type(e).__name__}: {e}"
+
+
+def patch_directory(dir_path: str, jobs: int = 1, check: bool = False, chunksize: int = 64) -> List[Result]:
+    """``dir_path`` 의 ``.json`` 파일을 모두 처리한다. 파일마다 (이름, 변경 여부, 오류)."""
+    paths = [
+        os.path.join(dir_path, filename)
+        for filename in sorted(os.listdir(dir_path))
+        if filename.endswith('.json')
+    ]
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            return list(pool.map(_patch_one, paths, [check] * len(paths), chunksize=chunksize))
+    return [_patch_one(path, check) for path in paths]
+
+
+def main(argv: Union[None, str, List[str]] = None) -> int:
+    """명령행 진입점. 종료 코드를 돌려준다.
+
+    코드에서 쓸 때는 :func:`patch_directory` 를 부른다. 예전처럼 디렉토리
+    경로 문자열 하나를 넘기면 ``[경로]`` 로 해석한다.
+    """
+    if isinstance(argv, str):
+        warnings.warn(
+            "main(dir_path) 는 더 이상 쓰지 않습니다. main([dir_path]) 또는 patch_directory 를 쓰세요",
+            DeprecationWarning, stacklevel=2,
+        )
+        argv = [argv]
+    parser = argparse.ArgumentParser(description="Add MQTT broker and StatusChangeEvent elements to AAS JSON files")
+    parser.add_argument("directory", help="Directory with AAS JSON files")
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes (default: 1)")
+    parser.add_argument("--chunksize", type=int, default=64, help="Files per worker task")
+    parser.add_argument("--check", action="store_true", help="Report files that need patching without writing them")
+    args = parser.parse_args(argv)
+
+    pending = failed = 0
+    for filename, changed, error in patch_directory(args.directory, args.jobs, args.check, args.chunksize):
+        if error:
+            failed += 1
+            print(f"Failed to patch {filename}: {error}", file=sys.stderr)
+        elif changed:
+            pending += 1
+            print(f"{'Needs patch' if args.check else 'Patched'} {filename}")
+    if failed:
+        return 2
+    return 1 if args.check and pending else 0
+
 
 if __name__ == '__main__':
-    if len(sys.argv) < 2:
-        print("Usage: update_aas_events.py <directory>")
-        sys.exit(1)
-    main(sys.argv[1])
+    sys.exit(main())
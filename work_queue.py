@@ -0,0 +1,191 @@
+"""크기가 제한된 작업 큐와 워커 스레드.
+
+MQTT 콜백 스레드에서 재계획을 직접 수행하면 계획이 오래 걸리는 동안
+keepalive와 수신이 멈춘다. 콜백은 작업을 큐에 넣기만 하고 실제 실행은
+워커 스레드가 맡는다.
+
+큐가 가득 찼을 때의 정책:
+
+- ``"drop_oldest"``: 가장 오래된 대기 작업을 버리고 새 작업을 넣는다.
+- ``"latest_wins"``: 같은 ``key`` 의 대기 작업이 있으면 새 작업으로 바꾼다.
+  (가득 찼는데 같은 ``key`` 가 없으면 ``drop_oldest`` 와 같다.)
+- ``"block"``: 자리가 날 때까지 기다린다.
+
+``deadline`` 이 지난 뒤에 꺼내진 작업은 실행하지 않고 ``expired`` 로 센다.
+"""
+
+import collections
+import logging
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("drop_oldest", "latest_wins", "block")
+
+
+class QueueClosed(RuntimeError):
+    """종료된 큐에 작업을 넣으려 할 때 발생."""
+
+
+class Job:
+    __slots__ = ("fn", "args", "kwargs", "key", "deadline", "state", "result", "error", "_done")
+
+    def __init__(self, fn, args, kwargs, key, deadline):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.key = key
+        self.deadline = deadline
+        self.state = "pending"  # pending → running → done/failed, 또는 dropped/expired/cancelled
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self._done = threading.Event()
+
+    def _finish(self, state: str) -> None:
+        self.state = state
+        self._done.set()
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+
+class WorkQueue:
+    def __init__(
+        self,
+        maxsize: int = 16,
+        policy: str = "drop_oldest",
+        workers: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        name: str = "work-queue",
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"알 수 없는 정책: {policy}")
+        if maxsize < 1 or workers < 1:
+            raise ValueError("maxsize와 workers는 1 이상이어야 합니다")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.clock = clock
+        self._jobs: Deque[Job] = collections.deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._active = 0
+        self.counters: Dict[str, int] = dict.fromkeys(
+            ("submitted", "completed", "failed", "dropped", "replaced", "expired", "cancelled"), 0)
+        self._threads: List[threading.Thread] = [
+            threading.Thread(target=self._worker, name=f"{name}-{i}", daemon=True) for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    # ────────────────────────────────────────────────────────────
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        key: Optional[Hashable] = None,
+        deadline: Optional[float] = None,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> Job:
+        """작업을 넣는다. ``timeout`` 은 지금부터의 상대 기한(``deadline`` 대신)."""
+        if timeout is not None:
+            deadline = self.clock() + timeout
+        job = Job(fn, args, kwargs, key, deadline)
+        with self._cond:
+            if self._closed:
+                raise QueueClosed("queue is shut down")
+            self.counters["submitted"] += 1
+            if self.policy == "latest_wins" and key is not None:
+                for i, old in enumerate(self._jobs):
+                    if old.key == key:
+                        self._jobs[i] = job
+                        self.counters["replaced"] += 1
+                        old._finish("dropped")
+                        self._cond.notify()
+                        return job
+            if self.policy == "block":
+                while len(self._jobs) >= self.maxsize and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    raise QueueClosed("queue is shut down")
+            elif len(self._jobs) >= self.maxsize:
+                old = self._jobs.popleft()
+                self.counters["dropped"] += 1
+                old._finish("dropped")
+            self._jobs.append(job)
+            self._cond.notify_all()
+        return job
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._jobs)
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """대기 작업과 실행 중인 작업이 모두 끝날 때까지 기다린다."""
+        end = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._jobs or self._active:
+                remaining = None if end is None else end - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False, timeout: Optional[float] = None) -> None:
+        """새 작업을 막고 워커를 종료한다.
+
+        ``cancel_pending`` 이 아니면 이미 들어온 작업은 끝까지 처리한다.
+        """
+        with self._cond:
+            self._closed = True
+            if cancel_pending:
+                while self._jobs:
+                    self._jobs.popleft()._finish("cancelled")
+                    self.counters["cancelled"] += 1
+            self._cond.notify_all()
+        if wait:
+            for t in self._threads:
+                t.join(timeout)
+
+    # ────────────────────────────────────────────────────────────
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while not self._jobs and not self._closed:
+                    self._cond.wait()
+                if not self._jobs:
+                    return
+                job = self._jobs.popleft()
+                self._active += 1
+                self._cond.notify_all()
+            try:
+                self._run(job)
+            finally:
+                with self._cond:
+                    self._active -= 1
+                    self._cond.notify_all()
+
+    def _run(self, job: Job) -> None:
+        if job.deadline is not None and self.clock() > job.deadline:
+            with self._cond:
+                self.counters["expired"] += 1
+            job._finish("expired")
+            return
+        job.state = "running"
+        try:
+            job.result = job.fn(*job.args, **job.kwargs)
+        except Exception as exc:
+            logger.exception("Job %r failed", job.key)
+            job.error = exc
+            with self._cond:
+                self.counters["failed"] += 1
+            job._finish("failed")
+            return
+        with self._cond:
+            self.counters["completed"] += 1
+        job._finish("done")